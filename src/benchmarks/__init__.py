@@ -0,0 +1,8 @@
+"""Performance benchmarks
+
+``python -m benchmarks`` (``just bench``) runs the suite of ``benchmarks.suite`` and compares it with a saved baseline.
+Each other module is a standalone script comparing the variants of one setting, run it from the ``src`` directory, for
+example::
+
+    python -m benchmarks.db_pool --help
+"""
@@ -0,0 +1,93 @@
+"""Runs the benchmark suite (``benchmarks.suite``), saves the results as JSON and compares them with a baseline
+
+The results of each run are written to ``.benchmarks/latest.json``. ``--save-baseline`` also writes them to
+``.benchmarks/baseline.json``, which the following runs compare their medians with: a benchmark slower than its
+baseline by more than ``--threshold`` percent is a regression and makes the run exit with status 1. Baselines are
+only comparable when made on the same machine::
+
+    python -m benchmarks --save-baseline
+    python -m benchmarks --threshold 5 --only 'render base.html'
+"""
+
+import argparse
+import json
+import logging
+import platform
+import sys
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from benchmarks.utils import compare, format_table, setup_django, summarize
+
+OUTPUT_DIR = Path(__file__).resolve().parent.parent.parent / '.benchmarks'
+
+
+def run(names: list[str], scale: float) -> dict[str, Any]:
+    setup_django()
+
+    import django  # noqa: PLC0415
+
+    from benchmarks.suite import BENCHMARKS, benchmark_database  # noqa: PLC0415
+
+    results = {}
+    # silences the request log lines of the ASGI benchmarks, the instrumentation itself still runs
+    logging.disable(logging.INFO)
+    with benchmark_database():
+        for name in names:
+            function, iterations = BENCHMARKS[name]
+            print(f'{name}...', file=sys.stderr)
+            results[name] = summarize(function(max(1, round(iterations * scale))))
+    return {
+        'created_at': datetime.now(UTC).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'machine': f'{platform.node()} {platform.platform()}',
+        'results': results,
+    }
+
+
+def main() -> None:
+    from benchmarks.suite import BENCHMARKS  # noqa: PLC0415
+
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks', description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('--only', action='append', choices=BENCHMARKS, help='benchmark to run, may be repeated')
+    parser.add_argument('--scale', type=float, default=1.0, help='multiplies the iterations of every benchmark')
+    parser.add_argument('--output', type=Path, default=OUTPUT_DIR / 'latest.json', help='where to save the results')
+    parser.add_argument('--baseline', type=Path, default=OUTPUT_DIR / 'baseline.json', help='results to compare with')
+    parser.add_argument('--save-baseline', action='store_true', help='save the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=10.0, help='slowdown in percent reported as a regression')
+    args = parser.parse_args()
+
+    report = run(args.only or list(BENCHMARKS), args.scale)
+    print(format_table(report['results']))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f'\nSaved the baseline to {args.baseline}')
+        return
+    if not args.baseline.exists():
+        print(f'\nNo baseline at {args.baseline}, save one with --save-baseline')
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    comparison = compare(report['results'], baseline['results'])
+    if not comparison:
+        print(f'\nNone of the benchmarks run is in the baseline at {args.baseline}')
+        return
+    print(f'\nCompared with the baseline of {baseline["created_at"]}\n')
+    if baseline['machine'] != report['machine']:
+        print(f'The baseline was made on another machine ({baseline["machine"]})\n')
+    print(format_table(comparison))
+    regressions = [name for name, change in comparison.items() if change['change_pct'] > args.threshold]
+    if regressions:
+        sys.exit(f'\nSlower than the baseline by more than {args.threshold}%: {", ".join(regressions)}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""Async request path benchmark
+
+Sends requests through Django's async handler (the code path used under uvicorn) and reports, per request, the number
+of thread hops made by ``sync_to_async`` and the latency. It compares the home page served by a sync view and by the
+async ``HomeView``, each with the full ``MIDDLEWARE`` and with only the middleware that is natively async (the hops
+left there come from rendering the template, which always happens in a thread)::
+
+    python -m benchmarks.async_path --requests 2000
+"""
+
+import argparse
+import asyncio
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from asgiref.sync import SyncToAsync
+from django.urls import path
+
+from benchmarks.utils import format_table, setup_django, summarize
+
+setup_django()
+
+from django.test import override_settings  # noqa: E402
+from django.test.client import AsyncClient  # noqa: E402
+from django.utils.deprecation import MiddlewareMixin  # noqa: E402
+from django.utils.module_loading import import_string  # noqa: E402
+
+from yads.core.views import HomeView, HtmxTemplateView  # noqa: E402
+
+
+class SyncHomeView(HtmxTemplateView):
+    template_name = HomeView.template_name
+    partial_name = HomeView.partial_name
+
+
+urlpatterns = [
+    path('sync/', SyncHomeView.as_view()),
+    path('async/', HomeView.as_view()),
+]
+
+
+@contextmanager
+def count_thread_hops() -> Iterator[Callable[[], int]]:
+    hops = 0
+    original = SyncToAsync.__call__
+
+    async def counting(self: SyncToAsync, *args: Any, **kwargs: Any) -> Any:
+        nonlocal hops
+        hops += 1
+        return await original(self, *args, **kwargs)
+
+    SyncToAsync.__call__ = counting
+    try:
+        yield lambda: hops
+    finally:
+        SyncToAsync.__call__ = original
+
+
+def native_async_middleware(middleware: list[str]) -> list[str]:
+    """Drops the middleware that only runs through ``MiddlewareMixin``'s thread adapters in async mode."""
+    return [name for name in middleware if not issubclass(import_string(name), MiddlewareMixin)]
+
+
+async def measure(url: str, requests: int) -> dict[str, float]:
+    client = AsyncClient()
+    await client.get(url)  # builds the middleware chain and compiles the template
+    latencies = []
+    with count_thread_hops() as hops:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(url)
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200  # noqa: PLR2004, S101
+    return {**summarize(latencies), 'hops': hops() / requests}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    from django.conf import settings  # noqa: PLC0415
+
+    variants = {
+        'full middleware': settings.MIDDLEWARE,
+        'async middleware': native_async_middleware(settings.MIDDLEWARE),
+    }
+    results = {}
+    for middleware_name, middleware in variants.items():
+        for view in ('sync', 'async'):
+            with override_settings(
+                ROOT_URLCONF=__name__,
+                ALLOWED_HOSTS=['testserver'],
+                MIDDLEWARE=middleware,
+                RESPONSE_CACHE=False,
+                INSTRUMENTATION_SAMPLE_RATE=0,
+            ):
+                results[f'{view} view, {middleware_name}'] = asyncio.run(measure(f'/{view}/', args.requests))
+
+    print(f'{args.requests} requests per variant through the async handler\n')
+    print(format_table(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Login burst benchmark
+
+Starts ``--logins`` password checks at once through ``acheck_password``, the path taken by ``aauthenticate``, and
+reports the logins per second, the latency of each login and the longest stall of the event loop while the burst is
+served. It compares Django's Argon2 hasher with its library defaults, the hasher from ``yads.core.hashers`` hashing in
+the request threads and the same hasher on its process pool::
+
+    python -m benchmarks.password_hashing --logins 200 --workers 2
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any
+
+from benchmarks.utils import format_table, setup_django, summarize
+
+PASSWORD = 'correct horse battery staple'  # noqa: S105
+
+
+async def loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Returns the longest delay of a ``interval`` sleep on the event loop until ``stop`` is set."""
+    longest = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        longest = max(longest, time.perf_counter() - start - interval)
+    return longest
+
+
+async def burst(logins: int) -> dict[str, float]:
+    from django.contrib.auth.hashers import (  # noqa: PLC0415
+        acheck_password,  # pyright: ignore[reportAttributeAccessIssue]
+        make_password,
+    )
+
+    encoded = make_password(PASSWORD)
+    await acheck_password(PASSWORD, encoded)  # starts the hashing pool
+
+    async def login() -> float:
+        start = time.perf_counter()
+        assert await acheck_password(PASSWORD, encoded)  # noqa: S101
+        return time.perf_counter() - start
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(loop_lag(stop))
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return {**summarize(latencies), 'logins_per_s': logins / elapsed, 'loop_lag_ms': await lag * 1000}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=100, help='number of simultaneous logins')
+    parser.add_argument('--workers', type=int, default=2, help='size of the hashing process pool')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings  # noqa: PLC0415
+
+    from yads.core.hashers import shutdown_pool  # noqa: PLC0415
+
+    variants: dict[str, dict[str, Any]] = {
+        'django argon2': {'PASSWORD_HASHERS': ['django.contrib.auth.hashers.Argon2PasswordHasher']},
+        'yads argon2, inline': {'PASSWORD_HASHER_WORKERS': 0},
+        f'yads argon2, {args.workers} processes': {'PASSWORD_HASHER_WORKERS': args.workers},
+    }
+    results = {}
+    for name, overrides in variants.items():
+        with override_settings(**overrides):
+            results[name] = asyncio.run(burst(args.logins))
+        shutdown_pool()
+
+    print(f'Burst of {args.logins} logins\n')
+    print(format_table(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""Sentry overhead benchmark
+
+Requests a page rendering the home template through the full ``MIDDLEWARE`` without Sentry and then with the SDK set
+up like ``config.sentry.init`` at several trace and profile sample rates, and reports the latency per request and
+its overhead over the run without Sentry. Events go to a transport that drops them, so only the cost inside the
+process is measured::
+
+    python -m benchmarks.sentry_overhead --requests 2000
+"""
+
+import argparse
+import time
+from typing import Any
+from wsgiref.util import setup_testing_defaults
+
+import sentry_sdk
+from django.urls import path
+from sentry_sdk.envelope import Envelope
+from sentry_sdk.integrations.django import DjangoIntegration
+from sentry_sdk.integrations.logging import LoggingIntegration
+from sentry_sdk.transport import Transport
+
+from benchmarks.utils import format_table, setup_django, summarize
+
+setup_django()
+
+from django.core.wsgi import get_wsgi_application  # noqa: E402
+from django.test import override_settings  # noqa: E402
+
+from config.sentry import TracesSampler, before_send  # noqa: E402
+from yads.core.views import HomeView, HtmxTemplateView  # noqa: E402
+
+
+class PageView(HtmxTemplateView):
+    template_name = HomeView.template_name
+    partial_name = HomeView.partial_name
+
+
+urlpatterns = [
+    path('page/', PageView.as_view()),
+]
+
+# name: (traces_sampler arguments, profiles_sample_rate)
+VARIANTS: dict[str, tuple[dict[str, Any], float]] = {
+    'traces 0%': ({'rate': 0.0}, 0.0),
+    'traces 10%': ({'rate': 0.1}, 0.0),
+    'traces 100%': ({'rate': 1.0}, 0.0),
+    'traces 100%, max 10/s': ({'rate': 1.0, 'max_per_second': 10}, 0.0),
+    'traces 100%, profiles 10%': ({'rate': 1.0}, 0.1),
+    'traces 100%, profiles 100%': ({'rate': 1.0}, 1.0),
+}
+
+
+class DroppingTransport(Transport):
+    def __init__(self, options: dict[str, Any] | None = None) -> None:
+        super().__init__(options)
+        self.envelopes = 0
+
+    def capture_envelope(self, envelope: Envelope) -> None:
+        self.envelopes += 1
+
+
+def get(application: Any) -> str:
+    # through the WSGI handler, which Sentry wraps, rather than the test client's handler
+    environ = {'PATH_INFO': '/page/', 'HTTP_HOST': 'testserver'}
+    setup_testing_defaults(environ)
+    statuses = []
+    response = application(environ, lambda status, _: statuses.append(status))
+    b''.join(response)
+    response.close()
+    return statuses[0]
+
+
+def measure(requests: int) -> dict[str, float]:
+    application = get_wsgi_application()
+    get(application)  # builds the middleware chain and compiles the template
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        status = get(application)
+        latencies.append(time.perf_counter() - start)
+        assert status == '200 OK'  # noqa: S101
+    return summarize(latencies)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {}
+    with override_settings(
+        ROOT_URLCONF=__name__,
+        ALLOWED_HOSTS=['testserver'],
+        RESPONSE_CACHE=False,
+        INSTRUMENTATION_SAMPLE_RATE=0,
+    ):
+        # before the SDK is set up, its Django integration patches Django for good
+        results['no sentry'] = measure(args.requests)
+        for name, (sampler, profiles_sample_rate) in VARIANTS.items():
+            transport = DroppingTransport()
+            sentry_sdk.init(
+                dsn='https://public@sentry.invalid/1',
+                transport=transport,
+                integrations=[DjangoIntegration(transaction_style='url'), LoggingIntegration()],
+                traces_sampler=TracesSampler(**sampler),
+                profiles_sample_rate=profiles_sample_rate,
+                send_default_pii=True,
+                before_send=before_send,
+            )
+            results[name] = measure(args.requests)
+            sentry_sdk.flush()
+            results[name]['sent'] = transport.envelopes
+
+    baseline = results['no sentry']['mean_ms']
+    for summary in results.values():
+        summary['overhead_ms'] = summary['mean_ms'] - baseline
+        summary.setdefault('sent', 0)
+
+    print(f'{args.requests} requests per variant, sentry-sdk {sentry_sdk.VERSION}\n')
+    print(format_table(results))
+
+
+if __name__ == '__main__':
+    main()
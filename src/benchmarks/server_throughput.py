@@ -0,0 +1,147 @@
+"""Server throughput load test
+
+Starts the application with a single uvicorn process and with gunicorn managing uvicorn workers, drives each with the
+same keep-alive HTTP load and compares requests/second and latency. The load is generated from ``--clients``
+processes so the client does not become the bottleneck before the server does.
+
+Uses the current environment for the Django settings, for example::
+
+    DJANGO_SETTINGS_MODULE=config.settings.production EXTRA_ALLOWED_HOSTS='["127.0.0.1"]' \\
+        python -m benchmarks.server_throughput --duration 20 --connections 64
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from benchmarks.utils import format_table, summarize
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+HOST = '127.0.0.1'
+
+
+def server_command(mode: str, port: int) -> list[str]:
+    if mode == 'uvicorn':
+        return [
+            sys.executable,
+            *('-m', 'uvicorn', '--host', HOST, '--port', str(port)),
+            *('--lifespan', 'on', '--log-level', 'warning', 'config.asgi:application'),
+        ]
+    return [sys.executable, '-m', 'gunicorn', '--config', 'python:config.gunicorn']
+
+
+def wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection((HOST, port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.1)
+    msg = f'Server did not start listening on port {port} within {timeout}s'
+    raise TimeoutError(msg)
+
+
+async def _read_response(reader: asyncio.StreamReader) -> tuple[int, bool]:
+    """Reads one response and returns its status code and whether the server will close the connection."""
+    status = int((await reader.readuntil(b'\r\n')).split()[1])
+    length = 0
+    close = False
+    while (line := await reader.readuntil(b'\r\n')) != b'\r\n':
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+        elif name.lower() == 'connection':
+            close = value.strip().lower() == 'close'
+    await reader.readexactly(length)
+    return status, close
+
+
+async def _connection(port: int, path: str, deadline: float, latencies: list[float]) -> int:
+    request = f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\n\r\n'.encode()
+    errors = 0
+    reader, writer = await asyncio.open_connection(HOST, port)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            writer.write(request)
+            await writer.drain()
+            status, close = await _read_response(reader)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            status, close = 0, True
+        latencies.append(time.perf_counter() - start)
+        errors += status != 200  # noqa: PLR2004
+        if close:  # the server recycled the worker or timed out the keep-alive
+            writer.close()
+            reader, writer = await asyncio.open_connection(HOST, port)
+    writer.close()
+    return errors
+
+
+def run_client(port: int, path: str, connections: int, duration: float) -> tuple[list[float], int]:
+    """Keeps ``connections`` keep-alive connections busy for ``duration`` seconds, returns latencies and errors."""
+
+    async def run() -> tuple[list[float], int]:
+        latencies: list[float] = []
+        deadline = time.perf_counter() + duration
+        errors = await asyncio.gather(*(_connection(port, path, deadline, latencies) for _ in range(connections)))
+        return latencies, sum(errors)
+
+    return asyncio.run(run())
+
+
+def load_test(port: int, args: argparse.Namespace) -> dict[str, float]:
+    per_client = max(1, args.connections // args.clients)
+    with ProcessPoolExecutor(max_workers=args.clients) as executor:
+        # warm up the workers (template caches, connections) before measuring
+        executor.submit(run_client, port, args.path, per_client, 2).result()
+        futures = [
+            executor.submit(run_client, port, args.path, per_client, args.duration) for _ in range(args.clients)
+        ]
+        results = [future.result() for future in futures]
+
+    latencies = [latency for client_latencies, _ in results for latency in client_latencies]
+    return {
+        **summarize(latencies),
+        'rps': len(latencies) / args.duration,
+        'errors': sum(errors for _, errors in results),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/', help='path to request')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to measure each server mode')
+    parser.add_argument('--connections', type=int, default=64, help='total number of keep-alive connections')
+    parser.add_argument('--clients', type=int, default=2, help='number of load generating processes')
+    parser.add_argument('--workers', type=int, default=0, help='gunicorn workers, 0 uses WEB_WORKERS or the CPU count')
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    env = {**os.environ, 'WEB_BIND': f'{HOST}:{args.port}'}
+    if args.workers:
+        env['WEB_WORKERS'] = str(args.workers)
+
+    results = {}
+    for mode in ('uvicorn', 'gunicorn'):
+        server = subprocess.Popen(server_command(mode, args.port), cwd=SRC_DIR, env=env)  # noqa: S603
+        try:
+            wait_for_port(args.port)
+            results[mode] = load_test(args.port, args)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=30)
+
+    print(f'{args.connections} connections for {args.duration:.0f}s against {args.path}\n')
+    print(format_table(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""Static template tag micro-benchmark
+
+Renders a page with ``--assets`` ``{% static %}`` tags against a generated ``ManifestStaticFilesStorage`` manifest,
+with Django's builtin ``static`` tag, with the indexed one from ``yads.core.templatetags.core_tags`` and with the
+indexed one plus a ``{% vite_preload %}`` of a chain of ``--assets`` chunks, and reports the time per render::
+
+    python -m benchmarks.static_tag --assets 200 --renders 2000
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.utils import format_table, setup_django, summarize
+
+# name: (builtin tag library, whether the page also renders {% vite_preload %})
+VARIANTS = {
+    'django static': ('django.templatetags.static', False),
+    'indexed static': ('yads.core.templatetags.core_tags', False),
+    'indexed + preload': ('yads.core.templatetags.core_tags', True),
+}
+
+
+def write_manifests(root: Path, assets: int) -> None:
+    paths = {f'js/chunk{i}.js': f'js/chunk{i}.{i:012x}.js' for i in range(assets)}
+    (root / 'staticfiles.json').write_text(json.dumps({'version': '1.1', 'paths': paths}))
+    chunks = {name: {'file': name, 'imports': [f'js/chunk{i + 1}.js']} for i, name in enumerate(paths)}
+    (root / 'manifest.json').write_text(json.dumps(chunks))
+
+
+def page_source(assets: int, *, preload: bool) -> str:
+    tags = ''.join(f'<script src="{{% static \'js/chunk{i}.js\' %}}"></script>' for i in range(assets))
+    return tags + ("{% vite_preload 'js/chunk0.js' %}" if preload else '')
+
+
+def measure(library: str, source: str, renders: int) -> list[float]:
+    from django.template import Context, Engine  # noqa: PLC0415
+
+    template = Engine(builtins=[library]).from_string(source)
+    context = Context()
+    template.render(context)
+    samples = []
+    for _ in range(renders):
+        start = time.perf_counter()
+        template.render(context)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--assets', type=int, default=100, help='number of {% static %} tags on the page')
+    parser.add_argument('--renders', type=int, default=1000, help='number of measured renders per tag library')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.test import override_settings  # noqa: PLC0415
+
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        write_manifests(root, args.assets)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with override_settings(
+            DEBUG=False, STATIC_ROOT=root, STORAGES=storages, VITE_MANIFEST_PATH=root / 'manifest.json'
+        ):
+            results = {
+                name: summarize(measure(library, page_source(args.assets, preload=preload), args.renders))
+                for name, (library, preload) in VARIANTS.items()
+            }
+
+    print(f'{args.renders} renders of a page with {args.assets} static assets\n')
+    print(format_table(results))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,211 @@
+"""Benchmark suite
+
+The cases run by ``python -m benchmarks``. Each one times a path taken by the requests in-process, with the test
+settings and against a test database created for the run:
+
+- a request through ``config.asgi.application``, the full ASGI stack served by the web workers, with and without the
+  response cache
+- a page of ``{% static %}`` tags rendered with ``yads.core.templatetags.core_tags``
+- ``base.html`` rendered for a request, with all the context processors
+- reads of ``core.User`` rows
+- a login, hashing the password with the configured hasher
+
+A case is a function taking the number of measured iterations and returning the duration of each, registered with
+``benchmark``.
+"""
+
+import asyncio
+import itertools
+import tempfile
+import time
+from collections.abc import Awaitable, Callable, Iterator, Mapping
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from benchmarks.static_tag import page_source, write_manifests
+
+# name: (function, default number of iterations)
+BENCHMARKS: dict[str, tuple[Callable[[int], list[float]], int]] = {}
+
+USERS = 1000
+PASSWORD = 'correct horse battery staple'  # noqa: S105
+
+
+def benchmark(name: str, iterations: int) -> Callable[[Callable[[int], list[float]]], Callable[[int], list[float]]]:
+    def register(function: Callable[[int], list[float]]) -> Callable[[int], list[float]]:
+        BENCHMARKS[name] = (function, iterations)
+        return function
+
+    return register
+
+
+def timed(function: Callable[[], Any], iterations: int) -> list[float]:
+    """Calls ``function`` a tenth of ``iterations`` times to warm it up and returns the duration of the next
+    ``iterations`` calls."""
+    for _ in range(max(1, iterations // 10)):
+        function()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def atimed(function: Callable[[], Awaitable[Any]], iterations: int) -> list[float]:
+    for _ in range(max(1, iterations // 10)):
+        await function()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await function()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+@contextmanager
+def benchmark_database() -> Iterator[None]:
+    """Creates and migrates the test database of the ``default`` connection and fills it with ``USERS`` users."""
+    from django.contrib.auth import get_user_model  # noqa: PLC0415
+    from django.contrib.auth.hashers import make_password  # noqa: PLC0415
+    from django.db import connection  # noqa: PLC0415
+    from django.test.utils import setup_test_environment, teardown_test_environment  # noqa: PLC0415
+
+    setup_test_environment()
+    name = connection.creation.create_test_db(verbosity=0)
+    try:
+        password = make_password(PASSWORD)
+        get_user_model().objects.bulk_create(
+            get_user_model()(username=f'user{i}', email=f'user{i}@example.com', password=password)
+            for i in range(USERS)
+        )
+        yield
+    finally:
+        connection.creation.destroy_test_db(name, verbosity=0)
+        teardown_test_environment()
+
+
+def asgi_get(path: str) -> Callable[[], Awaitable[None]]:
+    from config.asgi import application  # noqa: PLC0415
+
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+    async def get() -> None:
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+        statuses = []
+
+        async def receive() -> dict[str, Any]:
+            if messages:
+                return messages.pop()
+            # Django waits for a disconnect until the response is sent, then cancels the wait
+            await asyncio.Event().wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: Mapping[str, object]) -> None:
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        await application(dict(scope), receive, send)
+        if statuses != [200]:
+            msg = f'GET {path} answered {statuses}'
+            raise RuntimeError(msg)
+
+    return get
+
+
+@benchmark('asgi home page', iterations=1000)
+def asgi_home_page(iterations: int) -> list[float]:
+    from django.test import override_settings  # noqa: PLC0415
+
+    with override_settings(RESPONSE_CACHE=False):
+        return asyncio.run(atimed(asgi_get('/'), iterations))
+
+
+@benchmark('asgi home page, cached', iterations=2000)
+def asgi_home_page_cached(iterations: int) -> list[float]:
+    from django.test import override_settings  # noqa: PLC0415
+
+    with override_settings(RESPONSE_CACHE=True):
+        return asyncio.run(atimed(asgi_get('/'), iterations))
+
+
+@benchmark('static tag x100', iterations=1000)
+def static_tag(iterations: int) -> list[float]:
+    from django.template import Context, Engine  # noqa: PLC0415
+    from django.test import override_settings  # noqa: PLC0415
+
+    assets = 100
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        write_manifests(root, assets)
+        storages = {
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        }
+        with override_settings(
+            DEBUG=False, STATIC_ROOT=root, STORAGES=storages, VITE_MANIFEST_PATH=root / 'manifest.json'
+        ):
+            template = Engine(builtins=['yads.core.templatetags.core_tags']).from_string(
+                page_source(assets, preload=False)
+            )
+            context = Context()
+            return timed(lambda: template.render(context), iterations)
+
+
+@benchmark('render base.html', iterations=1000)
+def render_base(iterations: int) -> list[float]:
+    from django.contrib.auth.models import AnonymousUser  # noqa: PLC0415
+    from django.template.loader import get_template  # noqa: PLC0415
+    from django.test import RequestFactory  # noqa: PLC0415
+
+    template = get_template('base.html')
+
+    def render() -> None:
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+        template.render({}, request)
+
+    return timed(render, iterations)
+
+
+@benchmark('orm user by pk', iterations=2000)
+def orm_user_by_pk(iterations: int) -> list[float]:
+    from django.contrib.auth import get_user_model  # noqa: PLC0415
+
+    User = get_user_model()  # noqa: N806
+    pks = itertools.cycle(User.objects.values_list('pk', flat=True))
+    return timed(lambda: User.objects.get(pk=next(pks)), iterations)
+
+
+@benchmark('orm 50 newest users', iterations=1000)
+def orm_newest_users(iterations: int) -> list[float]:
+    from django.contrib.auth import get_user_model  # noqa: PLC0415
+
+    queryset = get_user_model().objects.order_by('-date_joined')
+    return timed(lambda: list(queryset[:50]), iterations)
+
+
+@benchmark('login', iterations=50)
+def login(iterations: int) -> list[float]:
+    from django.contrib.auth import authenticate  # noqa: PLC0415
+
+    def log_in() -> None:
+        if authenticate(username='user0', password=PASSWORD) is None:
+            msg = 'user0 could not log in'
+            raise RuntimeError(msg)
+
+    return timed(log_in, iterations)
@@ -0,0 +1,55 @@
+import os
+import statistics
+
+
+def setup_django(settings_module: str = 'config.settings.test') -> None:
+    """Configure Django for a benchmark run outside of the test runner."""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+
+    import django  # noqa: PLC0415
+
+    django.setup()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    """Returns the ``pct`` percentile (0-100) of ``samples`` using the nearest-rank method."""
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summarizes latency samples given in seconds, the returned values are in milliseconds."""
+    return {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def format_table(results: dict[str, dict[str, float]]) -> str:
+    """Renders ``{name: summary}`` as a fixed width text table."""
+    columns = list(next(iter(results.values())))
+    name_width = max(len(name) for name in results)
+    lines = [' '.join([f'{"":<{name_width}}', *(f'{column:>12}' for column in columns)])]
+    for name, summary in results.items():
+        cells = (f'{summary[column]:>12.{0 if isinstance(summary[column], int) else 3}f}' for column in columns)
+        lines.append(' '.join([f'{name:<{name_width}}', *cells]))
+    return '\n'.join(lines)
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]]
+) -> dict[str, dict[str, float]]:
+    """Compares the median of each result with its median in ``baseline``, for the benchmarks found in both."""
+    return {
+        name: {
+            'baseline_ms': baseline[name]['p50_ms'],
+            'p50_ms': summary['p50_ms'],
+            'change_pct': (summary['p50_ms'] / baseline[name]['p50_ms'] - 1) * 100,
+        }
+        for name, summary in results.items()
+        if name in baseline
+    }
@@ -12,4 +12,11 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Startup (template warm-up) and shutdown (closing database connections) run from the ASGI lifespan events, the
+# health and readiness probes are answered before Django's middleware
+from yads.core.asgi import LifespanApplication  # noqa: E402
+from yads.core.health import HealthCheckApplication  # noqa: E402
+
+application = LifespanApplication(HealthCheckApplication(django_application))
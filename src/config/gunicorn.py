@@ -0,0 +1,42 @@
+"""Gunicorn configuration
+
+Runs the ASGI application in uvicorn workers, used by ``docker/production/start``::
+
+    gunicorn --config python:config.gunicorn config.asgi:application
+
+Every value comes from the ``WEB_*`` variables of ``EnvSettings``. Send ``SIGHUP`` to the master process to replace
+the workers without dropping connections: the listening socket stays open, new workers are started and the old ones
+finish their in-flight requests within ``WEB_GRACEFUL_TIMEOUT`` before exiting.
+
+For more information on the settings, see
+https://docs.gunicorn.org/en/stable/settings.html
+"""
+
+import os
+
+from config.settings.env import pydenset
+
+
+def default_workers() -> int:
+    """One worker per CPU available to this process, each worker runs its own event loop and thread pool."""
+    return max(2, os.process_cpu_count() or 1)
+
+
+wsgi_app = 'config.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+workers = pydenset.WEB_WORKERS or default_workers()
+
+bind = [pydenset.WEB_BIND]
+backlog = pydenset.WEB_BACKLOG
+keepalive = pydenset.WEB_KEEPALIVE
+
+timeout = pydenset.WEB_TIMEOUT
+graceful_timeout = pydenset.WEB_GRACEFUL_TIMEOUT
+
+# Restart workers after a number of requests to contain memory leaks, jitter avoids restarting all at once
+max_requests = pydenset.WEB_MAX_REQUESTS
+max_requests_jitter = pydenset.WEB_MAX_REQUESTS_JITTER
+
+# Errors to stderr, access logs are left to the load balancer like the single uvicorn process did
+errorlog = '-'
+loglevel = 'warning'
@@ -0,0 +1,125 @@
+"""Sentry configuration
+
+``init`` sets up the Sentry SDK from the ``SENTRY_*`` variables of ``EnvSettings``, called by the settings when
+``SENTRY_DSN`` is set.
+
+Which requests are traced is decided by ``TracesSampler``:
+
+- requests to the home page, the health probes, static and media files and ``/favicon.ico`` are never traced
+- ``SENTRY_TRACES_ROUTE_RATES`` maps path prefixes to their own rate (the longest matching prefix wins), for example
+  ``{"/admin/": 0.01, "/api/": 0.05}``, the other requests are traced at ``SENTRY_TRACES_SAMPLE_RATE``
+- with ``SENTRY_TRACES_MAX_PER_SECOND`` the sampled transactions of a worker process are limited to that rate, the
+  ones over it are dropped
+- requests continuing a trace started upstream keep its sampling decision
+
+Profiling is sampled independently at ``SENTRY_PROFILES_SAMPLE_RATE``, the fraction of the traced requests that are
+also profiled. It is off by default, the profiler's sampling thread costs noticeable CPU on every profiled request.
+``python -m benchmarks.sentry_overhead`` measures the cost of each setting.
+
+https://docs.sentry.io/platforms/python/configuration/sampling/
+"""
+
+import random
+import threading
+import time
+from collections.abc import Mapping
+from typing import Any
+
+import sentry_sdk
+from sentry_sdk.integrations.django import DjangoIntegration
+from sentry_sdk.integrations.logging import LoggingIntegration
+from sentry_sdk.types import Event, Hint
+
+from config.settings.env import EnvSettings
+
+# never traced, besides the static and media files
+EXCLUDED_PATHS = frozenset({'/', '/api/healthz', '/api/readyz', '/favicon.ico'})
+
+
+def before_send(event: Event, hint: Hint) -> Event | None:  # noqa: ARG001
+    # Ignore events where the request path is /favicon.ico
+    if (url := event.get('request', {}).get('url', '')) and str(url).endswith('/favicon.ico'):
+        return None
+
+    return event
+
+
+class RateLimiter:
+    """Token bucket allowing ``rate`` calls of ``acquire`` per second on average, in bursts of up to ``rate`` calls."""
+
+    def __init__(self, rate: float) -> None:
+        self.rate = rate
+        self.capacity = max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class TracesSampler:
+    """The ``traces_sampler`` of the SDK, see the module docstring."""
+
+    def __init__(self, rate: float, route_rates: Mapping[str, float] | None = None, max_per_second: float = 0) -> None:
+        self.rate = rate
+        # longest prefixes first, so the first match is the most specific one
+        self.route_rates = sorted((route_rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.limiter = RateLimiter(max_per_second) if max_per_second > 0 else None
+
+    @staticmethod
+    def path(sampling_context: dict[str, Any]) -> str:
+        if scope := sampling_context.get('asgi_scope'):
+            return scope.get('path', '')
+        if environ := sampling_context.get('wsgi_environ'):
+            return environ.get('PATH_INFO', '')
+        return sampling_context.get('transaction_context', {}).get('name', '')
+
+    def rate_for(self, path: str) -> float:
+        from django.conf import settings  # noqa: PLC0415
+
+        if path in EXCLUDED_PATHS or path.startswith((settings.STATIC_URL, settings.MEDIA_URL)):
+            return 0.0
+        for prefix, rate in self.route_rates:
+            if path.startswith(prefix):
+                return rate
+        return self.rate
+
+    def __call__(self, sampling_context: dict[str, Any]) -> float:
+        if (parent_sampled := sampling_context.get('parent_sampled')) is not None:
+            return float(parent_sampled)
+
+        rate = self.rate_for(self.path(sampling_context))
+        # decided here rather than by the SDK, so only the transactions that are sent take from the rate limit
+        if rate <= 0 or random.random() >= rate:  # noqa: S311
+            return 0.0
+        if self.limiter and not self.limiter.acquire():
+            return 0.0
+        return 1.0
+
+
+def init(env: EnvSettings) -> None:
+    sentry_sdk.init(
+        dsn=env.SENTRY_DSN,
+        integrations=[
+            DjangoIntegration(transaction_style='url'),
+            LoggingIntegration(),
+        ],
+        # the SDK would otherwise try to import the libraries of its ~40 other integrations in every process
+        auto_enabling_integrations=False,
+        traces_sampler=TracesSampler(
+            1.0 if env.DEBUG else env.SENTRY_TRACES_SAMPLE_RATE,
+            env.SENTRY_TRACES_ROUTE_RATES,
+            env.SENTRY_TRACES_MAX_PER_SECOND,
+        ),
+        profiles_sample_rate=env.SENTRY_PROFILES_SAMPLE_RATE,
+        send_default_pii=True,
+        before_send=before_send,
+    )
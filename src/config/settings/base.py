@@ -21,36 +21,9 @@ django_stubs_ext.monkeypatch()
 # Sentry Integration
 # https://docs.sentry.io/platforms/python/integrations/django/
 if pydenset.SENTRY_DSN:
-    import sentry_sdk
-    from sentry_sdk.integrations.django import DjangoIntegration
-    from sentry_sdk.integrations.logging import LoggingIntegration
-    from sentry_sdk.types import Event, Hint
-
-    def before_send(event: Event, hint: Hint) -> Event | None:  # noqa: ARG001
-        # Ignore events where the request path is /favicon.ico
-        if (url := event.get('request', {}).get('url', '')) and str(url).endswith('/favicon.ico'):
-            return None
-
-        return event
-
-    def before_send_transaction(event: Event, hint: Hint) -> Event | None:  # noqa: ARG001
-        # Ignore requests to / and to /api/healthz
-        if event.get('transaction') == '/' or '/api/healthz' in event.get('transaction', ''):
-            return None
-        return event
-
-    sentry_sdk.init(
-        dsn=pydenset.SENTRY_DSN,
-        integrations=[
-            DjangoIntegration(transaction_style='url'),
-            LoggingIntegration(),
-        ],
-        traces_sample_rate=1.0 if pydenset.DEBUG else 0.1,  # 10% in production (TODO: make this configurable)
-        send_default_pii=True,
-        profiles_sample_rate=1.0,
-        before_send=before_send,
-        before_send_transaction=before_send_transaction,
-    )
+    from config import sentry
+
+    sentry.init(pydenset)
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -92,10 +65,13 @@ DJANGO_APPS = [
 # Third-party apps
 THIRD_PARTY_APPS = [
     'django_htmx',
-    'django_extensions',
     'template_partials.apps.SimpleAppConfig',
 ]
 
+# Development tools (shell_plus, runserver_plus, show_urls, ...), production processes don't load them
+if DEBUG:
+    THIRD_PARTY_APPS.append('django_extensions')
+
 # Our apps
 LOCAL_APPS = [
     'yads.core',
@@ -106,6 +82,9 @@ INSTALLED_APPS = [*DJANGO_APPS, *THIRD_PARTY_APPS, *LOCAL_APPS]
 # Middleware definitions
 # https://docs.djangoproject.com/en/5.1/topics/http/middleware/
 MIDDLEWARE = [
+    'yads.core.middleware.RequestContextMiddleware',
+    'yads.core.middleware.InstrumentationMiddleware',
+    'yads.core.middleware.QueryBudgetMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
@@ -117,6 +96,18 @@ MIDDLEWARE = [
     'django_htmx.middleware.HtmxMiddleware',
 ]
 
+# Request timing, database, template and cache metrics of a sample of requests (yads.core.middleware)
+INSTRUMENTATION_SAMPLE_RATE = pydenset.INSTRUMENTATION_SAMPLE_RATE
+INSTRUMENTATION_SERVER_TIMING = pydenset.INSTRUMENTATION_SERVER_TIMING
+INSTRUMENTATION_CONTEXT_PROCESSORS = pydenset.INSTRUMENTATION_CONTEXT_PROCESSORS
+
+# Per-request query budgets and N+1 detection (yads.core.query_budget), on with DEBUG and always in the tests, which
+# also raise
+QUERY_BUDGET = DEBUG if pydenset.QUERY_BUDGET is None else pydenset.QUERY_BUDGET
+QUERY_BUDGET_MAX_QUERIES = pydenset.QUERY_BUDGET_MAX_QUERIES
+QUERY_BUDGET_MAX_REPEATS = pydenset.QUERY_BUDGET_MAX_REPEATS
+QUERY_BUDGET_RAISE = False
+
 # A string representing the full Python import path to your root URLconf.
 # https://docs.djangoproject.com/en/5.1/ref/settings/#root-urlconf
 ROOT_URLCONF = 'config.urls'
@@ -133,6 +124,9 @@ cached_loaders = [('django.template.loaders.cached.Loader', default_loaders)]
 production_loaders = [('template_partials.loader.Loader', cached_loaders)]
 development_loaders = [('template_partials.loader.Loader', default_loaders)]
 
+# Compile every template into the cached loader when a worker boots (yads.core.warmup)
+TEMPLATE_WARMUP = pydenset.TEMPLATE_WARMUP
+
 ###
 
 # A list containing the settings for all template engines to be used with Django.
@@ -148,8 +142,9 @@ TEMPLATES = [
             'context_processors': [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
-                'django.template.context_processors.csrf',
-                'django.template.context_processors.debug',
+                # csrf is left out, Django always runs it first and listing it again runs it twice
+                # only adds anything with DEBUG on
+                *(['django.template.context_processors.debug'] if DEBUG else []),
                 'django.template.context_processors.i18n',
                 'django.template.context_processors.media',
                 'django.template.context_processors.request',
@@ -177,12 +172,90 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
-DATABASES = {'default': dj_database_url.parse(pydenset.DATABASE_URL)}
+# Pooling and persistent connections are mutually exclusive, Django refuses CONN_MAX_AGE with a pool.
+# https://docs.djangoproject.com/en/5.2/ref/databases/#connection-pool
+DATABASES = {
+    'default': dj_database_url.parse(
+        pydenset.DATABASE_URL,
+        conn_max_age=0 if pydenset.DB_POOL else pydenset.DB_CONN_MAX_AGE,
+        conn_health_checks=pydenset.DB_CONN_HEALTH_CHECKS,
+    )
+}
+
+if pydenset.DB_POOL and DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql':
+    # health checks of pooled connections are wired by Django from CONN_HEALTH_CHECKS
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': pydenset.DB_POOL_MIN_SIZE,
+        'max_size': pydenset.DB_POOL_MAX_SIZE,
+        'max_lifetime': pydenset.DB_POOL_MAX_LIFETIME,
+        'max_idle': pydenset.DB_POOL_MAX_IDLE,
+        'timeout': pydenset.DB_POOL_TIMEOUT,
+    }
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+# `default` is a per-process LRU (L1) in front of the `shared` cache (L2) that all workers see. The database backend
+# needs its table created with `manage.py createcachetable`.
+cache_backends = {
+    'database': 'django.core.cache.backends.db.DatabaseCache',
+    'filesystem': 'django.core.cache.backends.filebased.FileBasedCache',
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'yads.core.cache.TieredCache',
+        'LOCATION': 'shared',
+        'TIMEOUT': pydenset.CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': pydenset.CACHE_L1_MAX_ENTRIES,
+            'L1_TIMEOUT': pydenset.CACHE_L1_TIMEOUT,
+        },
+    },
+    'shared': {
+        'BACKEND': cache_backends[pydenset.CACHE_BACKEND],
+        'LOCATION': pydenset.CACHE_LOCATION or 'django_cache',
+        'TIMEOUT': pydenset.CACHE_TIMEOUT,
+        'OPTIONS': {
+            'MAX_ENTRIES': pydenset.CACHE_MAX_ENTRIES,
+        },
+    },
+}
+
+# Sessions
+# https://docs.djangoproject.com/en/dev/topics/http/sessions/#configuring-the-session-engine
+# `cached_db` sessions are read from the tiered cache, so another worker can see a logged out session for up to
+# CACHE_L1_TIMEOUT seconds. Only hits of the worker's L1 are free: a miss reads the `shared` cache, which with the
+# default CACHE_BACKEND=database is a query on `django_cache` instead of one on `django_session`. `signed_cookies`
+# never reads sessions on the server. `manage.py sweep_sessions` deletes the expired sessions from the database.
+SESSION_ENGINE = f'django.contrib.sessions.backends.{pydenset.SESSION_BACKEND}'
+SESSION_CACHE_ALIAS = 'default'
+
+# Views decorated with `yads.core.response_cache.cache_response` are served from the cache for anonymous requests
+RESPONSE_CACHE = pydenset.RESPONSE_CACHE and not DEBUG
+
+# Background tasks, stored in the database and run by `manage.py task_worker` (yads.core.tasks)
+# https://docs.djangoproject.com/en/6.0/topics/tasks/
+TASKS = {
+    'default': {
+        'BACKEND': 'yads.core.tasks.DatabaseBackend',
+        'OPTIONS': {
+            'MAX_ATTEMPTS': pydenset.TASK_MAX_ATTEMPTS,
+            'RETRY_DELAY': pydenset.TASK_RETRY_DELAY,
+            'LEASE': pydenset.TASK_LEASE,
+        },
+    },
+}
+TASK_WORKER_CONCURRENCY = pydenset.TASK_WORKER_CONCURRENCY
+
+# Timeout of the readiness checks of /api/readyz and how long their result is reused (yads.core.health)
+HEALTH_CHECK_TIMEOUT = pydenset.HEALTH_CHECK_TIMEOUT
+HEALTH_READY_TTL = pydenset.HEALTH_READY_TTL
 
 # Authentication backends
 # https://docs.djangoproject.com/en/5.1/ref/settings/#authentication-backends
+# The users and their permissions are cached, see yads.core.auth
 AUTHENTICATION_BACKENDS = [
-    'django.contrib.auth.backends.ModelBackend',
+    'yads.core.auth.CachedModelBackend',
 ]
 
 AUTH_USER_MODEL = 'core.User'
@@ -207,13 +280,19 @@ AUTH_PASSWORD_VALIDATORS = [
 # Password hashers
 # https://docs.djangoproject.com/en/dev/topics/auth/passwords/
 PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'yads.core.hashers.Argon2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2PasswordHasher',
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
     'django.contrib.auth.hashers.ScryptPasswordHasher',
 ]
 
+# Argon2 cost parameters and the size of the process pool that hashes the passwords (yads.core.hashers)
+PASSWORD_ARGON2_TIME_COST = pydenset.PASSWORD_ARGON2_TIME_COST
+PASSWORD_ARGON2_MEMORY_COST = pydenset.PASSWORD_ARGON2_MEMORY_COST
+PASSWORD_ARGON2_PARALLELISM = pydenset.PASSWORD_ARGON2_PARALLELISM
+PASSWORD_HASHER_WORKERS = pydenset.PASSWORD_HASHER_WORKERS
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 LANGUAGE_CODE = 'en'
@@ -227,6 +306,9 @@ USE_TZ = True
 STATIC_ROOT = BASE_DIR / 'static'
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (str(BASE_DIR / 'static' / 'dist'),)
+# Written by `vite build`, collectstatic skips hidden directories so it is read from the build output
+# https://vite.dev/guide/backend-integration
+VITE_MANIFEST_PATH = BASE_DIR / 'static' / 'dist' / '.vite' / 'manifest.json'
 
 
 # User uploaded static files
@@ -242,6 +324,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Logging Configuration
 # https://docs.djangoproject.com/en/5.1/topics/logging/
 # Simple console-based logging since Sentry handles errors and cloud provider handles log aggregation
+# With LOG_QUEUE_SIZE the `console` handler queues the records and a thread formats and writes them through `stream`,
+# LOG_FORMAT=json writes them as JSON with the request and user ids (yads.core.log)
+LOG_FORMAT = pydenset.LOG_FORMAT
+LOG_QUEUE_SIZE = pydenset.LOG_QUEUE_SIZE
+log_stream_handler = {
+    'level': 'DEBUG' if DEBUG else 'INFO',
+    'class': 'logging.StreamHandler',
+    'formatter': 'json' if LOG_FORMAT == 'json' else 'simple' if DEBUG else 'verbose',
+}
+log_queue_handler = {
+    'level': 'DEBUG' if DEBUG else 'INFO',
+    'class': 'yads.core.log.QueueHandler',
+    'queue': {'()': 'queue.Queue', 'maxsize': LOG_QUEUE_SIZE},
+    'listener': 'yads.core.log.QueueListener',
+    'handlers': ['stream'],
+    # the request is only known to the thread that logs, not to the logging thread
+    'filters': ['request'],
+}
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -254,14 +354,19 @@ LOGGING = {
             'format': '{levelname} {name} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'yads.core.log.JSONFormatter',
+        },
     },
-    'handlers': {
-        'console': {
-            'level': 'DEBUG' if DEBUG else 'INFO',
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple' if DEBUG else 'verbose',
+    'filters': {
+        'request': {
+            '()': 'yads.core.log.RequestContextFilter',
         },
     },
+    'handlers': {
+        'stream': log_stream_handler,
+        'console': log_queue_handler if LOG_QUEUE_SIZE else {**log_stream_handler, 'filters': ['request']},
+    },
     'root': {
         'level': 'INFO',
         'handlers': ['console'],
@@ -3,6 +3,8 @@ Keeping this module separate from Django Settings so that we can import it in ot
 settings without having to import all of Django settings.
 """
 
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -23,8 +25,89 @@ class EnvSettings(BaseSettings):
     USE_VITE: bool = False
     VITE_URL: str = 'http://localhost:5173'
 
-    # Sentry Settings
+    # Database Connection Settings
+    # With DB_POOL enabled (PostgreSQL only) connections come from psycopg's native pool and DB_CONN_MAX_AGE is ignored
+    DB_POOL: bool = False
+    DB_POOL_MIN_SIZE: int = 2
+    DB_POOL_MAX_SIZE: int = 10
+    DB_POOL_MAX_LIFETIME: float = 3600.0  # seconds before a pooled connection is replaced
+    DB_POOL_MAX_IDLE: float = 600.0  # seconds an idle connection above min size is kept
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection before failing the request
+    DB_CONN_MAX_AGE: int = 0
+    DB_CONN_HEALTH_CHECKS: bool = True
+
+    # Cache Settings
+    # A per-process LRU (L1) sits in front of the shared CACHE_BACKEND (L2), see yads.core.cache
+    CACHE_BACKEND: Literal['database', 'filesystem', 'locmem'] = 'database'
+    CACHE_LOCATION: str = ''  # table name or directory, defaults to `django_cache`
+    CACHE_TIMEOUT: int = 300
+    CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_L1_MAX_ENTRIES: int = 1_000
+    CACHE_L1_TIMEOUT: float = 5.0
+
+    # Session storage: `cached_db` reads sessions from the cache and only writes them to the database, `signed_cookies`
+    # keeps them in the cookie, `db` reads every session from the database. With CACHE_BACKEND=database a `cached_db`
+    # session missing the per-process L1 is still read with a query, on the cache table
+    SESSION_BACKEND: Literal['cached_db', 'db', 'signed_cookies'] = 'cached_db'
+
+    # Response cache for anonymous and HTMX fragment requests, always off when DEBUG is on
+    RESPONSE_CACHE: bool = True
+
+    # Web Server Settings, read by docker/production/start and config/gunicorn.py
+    WEB_SERVER: Literal['gunicorn', 'uvicorn'] = 'gunicorn'  # `uvicorn` runs a single process
+    WEB_BIND: str = '0.0.0.0:8000'
+    WEB_WORKERS: int = 0  # 0 starts one worker per available CPU
+    WEB_BACKLOG: int = 2048
+    WEB_KEEPALIVE: int = 5
+    WEB_TIMEOUT: int = 30
+    WEB_GRACEFUL_TIMEOUT: int = 30
+    WEB_MAX_REQUESTS: int = 10_000  # recycle a worker after this many requests, 0 disables recycling
+    WEB_MAX_REQUESTS_JITTER: int = 1_000  # spreads recycling so workers don't restart at the same time
+
+    # Request Instrumentation, see yads.core.middleware.InstrumentationMiddleware
+    INSTRUMENTATION_SAMPLE_RATE: float = 0.01  # fraction of requests measured and logged, 0 disables it
+    # add a Server-Timing header to measured responses, only sent with DEBUG on, to INTERNAL_IPS and to staff users
+    INSTRUMENTATION_SERVER_TIMING: bool = True
+    INSTRUMENTATION_CONTEXT_PROCESSORS: bool = False  # also time every template context processor
+
+    # Compile all templates when a worker boots, only done when the template loaders are cached (DEBUG off)
+    TEMPLATE_WARMUP: bool = True
+
+    # Query Budgets, see yads.core.query_budget
+    # record the queries of every request and warn when a view goes over its budget, defaults to DEBUG as recording
+    # and normalising every query is too much overhead for production requests
+    QUERY_BUDGET: bool | None = None
+    QUERY_BUDGET_MAX_QUERIES: int = 50  # default budget of views without a @query_budget
+    QUERY_BUDGET_MAX_REPEATS: int = 5  # identical queries allowed before they are reported as a possible N+1
+
+    # Password Hashing, see yads.core.hashers
+    # The Argon2 defaults are the OWASP recommendation (19 MiB, 2 iterations, 1 lane), changing them rehashes the
+    # passwords on login
+    PASSWORD_ARGON2_TIME_COST: int = 2
+    PASSWORD_ARGON2_MEMORY_COST: int = 19_456  # KiB
+    PASSWORD_ARGON2_PARALLELISM: int = 1
+    PASSWORD_HASHER_WORKERS: int = 2  # processes hashing passwords, 0 hashes in the request thread
+
+    # Logging, see yads.core.log
+    LOG_FORMAT: Literal['text', 'json'] = 'text'  # `json` writes one JSON object per record for log aggregators
+    LOG_QUEUE_SIZE: int = 10_000  # records waiting to be written by the logging thread, 0 writes in the calling thread
+
+    # Background Tasks, see yads.core.tasks
+    TASK_MAX_ATTEMPTS: int = 3  # runs of a failing task before it is given up
+    TASK_RETRY_DELAY: float = 10.0  # seconds before the first retry, doubled for each of the next ones
+    TASK_LEASE: float = 300.0  # seconds without a heartbeat of its worker before a running task is retried
+    TASK_WORKER_CONCURRENCY: int = 4  # tasks a `manage.py task_worker` runs at the same time
+
+    # Health Checks, see yads.core.health
+    HEALTH_CHECK_TIMEOUT: float = 1.0  # seconds each readiness check may take before it fails
+    HEALTH_READY_TTL: float = 5.0  # seconds the readiness result is reused by the probes of a worker
+
+    # Sentry Settings, see config.sentry
     SENTRY_DSN: str = ''
+    SENTRY_TRACES_SAMPLE_RATE: float = 0.1  # fraction of the requests traced, all of them with DEBUG on
+    SENTRY_TRACES_ROUTE_RATES: dict[str, float] = {}  # rates of path prefixes, e.g. {"/admin/": 0.01}
+    SENTRY_TRACES_MAX_PER_SECOND: float = 0  # transactions sampled per second and process at most, 0 is no limit
+    SENTRY_PROFILES_SAMPLE_RATE: float = 0.0  # fraction of the traced requests that are also profiled
 
 
 pydenset = EnvSettings()  # pyright: ignore[reportCallIssue]
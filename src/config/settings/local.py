@@ -5,7 +5,7 @@ ALLOWED_HOSTS = [*ALLOWED_HOSTS, 'localhost', '0.0.0.0', '127.0.0.1', 'yads.loca
 
 # in local we use Whitenoise to server static files as we use uvicorn in development
 sec_middleware_index = MIDDLEWARE.index('django.middleware.security.SecurityMiddleware')
-MIDDLEWARE.insert(sec_middleware_index + 1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+MIDDLEWARE.insert(sec_middleware_index + 1, 'yads.core.staticfiles.WhiteNoiseMiddleware')
 
 
 # STATIC Config closer mimic to production using whitenoise and ManifestStaticFilesStorage
@@ -15,6 +15,6 @@ STORAGES = {
         'BACKEND': 'django.core.files.storage.FileSystemStorage',
     },
     'staticfiles': {
-        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        'BACKEND': 'yads.core.staticfiles.CompressedManifestStaticFilesStorage',
     },
 }
@@ -13,12 +13,12 @@ SECURE_HSTS_PRELOAD = True
 
 # use Whitenoise in Prod until such time we move to a CDN
 sec_middleware_index = MIDDLEWARE.index('django.middleware.security.SecurityMiddleware')
-MIDDLEWARE.insert(sec_middleware_index + 1, 'whitenoise.middleware.WhiteNoiseMiddleware')
+MIDDLEWARE.insert(sec_middleware_index + 1, 'yads.core.staticfiles.WhiteNoiseMiddleware')
 STORAGES = {
     'default': {
         'BACKEND': 'django.core.files.storage.FileSystemStorage',
     },
     'staticfiles': {
-        'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage',
+        'BACKEND': 'yads.core.staticfiles.CompressedManifestStaticFilesStorage',
     },
 }
@@ -11,4 +11,14 @@ if not os.getenv('SECRET_KEY'):
 if not os.getenv('DATABASE_URL'):
     os.environ['DATABASE_URL'] = 'sqlite:///db.sqlite3'
 
+if not os.getenv('CACHE_BACKEND'):
+    os.environ['CACHE_BACKEND'] = 'locmem'
+
 from config.settings.base import *
+
+# Fail tests of views that go over their query budget instead of logging a warning
+QUERY_BUDGET = True
+QUERY_BUDGET_RAISE = True
+
+# Hash the passwords in the test thread, the hashing pool is tested with its own settings
+PASSWORD_HASHER_WORKERS = 0
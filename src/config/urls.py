@@ -5,11 +5,13 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path
-from django.views.generic import TemplateView
+
+from yads.core.response_cache import cache_response
+from yads.core.views import HomeView
 
 urlpatterns = [
     # Out urls
-    path('', TemplateView.as_view(template_name='base.html')),
+    path('', cache_response(60 * 5)(HomeView.as_view()), name='home'),
     # Admin area
     path(settings.ADMIN_URL, admin.site.urls),
 ]
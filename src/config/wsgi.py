@@ -13,3 +13,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.base')
 
 application = get_wsgi_application()
+
+# Compile all templates while the worker boots instead of on the first requests it serves
+from yads.core.warmup import warm_up  # noqa: E402
+
+warm_up()
@@ -0,0 +1,67 @@
+from collections.abc import Iterator
+
+import pytest
+from django.test.utils import setup_databases, teardown_databases  # pyright: ignore[reportAttributeAccessIssue]
+from pytest_django.fixtures import _disable_migrations, _get_databases_for_setup
+from pytest_django.plugin import DjangoDbBlocker
+
+from yads.core import testing
+from yads.core.query_budget import assert_query_budget
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        '--no-db-snapshot',
+        action='store_true',
+        help='migrate the test databases instead of cloning them from a snapshot (see yads.core.testing)',
+    )
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(
+    request: pytest.FixtureRequest,
+    django_test_environment: None,  # noqa: ARG001
+    django_db_blocker: DjangoDbBlocker,
+    django_db_use_migrations: bool,  # noqa: FBT001
+    django_db_keepdb: bool,  # noqa: FBT001
+    django_db_createdb: bool,  # noqa: FBT001
+    django_db_modify_db_settings: None,  # noqa: ARG001
+) -> Iterator[None]:
+    """pytest-django's fixture, creating the test databases from snapshots of the migrated databases."""
+    verbosity = request.config.option.verbose
+    aliases, serialized_aliases = _get_databases_for_setup(request.session.items)
+    # the snapshots are kept in pytest's cache, which `-p no:cacheprovider` turns off
+    cache = getattr(request.config, 'cache', None)
+    snapshots = django_db_use_migrations and not (django_db_keepdb or request.config.option.no_db_snapshot)
+    if not django_db_use_migrations:
+        _disable_migrations()
+
+    with django_db_blocker.unblock():
+        if snapshots and cache is not None:
+            db_cfg = testing.setup_databases(
+                aliases,
+                serialized_aliases,
+                cache.mkdir('db-snapshots'),
+                rebuild=django_db_createdb,
+                verbosity=verbosity,
+            )
+        else:
+            db_cfg = setup_databases(
+                verbosity=verbosity,
+                interactive=False,
+                aliases=aliases,
+                serialized_aliases=serialized_aliases,
+                keepdb=django_db_keepdb and not django_db_createdb,
+            )
+
+    yield
+
+    if not django_db_keepdb:
+        with django_db_blocker.unblock():
+            teardown_databases(db_cfg, verbosity=verbosity)
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test when the block goes over the given number of (repeated) queries."""
+    return assert_query_budget
@@ -0,0 +1,33 @@
+import json
+
+import pytest
+
+from benchmarks import __main__ as bench
+from benchmarks.utils import compare
+
+
+def test_medians_are_compared_with_the_baseline():
+    results = {'a': {'p50_ms': 1.2}, 'b': {'p50_ms': 0.5}, 'new': {'p50_ms': 1.0}}
+    baseline = {'a': {'p50_ms': 1.0}, 'b': {'p50_ms': 1.0}}
+
+    comparison = compare(results, baseline)
+
+    assert list(comparison) == ['a', 'b']
+    assert comparison['a'] == {'baseline_ms': 1.0, 'p50_ms': 1.2, 'change_pct': pytest.approx(20)}
+    assert comparison['b']['change_pct'] == pytest.approx(-50)
+
+
+def test_regressions_fail_the_run(mocker, tmp_path, capsys):
+    report = {'created_at': 'now', 'machine': 'here', 'results': {'a': {'p50_ms': 1.2}, 'b': {'p50_ms': 1.0}}}
+    mocker.patch.object(bench, 'run', return_value=report)
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps({**report, 'results': {'a': {'p50_ms': 1.0}, 'b': {'p50_ms': 1.0}}}))
+    argv = ['benchmarks', '--output', str(tmp_path / 'latest.json'), '--baseline', str(baseline)]
+
+    mocker.patch('sys.argv', [*argv, '--threshold', '25'])
+    bench.main()
+    assert json.loads((tmp_path / 'latest.json').read_text()) == report
+
+    mocker.patch('sys.argv', [*argv, '--threshold', '10'])
+    with pytest.raises(SystemExit, match=r'by more than 10\.0%: a$'):
+        bench.main()
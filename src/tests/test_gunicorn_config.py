@@ -0,0 +1,37 @@
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def load_config(mocker):
+    def load(**env):
+        from config.settings.env import EnvSettings
+
+        mocker.patch('config.settings.env.pydenset', EnvSettings(**env))
+        import config.gunicorn
+
+        return importlib.reload(config.gunicorn)
+
+    return load
+
+
+def test_workers_default_to_the_cpu_count(load_config, mocker):
+    mocker.patch('os.process_cpu_count', return_value=8)
+
+    assert load_config(WEB_WORKERS=0).workers == 8
+
+
+def test_at_least_two_workers_are_started(load_config, mocker):
+    mocker.patch('os.process_cpu_count', return_value=1)
+
+    assert load_config(WEB_WORKERS=0).workers == 2
+
+
+def test_settings_come_from_env_settings(load_config):
+    config = load_config(WEB_WORKERS=3, WEB_MAX_REQUESTS=500, WEB_MAX_REQUESTS_JITTER=50, WEB_BIND='127.0.0.1:9000')
+
+    assert config.workers == 3
+    assert (config.max_requests, config.max_requests_jitter) == (500, 50)
+    assert config.bind == ['127.0.0.1:9000']
+    assert config.worker_class == 'uvicorn_worker.UvicornWorker'
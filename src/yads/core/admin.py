@@ -1,12 +1,30 @@
+from typing import Any
+
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
+from django.http import HttpRequest
+
+from yads.core.exports import CSVExportAdminMixin
+from yads.core.pagination import EstimatedCountPaginator, KeysetChangeList
+from yads.core.user_io import FIELDS
 
 User = get_user_model()
 
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(CSVExportAdminMixin, UserAdmin):
     list_display = (*UserAdmin.list_display, 'date_joined')
     list_filter = (*UserAdmin.list_filter, 'date_joined')
-    ordering = ('-date_joined',)
+    # pages are selected by cursor on the (date_joined, id) index, see yads.core.pagination
+    ordering = ('-date_joined', '-id')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    # backed by the trigram indexes on PostgreSQL, the names have none
+    search_fields = ('username', 'email')
+    # the columns `manage.py import_users` reads
+    export_fields = FIELDS
+
+    def get_changelist(self, request: HttpRequest, **kwargs: Any) -> type[ChangeList]:
+        return KeysetChangeList
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'yads.core'
+
+    def ready(self) -> None:
+        from yads.core import auth  # noqa: F401, PLC0415 connects the invalidation signals of the auth cache
+        from yads.core.instrumentation import install_execute_dispatcher  # noqa: PLC0415
+
+        connection_created.connect(install_execute_dispatcher, dispatch_uid='yads.core.instrumentation')
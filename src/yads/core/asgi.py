@@ -0,0 +1,68 @@
+"""ASGI lifespan support
+
+Django's ASGI handler only speaks HTTP, ``LifespanApplication`` answers the ``lifespan`` scope around it. On startup
+it warms up the templates (see ``yads.core.warmup``) before the server accepts connections, on shutdown it closes the
+database connections and connection pools of the worker and stops its password hashing processes. Run uvicorn with
+``--lifespan on`` (gunicorn's uvicorn workers default to ``auto``, which picks it up).
+
+https://asgi.readthedocs.io/en/latest/specs/lifespan.html
+"""
+
+import logging
+from collections.abc import Awaitable, Callable, MutableMapping
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+
+from yads.core.hashers import shutdown_pool
+from yads.core.warmup import warm_up
+
+log = logging.getLogger(__name__)
+
+Scope = MutableMapping[str, Any]
+Message = MutableMapping[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+ASGIApp = Callable[[Scope, Receive, Send], Awaitable[None]]
+
+
+def startup() -> None:
+    warm_up()
+
+
+def shutdown() -> None:
+    connections.close_all()
+    # the pools are shared by all threads of the process, return their connections to the server
+    for connection in connections.all():
+        if connection.settings_dict.get('OPTIONS', {}).get('pool'):
+            connection.close_pool()  # pyright: ignore[reportAttributeAccessIssue]
+    shutdown_pool()
+
+
+class LifespanApplication:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'lifespan':
+            return await self.app(scope, receive, send)
+
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self._run(startup, 'startup', send)
+            elif message['type'] == 'lifespan.shutdown':
+                await self._run(shutdown, 'shutdown', send)
+                return None
+
+    @staticmethod
+    async def _run(handler: Callable[[], None], event: str, send: Send) -> None:
+        try:
+            # the handlers use the ORM and template engines, which must not run on the event loop
+            await sync_to_async(handler)()
+        except Exception as e:
+            log.exception('ASGI lifespan %s failed', event)
+            await send({'type': f'lifespan.{event}.failed', 'message': str(e)})
+            raise
+        await send({'type': f'lifespan.{event}.complete'})
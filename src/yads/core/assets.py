@@ -0,0 +1,110 @@
+"""Static asset URL index used by the ``static`` and ``vite_preload`` template tags
+
+The index is built once per process, on first use, from the Django staticfiles manifest (``staticfiles.json``, written
+by ``collectstatic``) and the Vite build manifest (``VITE_MANIFEST_PATH``). Resolving a name afterwards is a dictionary
+lookup instead of a storage and manifest lookup on every ``{% static %}`` call. Names that are not in the manifest,
+for example with the default storage in development, are resolved by Django once and memoized.
+
+The index is dropped whenever a setting changes, so ``override_settings`` and the ``settings`` fixture see fresh URLs.
+"""
+
+import json
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestFilesMixin, staticfiles_storage
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.templatetags.static import static as django_static
+from django.utils.html import format_html_join
+from django.utils.safestring import SafeString
+
+from config.settings.env import pydenset
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class ViteChunk:
+    file: str
+    imports: tuple[str, ...] = ()
+    css: tuple[str, ...] = ()
+
+
+@dataclass
+class AssetIndex:
+    prefix: str = ''  # the Vite dev server URL when Vite serves the assets
+    urls: dict[str, str] = field(default_factory=dict)
+    chunks: dict[str, ViteChunk] = field(default_factory=dict)  # Vite manifest entries by source name
+    preload_links: dict[str, SafeString] = field(default_factory=dict)  # rendered {% vite_preload %} by entry
+
+    def url(self, name: str) -> str:
+        name = name.lstrip('/')
+        try:
+            return self.urls[name]
+        except KeyError:
+            url = self.urls[name] = f'{self.prefix}{django_static(name)}'
+            return url
+
+    def preload(self, entry: str) -> SafeString:
+        """Returns the ``<link>`` tags preloading the JavaScript chunks and the stylesheets ``entry`` depends on."""
+        entry = entry.lstrip('/')
+        try:
+            return self.preload_links[entry]
+        except KeyError:
+            scripts, styles = self.preloads(entry)
+            links = self.preload_links[entry] = format_html_join(
+                '', '<link rel="modulepreload" href="{}" />', ((url,) for url in scripts)
+            ) + format_html_join('', '<link rel="preload" href="{}" as="style" />', ((url,) for url in styles))
+            return links
+
+    def preloads(self, entry: str) -> tuple[list[str], list[str]]:
+        """Returns the URLs of the JavaScript chunks and the stylesheets ``entry`` depends on."""
+        if self.prefix or entry not in self.chunks:
+            return [], []
+        scripts, styles = [], [*self.chunks[entry].css]
+        for chunk in self._imports(entry, {entry}):
+            scripts.append(chunk.file)
+            styles.extend(chunk.css)
+        return [self.url(name) for name in scripts], [self.url(name) for name in dict.fromkeys(styles)]
+
+    def _imports(self, name: str, seen: set[str]) -> Iterator[ViteChunk]:
+        for imported in self.chunks[name].imports:
+            if imported not in seen and imported in self.chunks:
+                seen.add(imported)
+                yield self.chunks[imported]
+                yield from self._imports(imported, seen)
+
+
+def load_vite_manifest(path: Path) -> dict[str, ViteChunk]:
+    try:
+        manifest: dict[str, dict[str, Any]] = json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+    return {
+        name: ViteChunk(chunk['file'], tuple(chunk.get('imports', ())), tuple(chunk.get('css', ())))
+        for name, chunk in manifest.items()
+    }
+
+
+@cache
+def get_index() -> AssetIndex:
+    if settings.DEBUG and pydenset.USE_VITE:
+        return AssetIndex(prefix=pydenset.VITE_URL)
+
+    index = AssetIndex(chunks=load_vite_manifest(Path(settings.VITE_MANIFEST_PATH)))
+    if isinstance(staticfiles_storage, ManifestFilesMixin):
+        for name in staticfiles_storage.hashed_files:
+            index.urls[name] = staticfiles_storage.url(name)  # pyright: ignore[reportAttributeAccessIssue]
+    log.debug('Indexed %d static files and %d Vite chunks', len(index.urls), len(index.chunks))
+    return index
+
+
+@receiver(setting_changed)
+def reset_index(**_: Any) -> None:
+    get_index.cache_clear()
@@ -0,0 +1,150 @@
+"""Cached authentication backend
+
+``AuthenticationMiddleware`` loads the user of every authenticated request from the database and the first permission
+check of a request resolves the permissions of the user and of their groups with a couple of joins.
+``CachedModelBackend`` is a ``ModelBackend`` that keeps the user row and both permission sets in the ``default`` cache.
+
+Cache keys include two generation numbers (see ``yads.core.cache.get_generations``): one per user, bumped when the
+user is saved or deleted or their groups or permissions change, and a global one, bumped when a group or permission is
+saved or deleted, the permissions of a group change or migrations ran. Bulk changes that don't send signals
+(``QuerySet.update``, ``bulk_create``) must call ``invalidate_user`` or ``invalidate_all`` themselves. Like every entry
+of the tiered cache, other processes see an invalidation once their L1 entry for the generation expires
+(``CACHE_L1_TIMEOUT``).
+"""
+
+from contextlib import suppress
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.base_user import AbstractBaseUser
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Model
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from yads.core.cache import aget_generations, bump_generation, get_generations
+
+KEY_PREFIX = 'auth'
+
+UserModel = get_user_model()
+
+# Name of the user attribute that keeps the generations the user was loaded with, reused by the permission lookups
+GENERATIONS_ATTR = '_auth_cache_generations'
+
+
+def _generation_keys(user_id: Any) -> tuple[str, str]:
+    return f'{KEY_PREFIX}:gen', f'{KEY_PREFIX}:gen:{user_id}'
+
+
+def _cache_key(generations: str, user_id: Any, name: str) -> str:
+    return f'{KEY_PREFIX}:{generations}:{user_id}:{name}'
+
+
+def invalidate_user(user_id: Any) -> None:
+    """Drops the cached row and permissions of one user."""
+    bump_generation(cache, _generation_keys(user_id)[1])
+
+
+def invalidate_all() -> None:
+    """Drops the cached rows and permissions of all users."""
+    bump_generation(cache, _generation_keys(None)[0])
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id: Any) -> AbstractBaseUser | None:
+        generations = get_generations(cache, _generation_keys(user_id))
+        key = _cache_key(generations, user_id, 'user')
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = UserModel._default_manager.get(pk=user_id)  # noqa: SLF001
+            except UserModel.DoesNotExist:
+                return None
+            cache.set(key, user)
+        setattr(user, GENERATIONS_ATTR, generations)
+        return user if self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id: Any) -> AbstractBaseUser | None:
+        generations = await aget_generations(cache, _generation_keys(user_id))
+        key = _cache_key(generations, user_id, 'user')
+        user = await cache.aget(key)
+        if user is None:
+            try:
+                user = await UserModel._default_manager.aget(pk=user_id)  # noqa: SLF001
+            except UserModel.DoesNotExist:
+                return None
+            await cache.aset(key, user)
+        setattr(user, GENERATIONS_ATTR, generations)
+        return user if self.user_can_authenticate(user) else None
+
+    def _get_permissions(self, user_obj: Any, obj: Any, from_name: str) -> set[str]:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = f'_{from_name}_perm_cache'
+        if not hasattr(user_obj, perm_cache_name):
+            generations = getattr(user_obj, GENERATIONS_ATTR, None)
+            if generations is None:
+                generations = get_generations(cache, _generation_keys(user_obj.pk))
+            key = _cache_key(generations, user_obj.pk, f'{from_name}_perms')
+            perms = cache.get(key)
+            if perms is None:
+                perms = super()._get_permissions(user_obj, obj, from_name)  # pyright: ignore[reportAttributeAccessIssue]
+                cache.set(key, perms)
+            setattr(user_obj, perm_cache_name, perms)
+        return getattr(user_obj, perm_cache_name)
+
+    async def _aget_permissions(self, user_obj: Any, obj: Any, from_name: str) -> set[str]:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name = f'_{from_name}_perm_cache'
+        if not hasattr(user_obj, perm_cache_name):
+            generations = getattr(user_obj, GENERATIONS_ATTR, None)
+            if generations is None:
+                generations = await aget_generations(cache, _generation_keys(user_obj.pk))
+            key = _cache_key(generations, user_obj.pk, f'{from_name}_perms')
+            perms = await cache.aget(key)
+            if perms is None:
+                perms = await super()._aget_permissions(user_obj, obj, from_name)  # pyright: ignore[reportAttributeAccessIssue]
+                await cache.aset(key, perms)
+            setattr(user_obj, perm_cache_name, perms)
+        return getattr(user_obj, perm_cache_name)
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def user_changed(*, instance: Model, **_: Any) -> None:
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def permissions_changed(**_: Any) -> None:
+    invalidate_all()
+
+
+@receiver(post_migrate)
+def migrated(**_: Any) -> None:
+    # migrations create the permissions of new models with bulk_create, which doesn't send post_save. The first
+    # migrate runs before the table of the database cache exists, there is nothing cached to invalidate then.
+    with suppress(DatabaseError):
+        invalidate_all()
+
+
+@receiver(m2m_changed, sender=UserModel.groups.through)
+@receiver(m2m_changed, sender=UserModel.user_permissions.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def relation_changed(*, instance: Model, action: str, **_: Any) -> None:
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, UserModel):
+        invalidate_user(instance.pk)
+    else:
+        # a group or permission changed its users or permissions, which can affect any number of users
+        invalidate_all()
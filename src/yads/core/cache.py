@@ -0,0 +1,395 @@
+"""Two level cache backend
+
+``TieredCache`` keeps a bounded LRU of recently used values in process memory (L1) in front of a shared cache (L2),
+which is another entry in ``CACHES`` named by ``LOCATION``. Reads are answered from L1 while fresh, writes go to both.
+
+L1 entries live for at most ``L1_TIMEOUT`` seconds, so changes made by other processes become visible after that long.
+``get_or_set`` coalesces concurrent misses of the same key into one computation, within a process through an in-memory
+flight and across processes through a short lived lock key in L2.
+
+``get_generations`` and ``bump_generation`` implement versioned keys: a cached value is stored under a key that
+includes generation numbers, bumping one of them orphans every value stored under the old number.
+
+Example ``CACHES`` setting::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'yads.core.cache.TieredCache',
+            'LOCATION': 'shared',
+            'OPTIONS': {'MAX_ENTRIES': 1000, 'L1_TIMEOUT': 5},
+        },
+        'shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        },
+    }
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+from yads.core.instrumentation import record_cache_access
+
+_MISSING = object()
+
+# Global per-process state, keyed by the L2 alias. Django creates a cache instance per thread so the L1 store, the
+# in-flight computations and the counters must live outside of the instance to be shared between threads.
+_stores: dict[str, 'LRUStore'] = {}
+_flights: dict[str, 'SingleFlight'] = {}
+_stats: dict[str, 'CacheStats'] = {}
+_registry_lock = threading.Lock()
+
+
+@dataclass
+class CacheStats:
+    """Per-process counters of a ``TieredCache``, use them to size ``MAX_ENTRIES`` and ``L1_TIMEOUT``."""
+
+    l1_hits: int = 0
+    l1_misses: int = 0
+    l1_evictions: int = 0
+    l2_hits: int = 0
+    l2_misses: int = 0
+    computations: int = 0  # get_or_set() calls that ran the default callable
+    coalesced: int = 0  # get_or_set() calls that waited for another caller's computation
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def incr(self, name: str, delta: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def reset(self) -> None:
+        with self._lock:
+            for f in fields(self):
+                if not f.name.startswith('_'):
+                    setattr(self, f.name, 0)
+
+    def as_dict(self) -> dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith('_')}
+
+
+class LRUStore:
+    """Thread-safe mapping bounded to ``max_entries`` items, evicting the least recently used entry first."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._data: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value: bytes, timeout: float) -> int:
+        """Stores ``value`` for ``timeout`` seconds and returns the number of evicted entries."""
+        evicted = 0
+        with self._lock:
+            self._data[key] = (time.monotonic() + timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Lets the first caller for a key do the work while concurrent callers for the same key wait for its result."""
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], Any]) -> tuple[Any, bool]:
+        """Returns ``func()`` and whether the value was shared with (i.e. computed by) another caller."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+
+        try:
+            call.value = func()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+
+def get_generations(cache: BaseCache, keys: Sequence[str]) -> str:
+    """Returns the generation numbers stored under ``keys`` joined by dots, initialising missing ones."""
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            # a value never used before, so a generation that was evicted doesn't bring old entries back
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+async def aget_generations(cache: BaseCache, keys: Sequence[str]) -> str:
+    found = await cache.aget_many(keys)
+    for key in keys:
+        if key not in found:
+            await cache.aadd(key, time.time_ns(), timeout=None)
+            found[key] = await cache.aget(key)
+    return '.'.join(str(found[key]) for key in keys)
+
+
+def bump_generation(cache: BaseCache, key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def cache_stats() -> dict[str, dict[str, int]]:
+    """Returns the counters and L1 size of every ``TieredCache`` used in this process, keyed by the L2 alias."""
+    return {
+        alias: {**stats.as_dict(), 'l1_size': len(_stores[alias]), 'l1_max_entries': _stores[alias].max_entries}
+        for alias, stats in _stats.items()
+    }
+
+
+class TieredCache(BaseCache):
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+    _max_entries: int  # set by BaseCache from OPTIONS['MAX_ENTRIES'], missing from the stubs
+
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = location
+        self._l1_timeout = float(options.get('L1_TIMEOUT', 5))
+        self._lock_timeout = float(options.get('LOCK_TIMEOUT', 10))
+        with _registry_lock:
+            self._l1 = _stores.setdefault(location, LRUStore(self._max_entries))
+            self._flight = _flights.setdefault(location, SingleFlight())
+            self.stats = _stats.setdefault(location, CacheStats())
+
+    @cached_property
+    def _l2(self) -> BaseCache:
+        return caches[self._l2_alias]
+
+    def _timeout(self, timeout: Any) -> float | None:
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _version(self, version: int | None) -> int:
+        return self.version if version is None else version
+
+    def _l1_key(self, key: str, version: int | None) -> str:
+        l1_key = self.make_key(key, version=version)
+        self.validate_key(l1_key)
+        return l1_key
+
+    def _l1_get(self, key: str) -> Any:
+        pickled = self._l1.get(key)
+        if pickled is None:
+            self.stats.incr('l1_misses')
+            return _MISSING
+        self.stats.incr('l1_hits')
+        return pickle.loads(pickled)  # noqa: S301
+
+    def _l1_set(self, key: str, value: Any, timeout: float | None) -> None:
+        l1_timeout = self._l1_timeout if timeout is None else min(timeout, self._l1_timeout)
+        if l1_timeout <= 0:
+            self._l1.delete(key)
+            return
+        if evicted := self._l1.set(key, pickle.dumps(value, self.pickle_protocol), l1_timeout):
+            self.stats.incr('l1_evictions', evicted)
+
+    def add(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> bool:
+        l1_key = self._l1_key(key, version)
+        timeout = self._timeout(timeout)
+        added = self._l2.add(key, value, timeout=timeout, version=self._version(version))
+        if added:
+            self._l1_set(l1_key, value, timeout)
+        return added
+
+    def get(self, key: str, default: Any = None, version: int | None = None) -> Any:
+        l1_key = self._l1_key(key, version)
+        value = self._l1_get(l1_key)
+        if value is not _MISSING:
+            record_cache_access(hit=True)
+            return value
+        return self._from_l2(l1_key, self._l2.get(key, _MISSING, version=self._version(version)), default)
+
+    async def aget(self, key: str, default: Any = None, version: int | None = None) -> Any:
+        """Answers L1 hits on the event loop, only a miss goes to L2 (in a thread for most backends)."""
+        l1_key = self._l1_key(key, version)
+        value = self._l1_get(l1_key)
+        if value is not _MISSING:
+            record_cache_access(hit=True)
+            return value
+        return self._from_l2(l1_key, await self._l2.aget(key, _MISSING, version=self._version(version)), default)
+
+    def _from_l2(self, l1_key: str, value: Any, default: Any) -> Any:
+        if value is _MISSING:
+            self.stats.incr('l2_misses')
+            record_cache_access(hit=False)
+            return default
+        self.stats.incr('l2_hits')
+        record_cache_access(hit=True)
+        self._l1_set(l1_key, value, None)
+        return value
+
+    def set(self, key: str, value: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> None:
+        l1_key = self._l1_key(key, version)
+        timeout = self._timeout(timeout)
+        self._l2.set(key, value, timeout=timeout, version=self._version(version))
+        self._l1_set(l1_key, value, timeout)
+
+    def touch(self, key: str, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> bool:
+        timeout = self._timeout(timeout)
+        return self._l2.touch(key, timeout=timeout, version=self._version(version))
+
+    def delete(self, key: str, version: int | None = None) -> bool:  # pyright: ignore[reportIncompatibleMethodOverride]
+        self._l1.delete(self._l1_key(key, version))
+        # Django returns whether the key existed, the stubs still say None
+        return bool(self._l2.delete(key, version=self._version(version)))
+
+    def get_many(self, keys: Iterable[str], version: int | None = None) -> dict[str, Any]:
+        found, missing = self._get_many_from_l1(keys, version)
+        if missing:
+            self._many_from_l2(found, missing, self._l2.get_many(missing, version=self._version(version)))
+        record_cache_access(hit=True, count=len(found))
+        return found
+
+    async def aget_many(self, keys: Iterable[str], version: int | None = None) -> dict[str, Any]:
+        found, missing = self._get_many_from_l1(keys, version)
+        if missing:
+            self._many_from_l2(found, missing, await self._l2.aget_many(missing, version=self._version(version)))
+        record_cache_access(hit=True, count=len(found))
+        return found
+
+    def _get_many_from_l1(self, keys: Iterable[str], version: int | None) -> tuple[dict[str, Any], dict[str, str]]:
+        """Returns the values found in L1 and the L1 keys of the missing ones, both keyed by the given key."""
+        found = {}
+        missing = {}
+        for key in keys:
+            l1_key = self._l1_key(key, version)
+            value = self._l1_get(l1_key)
+            if value is _MISSING:
+                missing[key] = l1_key
+            else:
+                found[key] = value
+        return found, missing
+
+    def _many_from_l2(self, found: dict[str, Any], missing: dict[str, str], from_l2: dict[str, Any]) -> None:
+        self.stats.incr('l2_hits', len(from_l2))
+        self.stats.incr('l2_misses', len(missing) - len(from_l2))
+        for key, value in from_l2.items():
+            self._l1_set(missing[key], value, None)
+        record_cache_access(hit=False, count=len(missing) - len(from_l2))
+        found.update(from_l2)
+
+    def get_or_set(self, key: str, default: Any, timeout: Any = DEFAULT_TIMEOUT, version: int | None = None) -> Any:
+        """Like ``BaseCache.get_or_set()`` but a callable ``default`` runs once for concurrent misses of a key."""
+        if not callable(default):
+            return super().get_or_set(key, default, timeout=timeout, version=version)
+
+        value = self.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+
+        l1_key = self._l1_key(key, version)
+        value, shared = self._flight.do(l1_key, lambda: self._compute(key, default, timeout, version))
+        if shared:
+            self.stats.incr('coalesced')
+        return value
+
+    async def aget_or_set(
+        self,
+        key: str,
+        default: Any,
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: ASYNC109 matches the BaseCache signature
+        version: int | None = None,
+    ) -> Any:
+        value = await self.aget(key, _MISSING, version=version)
+        if value is not _MISSING:
+            return value
+        return await sync_to_async(self.get_or_set)(key, default, timeout=timeout, version=version)
+
+    def _compute(self, key: str, default: Callable[[], Any], timeout: Any, version: int | None) -> Any:
+        """Computes and stores ``default()`` unless another process is already doing so, then waits for its value."""
+        lock_key = f'{key}:lock'
+        l2_version = self._version(version)
+        locked = self._l2.add(lock_key, 1, timeout=self._lock_timeout, version=l2_version)  # pyright: ignore[reportArgumentType]
+        if not locked:
+            deadline = time.monotonic() + self._lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                value = self._l2.get(key, _MISSING, version=l2_version)
+                if value is not _MISSING:
+                    self.stats.incr('coalesced')
+                    self._l1_set(self._l1_key(key, version), value, None)
+                    return value
+            # the other process took too long or died, compute it ourselves rather than failing the request
+
+        try:
+            self.stats.incr('computations')
+            value = default()
+            self.set(key, value, timeout=timeout, version=version)
+        finally:
+            if locked:
+                self._l2.delete(lock_key, version=l2_version)
+        return value
+
+    def has_key(self, key: str, version: int | None = None) -> bool:
+        if self._l1.get(self._l1_key(key, version)) is not None:
+            return True
+        return self._l2.has_key(key, version=self._version(version))
+
+    def incr(self, key: str, delta: int = 1, version: int | None = None) -> int:
+        self._l1.delete(self._l1_key(key, version))
+        return self._l2.incr(key, delta=delta, version=self._version(version))
+
+    def decr(self, key: str, delta: int = 1, version: int | None = None) -> int:
+        self._l1.delete(self._l1_key(key, version))
+        return self._l2.decr(key, delta=delta, version=self._version(version))
+
+    def clear(self) -> None:
+        self._l1.clear()
+        self._l2.clear()
@@ -1,12 +1,17 @@
+from functools import cache
 from typing import Any
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.http import HttpRequest
 
 from config.settings.env import pydenset
 
 
-def common(_: HttpRequest) -> dict[str, Any]:
+@cache
+def _common_context() -> dict[str, Any]:
+    # only depends on settings, so it is built once per process instead of on every render
     context = {
         'DEBUG': settings.DEBUG,
     }
@@ -16,3 +21,13 @@ def common(_: HttpRequest) -> dict[str, Any]:
         context['VITE_URL'] = pydenset.VITE_URL
 
     return context
+
+
+@receiver(setting_changed)
+def reset_common_context(**_: Any) -> None:
+    _common_context.cache_clear()
+
+
+def common(_: HttpRequest) -> dict[str, Any]:
+    # RequestContext copies the returned values, the cached dictionary itself is never modified
+    return _common_context()
@@ -0,0 +1,161 @@
+"""Streaming CSV exports
+
+``csv_response`` returns a ``StreamingHttpResponse`` that writes the rows of a queryset as they are fetched, in chunks
+of ``chunk_size`` rows read with ``QuerySet.iterator`` (a server-side cursor on PostgreSQL), so memory use is the same
+for a thousand rows or ten million. Under ASGI it streams an asynchronous iterator that fetches each chunk through
+``sync_to_async`` instead: Django reads a synchronous iterator given to an ASGI response entirely into memory before
+sending it, and an asynchronous one given to a WSGI response likewise.
+
+``CSVExportView`` exports the queryset of a view. ``CSVExportAdminMixin`` adds an ``export/`` page to a ``ModelAdmin``
+exporting its changelist with the current filters, search and ordering, linked from the changelist, and an
+``Export selected as CSV`` action.
+
+The exports are meant to be opened in a spreadsheet, so text cells starting with a character a spreadsheet reads as
+the start of a formula (``=``, ``+``, ``-``, ``@``, tab or carriage return) are prefixed with ``'``. A username like
+``=HYPERLINK(...)`` then shows as text instead of running.
+"""
+
+import csv
+import io
+from collections.abc import AsyncIterator, Iterable, Iterator, Sequence
+from itertools import batched
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.contrib import admin
+from django.contrib.admin.utils import label_for_field
+from django.core.exceptions import ImproperlyConfigured, PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Model, QuerySet
+from django.http import HttpRequest, StreamingHttpResponse
+from django.urls import URLPattern, path
+from django.utils.text import capfirst, slugify
+from django.views import View
+
+# https://owasp.org/www-community/attacks/CSV_Injection
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def escape_formula(value: Any) -> Any:
+    """Prefixes text a spreadsheet would evaluate as a formula with ``'``, other values are returned as they are."""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class _Chunks:
+    """Serializes batches of rows to CSV text, reusing one buffer."""
+
+    def __init__(self) -> None:
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def __call__(self, rows: Iterable[Sequence[Any]]) -> str:
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerows([escape_formula(value) for value in row] for row in rows)
+        return self.buffer.getvalue()
+
+
+def header(model: type[Model], fields: Sequence[str]) -> list[str]:
+    return [capfirst(label_for_field(name, model)) for name in fields]  # pyright: ignore[reportArgumentType, reportReturnType]
+
+
+def csv_chunks(queryset: QuerySet, fields: Sequence[str], chunk_size: int = 2000) -> Iterator[str]:
+    """Yields the CSV text of the header and then of every ``chunk_size`` rows of ``queryset``."""
+    chunks = _Chunks()
+    yield chunks([header(queryset.model, fields)])
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    for batch in batched(rows, chunk_size, strict=False):
+        yield chunks(batch)
+
+
+async def acsv_chunks(queryset: QuerySet, fields: Sequence[str], chunk_size: int = 2000) -> AsyncIterator[str]:
+    """Same as ``csv_chunks``, producing each chunk in the thread of the database connection."""
+    # values_list().aiterator() runs its query on the event loop, so the sync generator is driven a chunk at a time
+    chunks = csv_chunks(queryset, fields, chunk_size)
+    while (chunk := await sync_to_async(next)(chunks, None)) is not None:
+        yield chunk
+
+
+def csv_response(
+    request: HttpRequest, queryset: QuerySet, fields: Sequence[str], filename: str, chunk_size: int = 2000
+) -> StreamingHttpResponse:
+    """Streams ``fields`` of ``queryset`` as a CSV attachment named ``filename``."""
+    chunks = acsv_chunks if isinstance(request, ASGIRequest) else csv_chunks
+    return StreamingHttpResponse(
+        # Django encodes str chunks, the stubs only accept bytes
+        chunks(queryset, fields, chunk_size),  # pyright: ignore[reportArgumentType]
+        content_type='text/csv; charset=utf-8',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+    )
+
+
+def export_filename(model: type[Model]) -> str:
+    return f'{slugify(str(model._meta.verbose_name_plural))}.csv'  # noqa: SLF001
+
+
+class CSVExportView(View):
+    """Exports ``fields`` of ``get_queryset()`` as a streamed CSV file.
+
+    Usage::
+
+        path('users.csv', CSVExportView.as_view(queryset=User.objects.order_by('pk'), fields=['username', 'email']))
+    """
+
+    queryset: QuerySet | None = None
+    fields: Sequence[str] = ()
+    filename: str | None = None
+    chunk_size = 2000
+
+    def get_queryset(self) -> QuerySet:
+        if self.queryset is None:
+            name = type(self).__name__
+            msg = f'{name} is missing a QuerySet. Define {name}.queryset or override {name}.get_queryset().'
+            raise ImproperlyConfigured(msg)
+        return self.queryset.all()
+
+    def get(self, request: HttpRequest, *_: Any, **__: Any) -> StreamingHttpResponse:
+        queryset = self.get_queryset()
+        filename = self.filename or export_filename(queryset.model)
+        return csv_response(request, queryset, self.fields, filename, self.chunk_size)
+
+
+class CSVExportAdminMixin:
+    """Streams the changelist of a ``ModelAdmin`` as CSV, see the module docstring.
+
+    ``export_fields`` are the exported fields, the ``list_display`` by default. The changelist template of the model
+    links to the export page with ``{% url cl.opts|admin_urlname:'export' %}{{ cl.get_query_string }}``.
+    """
+
+    export_fields: Sequence[str] | None = None
+    export_chunk_size = 2000
+    actions: Sequence[Any] | None = ('export_selected_csv',)
+
+    def get_export_fields(self, request: HttpRequest) -> Sequence[str]:
+        fields = self.export_fields or self.get_list_display(request)  # pyright: ignore[reportAttributeAccessIssue]
+        return [name for name in fields if name != 'action_checkbox']
+
+    def get_urls(self) -> list[URLPattern]:
+        opts = self.model._meta  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+        export = path(
+            'export/',
+            self.admin_site.admin_view(self.export_view),  # pyright: ignore[reportAttributeAccessIssue]
+            name=f'{opts.app_label}_{opts.model_name}_export',
+        )
+        return [export, *super().get_urls()]  # pyright: ignore[reportAttributeAccessIssue]
+
+    def export_view(self, request: HttpRequest) -> StreamingHttpResponse:
+        if not self.has_view_or_change_permission(request):  # pyright: ignore[reportAttributeAccessIssue]
+            raise PermissionDenied
+        # the changelist applies the filters, search and ordering of the query string
+        changelist = self.get_changelist_instance(request)  # pyright: ignore[reportAttributeAccessIssue]
+        return self.export_csv(request, changelist.get_queryset(request))
+
+    @admin.action(description='Export selected %(verbose_name_plural)s as CSV', permissions=['view'])
+    def export_selected_csv(self, request: HttpRequest, queryset: QuerySet) -> StreamingHttpResponse:
+        return self.export_csv(request, queryset)
+
+    def export_csv(self, request: HttpRequest, queryset: QuerySet) -> StreamingHttpResponse:
+        fields = self.get_export_fields(request)
+        return csv_response(request, queryset, fields, export_filename(queryset.model), self.export_chunk_size)
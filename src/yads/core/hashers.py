@@ -0,0 +1,131 @@
+"""Argon2 password hashing on a bounded process pool
+
+Argon2 is deliberately expensive: every login costs tens of milliseconds of CPU and memory, so a burst of logins
+saturates the worker that serves them. ``Argon2PasswordHasher`` takes its cost parameters from the settings
+(``PASSWORD_ARGON2_*``) and runs ``encode`` and ``verify`` on a pool of ``PASSWORD_HASHER_WORKERS`` processes. The
+calling thread waits for the result without holding the GIL and a burst queues on the pool instead of taking every
+CPU of the host. With ``PASSWORD_HASHER_WORKERS=0`` the hashing runs in the calling thread.
+
+The hasher keeps the ``argon2`` algorithm name, so the hashes made by Django's hasher still verify, and
+``must_update`` compares the parameters of a hash with the configured ones: changing the cost parameters upgrades each
+password on the next successful login.
+"""
+
+import logging
+import multiprocessing
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+import argon2
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.encoding import force_bytes
+
+log = logging.getLogger(__name__)
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _hash_secret(password: bytes, salt: bytes, params: argon2.Parameters) -> bytes:
+    return argon2.low_level.hash_secret(
+        password,
+        salt,
+        time_cost=params.time_cost,
+        memory_cost=params.memory_cost,
+        parallelism=params.parallelism,
+        hash_len=params.hash_len,
+        type=params.type,
+    )
+
+
+def _verify_secret(hash: str, password: str) -> bool:  # noqa: A002
+    try:
+        return argon2.PasswordHasher().verify(hash, password)
+    except argon2.exceptions.VerificationError:
+        return False
+
+
+def start_pool(workers: int) -> ProcessPoolExecutor:
+    # the workers only import this module, forking a process that runs threads could copy a held lock
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('forkserver'))
+
+
+def get_pool() -> ProcessPoolExecutor | None:
+    """Returns the hashing pool of this process, started on first use, or ``None`` when hashing runs inline."""
+    global _pool  # noqa: PLW0603
+    if not settings.PASSWORD_HASHER_WORKERS:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = start_pool(settings.PASSWORD_HASHER_WORKERS)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+@receiver(setting_changed)
+def reset_pool(*, setting: str, **_: Any) -> None:
+    if setting == 'PASSWORD_HASHER_WORKERS':
+        shutdown_pool()
+
+
+def _run(func: Callable[..., Any], *args: Any) -> Any:
+    pool = get_pool()
+    if pool is None:
+        return func(*args)
+    try:
+        return pool.submit(func, *args).result()
+    except BrokenProcessPool:
+        # a worker died (e.g. killed for using too much memory), start a new pool for the next call
+        log.exception('Password hashing pool is broken, hashing in the calling thread')
+        shutdown_pool()
+        return func(*args)
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    @property
+    def time_cost(self) -> int:  # pyright: ignore[reportIncompatibleVariableOverride]
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:  # pyright: ignore[reportIncompatibleVariableOverride]
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:  # pyright: ignore[reportIncompatibleVariableOverride]
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+    def encode(self, password: str, salt: str) -> str:
+        data = _run(_hash_secret, force_bytes(password), force_bytes(salt), self.params())  # pyright: ignore[reportAttributeAccessIssue]
+        return self.algorithm + data.decode('ascii')
+
+    def verify(self, password: str, encoded: str) -> bool:
+        algorithm, rest = encoded.split('$', 1)
+        assert algorithm == self.algorithm  # noqa: S101
+        return _run(_verify_secret, '$' + rest, password)
+
+
+def make_passwords(passwords: Iterable[str], pool: ProcessPoolExecutor | None = None) -> list[str]:
+    """Hashes passwords with the default hasher, in parallel on ``pool`` (or the hashing pool) when it is Argon2."""
+    hasher = hashers.get_hasher()
+    pool = pool or get_pool()
+    if pool is None or not isinstance(hasher, Argon2PasswordHasher):
+        return [hashers.make_password(password) for password in passwords]
+
+    params = hasher.params()  # pyright: ignore[reportAttributeAccessIssue]
+    futures = [
+        pool.submit(_hash_secret, force_bytes(password), force_bytes(hasher.salt()), params) for password in passwords
+    ]
+    return [hasher.algorithm + future.result().decode('ascii') for future in futures]
@@ -0,0 +1,143 @@
+"""Health and readiness probes
+
+``HealthCheckApplication`` answers the probes of load balancers and orchestrators at the ASGI layer, before Django's
+request handling, middleware and URL resolving:
+
+- ``/api/healthz`` (liveness) answers ``200 ok`` straight away, it only shows that the worker's event loop runs.
+- ``/api/readyz`` (readiness) checks that the database answers a ``SELECT 1`` and that the shared cache (the L2 behind
+  the per-process cache) stores and returns a value. It answers ``200`` when both pass and ``503`` otherwise, with the
+  result of each check as JSON.
+
+The readiness checks run on a private thread pool of ``len(CHECKS)`` threads, so probes use at most that many
+database connections per worker whatever their rate, each closed or kept afterwards like the connection of a request
+(``CONN_MAX_AGE``, pool). Every check gets ``HEALTH_CHECK_TIMEOUT`` seconds, and the result is reused for
+``HEALTH_READY_TTL`` seconds, failures included, so a struggling database isn't probed harder. Concurrent probes
+wait for the one check in flight instead of starting their own. A check that timed out keeps its thread until it
+returns, so it isn't started again before then: the probes report it as ``timeout`` meanwhile, and the other checks
+still have a thread to run on.
+
+The probes are only answered by the ASGI application, ``runserver`` doesn't serve them.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+from yads.core.asgi import ASGIApp, Receive, Scope, Send
+
+log = logging.getLogger(__name__)
+
+LIVENESS_PATH = '/api/healthz'
+READINESS_PATH = '/api/readyz'
+
+
+def check_database() -> None:
+    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def check_cache() -> None:
+    cache = caches[DEFAULT_CACHE_ALIAS]
+    # the shared cache behind the per-process L1, which would always answer
+    cache = getattr(cache, '_l2', cache)
+    value = secrets.token_hex(8)
+    cache.set('health:ready', value, 60)
+    if cache.get('health:ready') != value:
+        msg = 'the cache did not return the value stored'
+        raise RuntimeError(msg)
+
+
+CHECKS: dict[str, Callable[[], None]] = {
+    'database': check_database,
+    'cache': check_cache,
+}
+
+_executor = ThreadPoolExecutor(max_workers=len(CHECKS), thread_name_prefix='health')
+
+
+def _run_check(check: Callable[[], None]) -> None:
+    try:
+        check()
+    finally:
+        # closes the connection when CONN_MAX_AGE is 0 or it broke, returns it to the pool with DB_POOL
+        close_old_connections()
+
+
+class Readiness:
+    """Runs ``CHECKS`` and caches their result, see the module docstring."""
+
+    def __init__(self) -> None:
+        self.result: dict[str, str] = {}
+        self.expires = 0.0
+        self._lock = asyncio.Lock()
+        self._running: dict[str, Future] = {}  # the last run of each check, which may outlive its timeout
+
+    @property
+    def ready(self) -> bool:
+        return all(status == 'ok' for status in self.result.values())
+
+    async def check(self) -> dict[str, str]:
+        if time.monotonic() < self.expires:
+            return self.result
+        async with self._lock:
+            if time.monotonic() < self.expires:
+                return self.result
+            statuses = await asyncio.gather(*(self._check(name, check) for name, check in CHECKS.items()))
+            self.result = dict(zip(CHECKS, statuses, strict=True))
+            self.expires = time.monotonic() + settings.HEALTH_READY_TTL
+        return self.result
+
+    async def _check(self, name: str, check: Callable[[], None]) -> str:
+        previous = self._running.get(name)
+        if previous is not None and not previous.done():
+            log.warning('Readiness check %s is still running after timing out', name)
+            return 'timeout'
+        self._running[name] = future = _executor.submit(_run_check, check)
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(future), settings.HEALTH_CHECK_TIMEOUT)
+        except TimeoutError:
+            log.warning('Readiness check %s timed out after %ss', name, settings.HEALTH_CHECK_TIMEOUT)
+            return 'timeout'
+        # any failure of a check makes the worker unready
+        except Exception as e:  # noqa: BLE001
+            log.warning('Readiness check %s failed: %r', name, e)
+            return f'error: {type(e).__name__}'
+        return 'ok'
+
+
+class HealthCheckApplication:
+    """Answers the probes of the module docstring and passes every other request on to ``app``."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.readiness = Readiness()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http' or scope['path'] not in {LIVENESS_PATH, READINESS_PATH}:
+            return await self.app(scope, receive, send)
+
+        if scope['path'] == LIVENESS_PATH:
+            return await self._respond(scope, send, 200, b'ok', b'text/plain')
+
+        result = await self.readiness.check()
+        status = 200 if self.readiness.ready else 503
+        return await self._respond(scope, send, status, json.dumps(result).encode(), b'application/json')
+
+    @staticmethod
+    async def _respond(scope: Scope, send: Send, status: int, body: bytes, content_type: bytes) -> None:
+        headers: list[Any] = [
+            (b'content-type', content_type),
+            (b'content-length', str(len(body)).encode()),
+            (b'cache-control', b'no-store'),
+        ]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
@@ -0,0 +1,185 @@
+"""Per-request performance metrics
+
+``InstrumentationMiddleware`` (see ``yads.core.middleware``) creates a ``RequestMetrics`` for every sampled request
+and publishes it through the ``current_metrics`` context variable. Database queries, template renders and cache
+lookups made while handling the request are added to it from here. With ``INSTRUMENTATION_CONTEXT_PROCESSORS`` on,
+the time spent in each template context processor is recorded as well.
+"""
+
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from typing import Any
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest
+from django.template import engines
+from django.template.backends.django import DjangoTemplates, Template
+
+current_metrics: ContextVar['RequestMetrics | None'] = ContextVar('current_metrics', default=None)
+
+
+@dataclass
+class RequestMetrics:
+    start: float = field(default_factory=time.perf_counter)
+    db_queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    template_depth: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    context_processors: dict[str, float] = field(default_factory=dict)  # seconds spent per processor
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    def server_timing(self) -> str:
+        """Formats the metrics as a ``Server-Timing`` header value, durations in milliseconds."""
+        return ', '.join(
+            [
+                f'total;dur={self.elapsed * 1000:.1f}',
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.db_queries} queries"',
+                f'tpl;dur={self.template_time * 1000:.1f}',
+                f'cache;desc="{self.cache_hits} hits / {self.cache_misses} misses"',
+                *(
+                    f'ctx.{name.rpartition(".")[2]};dur={duration * 1000:.2f};desc="{name}"'
+                    for name, duration in self.context_processors.items()
+                ),
+            ]
+        )
+
+    def as_log_fields(self) -> dict[str, Any]:
+        return {
+            'duration_ms': round(self.elapsed * 1000, 3),
+            'db_queries': self.db_queries,
+            'db_ms': round(self.db_time * 1000, 3),
+            'template_ms': round(self.template_time * 1000, 3),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            **(
+                {'context_processors_ms': {name: round(t * 1000, 3) for name, t in self.context_processors.items()}}
+                if self.context_processors
+                else {}
+            ),
+        }
+
+
+# Database connections are per thread and async views run their queries in a thread of their own, so wrappers are
+# kept in a context variable, which ``sync_to_async`` carries over, and applied by a dispatcher every connection gets.
+_execute_wrappers: ContextVar[tuple[Callable, ...]] = ContextVar('execute_wrappers', default=())
+
+
+def _execute(execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:  # noqa: FBT001
+    for wrapper in reversed(_execute_wrappers.get()):
+        execute = partial(wrapper, execute)
+    return execute(sql, params, many, context)
+
+
+def install_execute_dispatcher(*, connection: BaseDatabaseWrapper, **_: Any) -> None:
+    """Adds the wrapper dispatcher to ``connection``, connected to ``connection_created`` in ``CoreConfig.ready``."""
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@contextmanager
+def execute_wrapper_all(wrapper: Callable) -> Iterator[None]:
+    """Runs the queries executed inside the block, in this thread or in ``sync_to_async`` calls, through ``wrapper``.
+
+    Works like ``connection.execute_wrapper()`` on every database connection.
+    See https://docs.djangoproject.com/en/5.1/topics/db/instrumentation/
+    """
+    for connection in connections.all(initialized_only=True):
+        install_execute_dispatcher(connection=connection)
+    token = _execute_wrappers.set((*_execute_wrappers.get(), wrapper))
+    try:
+        yield
+    finally:
+        _execute_wrappers.reset(token)
+
+
+def _time_query(metrics: RequestMetrics) -> Callable:
+    def wrapper(execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:  # noqa: FBT001
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+    return wrapper
+
+
+@contextmanager
+def time_queries(metrics: RequestMetrics) -> Iterator[None]:
+    """Counts and times the queries executed inside the block."""
+    with execute_wrapper_all(_time_query(metrics)):
+        yield
+
+
+def record_cache_access(*, hit: bool, count: int = 1) -> None:
+    if (metrics := current_metrics.get()) is not None:
+        if hit:
+            metrics.cache_hits += count
+        else:
+            metrics.cache_misses += count
+
+
+_original_render = Template.render
+
+
+def _instrumented_render(self: Template, *args: Any, **kwargs: Any) -> Any:
+    metrics = current_metrics.get()
+    if metrics is None:
+        return _original_render(self, *args, **kwargs)
+
+    # only the outermost render is timed, nested renders are part of its time already
+    metrics.template_depth += 1
+    start = time.perf_counter()
+    try:
+        return _original_render(self, *args, **kwargs)
+    finally:
+        metrics.template_depth -= 1
+        if not metrics.template_depth:
+            metrics.template_time += time.perf_counter() - start
+
+
+def _timed_context_processor(processor: Callable) -> Callable:
+    name = f'{processor.__module__}.{processor.__qualname__}'
+
+    @wraps(processor)
+    def wrapper(request: HttpRequest) -> dict[str, Any]:
+        if (metrics := current_metrics.get()) is None:
+            return processor(request)
+        start = time.perf_counter()
+        try:
+            return processor(request)
+        finally:
+            metrics.context_processors[name] = metrics.context_processors.get(name, 0) + time.perf_counter() - start
+
+    return wrapper
+
+
+def profile_context_processors(*, enabled: bool) -> None:
+    """Wraps (or unwraps) the context processors of every Django template engine with a timer."""
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        # ``template_context_processors`` is a cached property, its cached value is replaced or dropped
+        backend.engine.__dict__.pop('template_context_processors', None)
+        if enabled:
+            processors = backend.engine.template_context_processors
+            backend.engine.template_context_processors = tuple(  # pyright: ignore[reportAttributeAccessIssue]
+                _timed_context_processor(p) for p in processors
+            )
+
+
+def install() -> None:
+    """Times the rendering of Django templates and optionally context processors, safe to call more than once."""
+    Template.render = _instrumented_render
+    profile_context_processors(enabled=settings.INSTRUMENTATION_CONTEXT_PROCESSORS)
@@ -0,0 +1,114 @@
+"""Structured, non-blocking logging
+
+With ``LOG_QUEUE_SIZE`` above 0 the ``console`` handler of ``LOGGING`` is a ``QueueHandler``: the thread that logs
+only merges the message with its arguments and puts the record on a bounded queue, a ``QueueListener`` thread
+formats and writes it. A slow stdout pipe then no longer stalls request handling. When the queue is full the record
+is dropped and counted in ``QueueHandler.dropped``, and a warning with the number of dropped records is logged once
+the queue has room again.
+
+``LOG_FORMAT=json`` writes every record as one line of JSON with ``JSONFormatter``. ``RequestContextFilter`` adds the
+id of the current request and of its user to the records (``request_id`` and ``user_id``), set by
+``yads.core.middleware.RequestContextMiddleware``. Fields passed with ``extra``, such as the ``status`` and
+``duration_ms`` of the request lines of ``InstrumentationMiddleware``, become fields of the JSON object.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from typing import Any
+
+from django.http import HttpRequest
+
+current_request: ContextVar[HttpRequest | None] = ContextVar('current_request', default=None)
+
+# attributes every LogRecord has, the others were passed with `extra`
+RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime', 'request_id', 'user_id'}
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds ``request_id`` and ``user_id`` of the current request to the records, ``None`` outside requests."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request = current_request.get()
+        record.request_id = getattr(request, 'id', None)
+        # only a user the request has loaded already, logging must not query the database
+        user = (request.__dict__.get('_cached_user') or request.__dict__.get('_acached_user')) if request else None
+        record.user_id = getattr(user, 'pk', None)
+        return True
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats a record as a JSON object on one line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created, UTC).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'user_id': getattr(record, 'user_id', None),
+        }
+        data.update((key, value) for key, value in record.__dict__.items() if key not in RECORD_ATTRIBUTES)
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(data, default=str, ensure_ascii=False)
+
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Queues the records without formatting them and drops them when the queue is full."""
+
+    def __init__(self, queue: queue.Queue) -> None:
+        super().__init__(queue)
+        self.dropped = 0
+        self.reported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the arguments may change once the call returns, the traceback is formatted by the listener
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+
+        if self.dropped > self.reported:
+            dropped, self.reported = self.dropped - self.reported, self.dropped
+            warning = logging.makeLogRecord(
+                {
+                    'name': __name__,
+                    'levelno': logging.WARNING,
+                    'levelname': 'WARNING',
+                    'msg': f'Dropped {dropped} log records, the log queue was full',
+                    'dropped': dropped,
+                }
+            )
+            try:
+                self.queue.put_nowait(warning)
+            except queue.Full:
+                self.reported -= dropped
+
+
+class QueueListener(logging.handlers.QueueListener):
+    """Writes the queued records from a thread started with the logging configuration and stopped at exit."""
+
+    def __init__(self, queue: queue.Queue, *handlers: logging.Handler, respect_handler_level: bool = False) -> None:
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.start()
+        atexit.register(self.stop)
+
+    def enqueue_sentinel(self) -> None:
+        # waits for room instead of failing on a full queue, the thread is emptying it
+        self.queue.put(self._sentinel)  # pyright: ignore[reportAttributeAccessIssue]
@@ -0,0 +1,30 @@
+import time
+from contextlib import nullcontext
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from yads.core.user_io import export_users, format_for
+
+
+class Command(BaseCommand):
+    help = 'Writes all users to a CSV or JSON lines file that import_users reads.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', nargs='?', default='-', help='file to write, - (the default) writes to stdout')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='defaults to the extension of the file, or csv')
+        parser.add_argument('--batch-size', type=int, default=2000, help='number of users fetched at a time')
+        parser.add_argument('--passwords', action='store_true', help='include the password hashes')
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        path = options['path']
+        fmt = options['format'] or format_for(path)
+        start = time.perf_counter()
+        total = 0
+        output = nullcontext(self.stdout) if path == '-' else open(path, 'w', newline='', encoding='utf-8')  # noqa: PTH123, SIM115
+        with output as stream:
+            for count in export_users(stream, fmt, passwords=options['passwords'], batch_size=options['batch_size']):
+                total += count
+                self.stderr.write(f'{total} users exported ({total / (time.perf_counter() - start):.0f}/s)')
+
+        self.stderr.write(self.style.SUCCESS(f'Exported {total} users in {time.perf_counter() - start:.1f}s'))
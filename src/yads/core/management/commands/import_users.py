@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+from contextlib import nullcontext
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+
+from yads.core.hashers import start_pool
+from yads.core.user_io import format_for, import_users, read_records
+
+
+class Command(BaseCommand):
+    help = 'Creates users from a CSV or JSON lines file, see yads.core.user_io for the fields.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('path', help='file to read, - reads standard input')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help='defaults to the extension of the file, or csv')
+        parser.add_argument('--batch-size', type=int, default=1000, help='number of users saved per transaction')
+        parser.add_argument('--skip-existing', action='store_true', help='skip the users whose username is taken')
+        parser.add_argument('--no-copy', action='store_true', help='use INSERT instead of COPY on PostgreSQL')
+        parser.add_argument(
+            '--hash-workers', type=int, default=os.cpu_count() or 1, help='processes hashing the raw passwords'
+        )
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        path = options['path']
+        fmt = options['format'] or format_for(path)
+        start = time.perf_counter()
+        total = 0
+        with (
+            nullcontext(sys.stdin) if path == '-' else open(path, newline='', encoding='utf-8') as stream,  # noqa: PTH123
+            start_pool(options['hash_workers']) as pool,
+        ):
+            batches = import_users(
+                read_records(stream, fmt),
+                batch_size=options['batch_size'],
+                skip_existing=options['skip_existing'],
+                use_copy=not options['no_copy'],
+                pool=pool,
+            )
+            try:
+                for count in batches:
+                    total += count
+                    elapsed = time.perf_counter() - start
+                    self.stderr.write(f'{total} users imported ({total / elapsed:.0f}/s)')
+            except ValueError as e:
+                msg = f'{e}, {total} users were imported before it'
+                raise CommandError(msg) from e
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {total} users in {time.perf_counter() - start:.1f}s'))
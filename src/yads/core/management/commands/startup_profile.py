@@ -0,0 +1,38 @@
+import os
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from yads.core.startup import ImportNode, profile_startup
+
+
+class Command(BaseCommand):
+    help = 'Reports where the startup time of a new process goes: the setup phases of Django and the import tree.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--min-ms', type=float, default=5.0, help='hide imports that took less, 0 lists all')
+        parser.add_argument('--depth', type=int, default=4, help='levels of the import tree to show')
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        profile = profile_startup(os.environ['DJANGO_SETTINGS_MODULE'], settings.BASE_DIR)
+
+        self.stdout.write(f'Setup of {os.environ["DJANGO_SETTINGS_MODULE"]}')
+        for phase, seconds in profile.phases.items():
+            self.stdout.write(f'{seconds * 1000:10.1f}ms  {phase}')
+            if phase == 'ready':
+                for label, ready in sorted(profile.ready.items(), key=lambda item: item[1], reverse=True):
+                    self.stdout.write(f'{ready * 1000:10.1f}ms    {label}')
+
+        self.stdout.write('\nImports, cumulative time of the module and the modules it imported')
+        self.write_tree(profile.imports, options['min_ms'], options['depth'])
+
+        self.stdout.write(self.style.SUCCESS(f'\nSet up Django in {profile.total * 1000:.0f}ms'))
+
+    def write_tree(self, nodes: list[ImportNode], min_ms: float, depth: int, level: int = 0) -> None:
+        for node in sorted(nodes, key=lambda node: node.cumulative_us, reverse=True):
+            if node.cumulative_us / 1000 < min_ms:
+                break
+            self.stdout.write(f'{node.cumulative_us / 1000:10.1f}ms  {"  " * level}{node.name}')
+            if level + 1 < depth:
+                self.write_tree(node.children, min_ms, depth, level + 1)
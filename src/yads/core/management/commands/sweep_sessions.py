@@ -0,0 +1,22 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from yads.core.sessions import session_model, sweep_expired_sessions
+
+
+class Command(BaseCommand):
+    help = 'Deletes the expired sessions from the database in small batches.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int, default=1000, help='number of sessions deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.1, help='seconds to sleep between two batches')
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        if session_model() is None:
+            self.stdout.write(f'{settings.SESSION_ENGINE} does not store sessions in the database, nothing to sweep')
+            return
+
+        deleted = sweep_expired_sessions(options['batch_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired sessions'))
@@ -0,0 +1,46 @@
+import signal
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from yads.core.tasks import Worker
+
+
+class Command(BaseCommand):
+    help = 'Runs the tasks enqueued on the database task backend until stopped with SIGINT or SIGTERM.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--backend', default='default', help='alias of the task backend in TASKS')
+        parser.add_argument('--queue', action='append', dest='queues', default=[], help='run only the tasks of it')
+        parser.add_argument('--concurrency', type=int, default=settings.TASK_WORKER_CONCURRENCY)
+        parser.add_argument('--batch-size', type=int, help='tasks claimed at once, the concurrency by default')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='seconds between polls when idle')
+        parser.add_argument('--asyncio', action='store_true', help='run coroutine tasks in an event loop')
+        parser.add_argument('--stats-interval', type=float, default=60.0, help='seconds between throughput logs')
+        parser.add_argument('--burst', action='store_true', help='exit once no task is ready')
+        parser.add_argument('--max-tasks', type=int, help='exit after running this many tasks')
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        worker = Worker(
+            options['backend'],
+            queues=options['queues'],
+            concurrency=options['concurrency'],
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            use_asyncio=options['asyncio'],
+            stats_interval=options['stats_interval'],
+        )
+        # finish the running tasks before exiting, like the web workers finish their requests
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: worker.stop())
+
+        stats = worker.run(burst=options['burst'], max_tasks=options['max_tasks'])
+
+        fields = stats.as_log_fields()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Ran {stats.finished} tasks: {stats.succeeded} succeeded, {stats.failed} failed, '
+                f'{stats.retried} to be retried ({fields["tasks_per_second"]} tasks/s)'
+            )
+        )
@@ -0,0 +1,21 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from yads.core.warmup import compile_templates
+
+
+class Command(BaseCommand):
+    help = 'Compiles every template and reports the compile time of each, slowest first.'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--limit', type=int, default=20, help='number of templates to list, 0 lists all')
+
+    def handle(self, *_: Any, **options: Any) -> None:
+        compiled = sorted(compile_templates(), key=lambda c: c.seconds, reverse=True)
+        for template in compiled[: options['limit'] or None]:
+            partials = f' ({template.partials} partials)' if template.partials else ''
+            self.stdout.write(f'{template.seconds * 1000:8.2f}ms  {template.engine}:{template.name}{partials}')
+
+        total = sum(template.seconds for template in compiled)
+        self.stdout.write(self.style.SUCCESS(f'Compiled {len(compiled)} templates in {total * 1000:.0f}ms'))
@@ -0,0 +1,197 @@
+import logging
+import random
+import re
+import uuid
+from collections.abc import Awaitable, Callable
+from contextvars import Token
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+
+from yads.core import instrumentation
+from yads.core.instrumentation import RequestMetrics, current_metrics
+from yads.core.log import current_request
+from yads.core.query_budget import QueryBudgetExceeded, QueryRecorder, record_queries, view_budget
+
+log = logging.getLogger(__name__)
+
+# request ids accepted from a proxy, anything else is replaced
+REQUEST_ID_RE = re.compile(r'[\w.:-]{1,64}', re.ASCII)
+
+
+class RequestContextMiddleware:
+    """Gives every request an id and publishes the request to the log records, see ``yads.core.log``.
+
+    The id is the ``X-Request-ID`` header set by a proxy or load balancer, or a new random one, and is returned in the
+    ``X-Request-ID`` response header. Place it first in ``MIDDLEWARE`` so the records of all other middleware have it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self.process_request(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+        response['X-Request-ID'] = request.id  # pyright: ignore[reportAttributeAccessIssue]
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        token = self.process_request(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+        response['X-Request-ID'] = request.id  # pyright: ignore[reportAttributeAccessIssue]
+        return response
+
+    @staticmethod
+    def process_request(request: HttpRequest) -> Token:
+        request_id = request.headers.get('X-Request-ID', '')
+        if not REQUEST_ID_RE.fullmatch(request_id):
+            request_id = uuid.uuid4().hex
+        request.id = request_id  # pyright: ignore[reportAttributeAccessIssue]
+        return current_request.set(request)
+
+
+class InstrumentationMiddleware:
+    """Measures total time, database queries, template rendering and cache lookups of sampled requests.
+
+    A fraction ``INSTRUMENTATION_SAMPLE_RATE`` of the requests is measured. The metrics of those requests are logged
+    as structured fields of a ``yads.core.middleware`` record and, with ``INSTRUMENTATION_SERVER_TIMING`` on, added to
+    the response as a ``Server-Timing`` header so they show up in the browser's network panel. The header reveals
+    query counts and timings, so it is only sent with ``DEBUG`` on, to ``INTERNAL_IPS`` and to staff users.
+
+    Place it first in ``MIDDLEWARE`` so the time spent in all other middleware is included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        instrumentation.install()
+
+    def _sampled(self) -> bool:
+        rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        return rate >= 1 or random.random() < rate  # noqa: S311
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with instrumentation.time_queries(metrics):
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        if not self._sampled():
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with instrumentation.time_queries(metrics):
+                response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.process_response(request, response, metrics)
+
+    @staticmethod
+    def shows_server_timing(request: HttpRequest) -> bool:
+        if not settings.INSTRUMENTATION_SERVER_TIMING:
+            return False
+        if settings.DEBUG or request.META.get('REMOTE_ADDR') in settings.INTERNAL_IPS:
+            return True
+        # only a user the request has loaded already, the header must not cost a query
+        user = request.__dict__.get('_cached_user') or request.__dict__.get('_acached_user')
+        return bool(getattr(user, 'is_staff', False))
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponseBase, metrics: RequestMetrics
+    ) -> HttpResponseBase:
+        if self.shows_server_timing(request):
+            response['Server-Timing'] = metrics.server_timing()
+
+        fields = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **metrics.as_log_fields(),
+        }
+        log.info(
+            '%s %s %s %.1fms',
+            request.method,
+            request.path,
+            response.status_code,
+            fields['duration_ms'],
+            extra=fields,
+        )
+        return response
+
+
+class QueryBudgetMiddleware:
+    """Checks every request against the query budget of its view, see ``yads.core.query_budget``.
+
+    Requests over budget are logged as warnings with the repeated query shapes, or fail with ``QueryBudgetExceeded``
+    when ``QUERY_BUDGET_RAISE`` is on.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable) -> None:
+        if not settings.QUERY_BUDGET:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.async_mode:
+            return self.__acall__(request)
+        with record_queries() as recorder:
+            response = self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        with record_queries() as recorder:
+            response = await self.get_response(request)
+        self.check(request, recorder)
+        return response
+
+    def check(self, request: HttpRequest, recorder: QueryRecorder) -> None:
+        match = request.resolver_match
+        if not (problems := recorder.violations(view_budget(match.func if match else None))):
+            return
+
+        view = match.view_name if match else request.path
+        msg = f'{request.method} {request.path} ({view}) is over its query budget: ' + '; '.join(problems)
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(msg)
+        log.warning(msg, extra={'path': request.path, 'view': view, 'db_queries': len(recorder)})
@@ -0,0 +1,62 @@
+from django.db import migrations, models
+
+DATE_JOINED_INDEX = models.Index(fields=["date_joined", "id"], name="core_user_date_joined_id_idx")
+
+# Trigram indexes for the admin search, matching the UPPER(column::text) LIKE UPPER('%term%') of icontains lookups
+TRIGRAM_INDEXES = {
+    "core_user_username_trgm": "username",
+    "core_user_email_trgm": "email",
+}
+
+
+def add_date_joined_index(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    if schema_editor.connection.vendor == "postgresql":
+        # without locking out writes to the table while the index is built
+        schema_editor.execute(DATE_JOINED_INDEX.create_sql(User, schema_editor, concurrently=True))  # pyright: ignore[reportCallIssue]
+    else:
+        schema_editor.add_index(User, DATE_JOINED_INDEX)
+
+
+def remove_date_joined_index(apps, schema_editor):
+    User = apps.get_model("core", "User")
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(DATE_JOINED_INDEX.remove_sql(User, schema_editor, concurrently=True))  # pyright: ignore[reportCallIssue]
+    else:
+        schema_editor.remove_index(User, DATE_JOINED_INDEX)
+
+
+def add_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    table = schema_editor.quote_name(apps.get_model("core", "User")._meta.db_table)
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, column in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {schema_editor.quote_name(name)} "
+            f"ON {table} USING gin (UPPER({schema_editor.quote_name(column)}::text) gin_trgm_ops)"
+        )
+
+
+def remove_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[migrations.AddIndex(model_name="user", index=DATE_JOINED_INDEX)],
+            database_operations=[migrations.RunPython(add_date_joined_index, remove_date_joined_index)],
+        ),
+        migrations.RunPython(add_trigram_indexes, remove_trigram_indexes),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 6.0.1 on 2026-10-18 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0002_user_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskRecord",
+            fields=[
+                ("id", models.CharField(editable=False, max_length=32, primary_key=True, serialize=False)),
+                ("task_path", models.CharField(max_length=255)),
+                ("backend", models.CharField(max_length=100)),
+                ("queue_name", models.CharField(max_length=100)),
+                ("priority", models.SmallIntegerField(default=0)),
+                ("takes_context", models.BooleanField(default=False)),
+                ("status", models.CharField(choices=[("READY", "Ready"), ("RUNNING", "Running"), ("FAILED", "Failed"), ("SUCCESSFUL", "Successful")], default="READY", max_length=10)),
+                ("args", models.JSONField(default=list)),
+                ("kwargs", models.JSONField(default=dict)),
+                ("return_value", models.JSONField(null=True)),
+                ("errors", models.JSONField(default=list)),
+                ("worker_ids", models.JSONField(default=list)),
+                ("run_after", models.DateTimeField()),
+                ("enqueued_at", models.DateTimeField()),
+                ("started_at", models.DateTimeField(null=True)),
+                ("last_attempted_at", models.DateTimeField(null=True)),
+                ("finished_at", models.DateTimeField(null=True)),
+            ],
+            options={
+                "verbose_name": "task",
+                "indexes": [models.Index(condition=models.Q(("status", "READY")), fields=["queue_name", "-priority", "run_after"], name="core_task_ready_idx")],
+            },
+        ),
+    ]
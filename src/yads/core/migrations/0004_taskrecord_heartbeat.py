@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-18 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_taskrecord"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="taskrecord",
+            name="heartbeat_at",
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name="taskrecord",
+            index=models.Index(condition=models.Q(("status", "RUNNING")), fields=["heartbeat_at"], name="core_task_running_idx"),
+        ),
+    ]
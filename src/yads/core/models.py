@@ -1,5 +1,50 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.tasks import TaskResultStatus  # pyright: ignore[reportMissingImports]
 
 
 class User(AbstractUser):
-    pass
+    class Meta(AbstractUser.Meta):  # pyright: ignore[reportAttributeAccessIssue]
+        indexes = (
+            # ordering and cursor of the admin changelist, see yads.core.admin
+            models.Index(fields=['date_joined', 'id'], name='core_user_date_joined_id_idx'),
+        )
+
+
+class TaskRecord(models.Model):
+    """A task enqueued on the database task backend, see ``yads.core.tasks``."""
+
+    id = models.CharField(primary_key=True, max_length=32, editable=False)
+    task_path = models.CharField(max_length=255)
+    backend = models.CharField(max_length=100)
+    queue_name = models.CharField(max_length=100)
+    priority = models.SmallIntegerField(default=0)
+    takes_context = models.BooleanField(default=False)
+    status = models.CharField(max_length=10, choices=TaskResultStatus, default=TaskResultStatus.READY)
+    args = models.JSONField(default=list)
+    kwargs = models.JSONField(default=dict)
+    return_value = models.JSONField(null=True)
+    errors = models.JSONField(default=list)  # {'exception_class_path': ..., 'traceback': ...} of every failed attempt
+    worker_ids = models.JSONField(default=list)  # one per attempt
+    run_after = models.DateTimeField()  # when the next attempt can start, the enqueue time unless deferred
+    enqueued_at = models.DateTimeField()
+    started_at = models.DateTimeField(null=True)
+    last_attempted_at = models.DateTimeField(null=True)
+    finished_at = models.DateTimeField(null=True)
+    heartbeat_at = models.DateTimeField(null=True)  # renewed by the worker running the task, see Worker.heartbeat()
+
+    class Meta:
+        verbose_name = 'task'
+        indexes = (
+            # the tasks the workers claim, most important first
+            models.Index(
+                fields=['queue_name', '-priority', 'run_after'],
+                condition=models.Q(status='READY'),
+                name='core_task_ready_idx',
+            ),
+            # the running tasks whose lease the workers reclaim
+            models.Index(fields=['heartbeat_at'], condition=models.Q(status='RUNNING'), name='core_task_running_idx'),
+        )
+
+    def __str__(self) -> str:
+        return f'{self.task_path} {self.id} ({self.status})'
@@ -0,0 +1,162 @@
+"""Pagination for very large tables
+
+``EstimatedCountPaginator`` answers ``count`` for an unfiltered queryset from PostgreSQL's planner statistics
+(``pg_class.reltuples``) once the estimate is above ``estimate_above`` rows, instead of running ``COUNT(*)`` over the
+whole table. Filtered querysets, small tables and other databases are counted exactly.
+
+``KeysetChangeList`` pages an admin changelist with a cursor instead of an offset: the link to the next page carries
+the ordering values of the last row shown and the page is selected with ``WHERE (date_joined, id) < (cursor)``, which
+an index on the ordering fields answers without reading the rows of the previous pages. It is used while the list is
+in the default ordering of the ``ModelAdmin`` (every field in the same direction and ending with the primary key),
+sorting by a column falls back to the numbered pages::
+
+    class UserAdmin(admin.ModelAdmin):
+        ordering = ('-date_joined', '-id')
+        paginator = EstimatedCountPaginator
+        show_full_result_count = False
+
+        def get_changelist(self, request, **kwargs):
+            return KeysetChangeList
+"""
+
+import json
+from functools import cached_property, reduce
+from operator import or_
+from typing import Any
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Field, Q, QuerySet
+from django.http import HttpRequest
+
+CURSOR_VAR = 'after'
+
+
+class EstimatedCountPaginator(Paginator):
+    estimate_above = 100_000
+
+    estimated = False
+
+    @cached_property
+    def count(self) -> int:  # pyright: ignore[reportIncompatibleMethodOverride]
+        estimate = self.estimated_count()
+        if estimate is not None and estimate > self.estimate_above:
+            self.estimated = True
+            return estimate
+        return super().count
+
+    def estimated_count(self) -> int | None:
+        """Returns the planner's row estimate of an unfiltered queryset's table, ``None`` if there is none."""
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or queryset.query.where or queryset.query.distinct:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+                [connection.ops.quote_name(queryset.model._meta.db_table)],  # noqa: SLF001
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 until the table was first vacuumed or analyzed
+        return row[0] if row and row[0] >= 0 else None
+
+
+class KeysetChangeList(ChangeList):
+    """Admin changelist paginated by cursor in the ``ModelAdmin`` ordering, see the module docstring."""
+
+    def __init__(self, request: HttpRequest, *args: Any, **kwargs: Any) -> None:
+        self.cursor: str | None = None
+        self.next_url: str | None = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_queryset(self, request: HttpRequest, exclude_parameters: Any = None) -> QuerySet:
+        # the cursor isn't a filter, and links to other filters, orderings or searches start from the first page
+        if CURSOR_VAR in self.params:
+            self.cursor = self.params.pop(CURSOR_VAR)
+            self.filter_params.pop(CURSOR_VAR)  # pyright: ignore[reportAttributeAccessIssue]
+        return super().get_queryset(request, exclude_parameters)  # pyright: ignore[reportCallIssue]
+
+    @cached_property
+    def keyset_fields(self) -> tuple[list[Field], bool] | None:
+        """Returns the ordering fields and whether they are descending, ``None`` if the ordering can't be keyset."""
+        ordering = self.model_admin.ordering or ()
+        directions = {name.startswith('-') for name in ordering}
+        if not ordering or len(directions) != 1 or any(not isinstance(name, str) for name in ordering):
+            return None
+        try:
+            fields = [self.opts.get_field(name.removeprefix('-')) for name in ordering]
+        except LookupError:
+            return None
+        if not fields[-1].primary_key:
+            return None
+        return fields, directions.pop()
+
+    @property
+    def keyset(self) -> bool:
+        return (
+            self.keyset_fields is not None
+            and ORDER_VAR not in self.params
+            and not self.show_all
+            and not self.model_admin.list_editable
+        )
+
+    def encode_cursor(self, obj: Any) -> str:
+        fields, _ = self.keyset_fields  # pyright: ignore[reportGeneralTypeIssues]
+        # the serialization of the field keeps the microseconds of datetimes that DjangoJSONEncoder cuts to
+        # milliseconds, the rows of the same millisecond would be skipped (or repeated) by the next page
+        return json.dumps([field.value_to_string(obj) for field in fields])  # pyright: ignore[reportAttributeAccessIssue]
+
+    def decode_cursor(self, cursor: str) -> list[Any]:
+        fields, _ = self.keyset_fields  # pyright: ignore[reportGeneralTypeIssues]
+        try:
+            values = json.loads(cursor)
+            if not isinstance(values, list) or len(values) != len(fields):
+                raise ValueError(cursor)  # noqa: TRY301
+            return [field.to_python(value) for field, value in zip(fields, values, strict=True)]
+        except (ValueError, TypeError) as e:
+            raise IncorrectLookupParameters(e) from e
+
+    def after_cursor(self, queryset: QuerySet, values: list[Any]) -> QuerySet:
+        """Filters ``queryset`` to the rows that come after ``values`` in the keyset ordering."""
+        fields, descending = self.keyset_fields  # pyright: ignore[reportGeneralTypeIssues]
+        past, bound = ('lt', 'lte') if descending else ('gt', 'gte')
+        names = [field.name for field in fields]
+        # row comparison spelled out: (a, b) < (x, y) is a < x or (a = x and b < y)
+        after = reduce(
+            or_,
+            (
+                Q(**dict(zip(names[:i], values[:i], strict=True)), **{f'{names[i]}__{past}': values[i]})
+                for i in range(len(names))
+            ),
+        )
+        # the redundant bound on the first field lets the database start the index scan at the cursor
+        return queryset.filter(**{f'{names[0]}__{bound}': values[0]}).filter(after)
+
+    def get_results(self, request: HttpRequest) -> None:
+        if not self.keyset:
+            return super().get_results(request)
+
+        paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        queryset = self.queryset
+        if self.cursor is not None:
+            queryset = self.after_cursor(queryset, self.decode_cursor(self.cursor))
+        rows = list(queryset[: self.list_per_page + 1])
+        result_list = rows[: self.list_per_page]
+        if len(rows) > self.list_per_page:
+            cursor = self.encode_cursor(result_list[-1])
+            self.next_url = self.get_query_string({CURSOR_VAR: cursor})  # pyright: ignore[reportArgumentType]
+
+        self.result_count = paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = self.root_queryset.count() if self.show_full_result_count else None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.result_list = result_list
+        self.can_show_all = self.result_count <= self.list_max_show_all
+        self.multi_page = self.next_url is not None or self.cursor is not None
+        self.paginator = paginator
+        return None
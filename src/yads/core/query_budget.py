@@ -0,0 +1,142 @@
+"""Query budgets and N+1 detection
+
+Every query executed while handling a request is recorded by ``QueryBudgetMiddleware`` (see ``yads.core.middleware``)
+and grouped by its shape, the SQL with literals and ``IN`` lists normalized. A request goes over its budget when it
+runs more than ``max_queries`` queries or the same shape more than ``max_repeats`` times, which is what an N+1 access
+pattern looks like.
+
+Views declare their budget with the ``query_budget`` decorator, others get ``QUERY_BUDGET_MAX_QUERIES`` and
+``QUERY_BUDGET_MAX_REPEATS``. Going over budget logs a warning, or raises ``QueryBudgetExceeded`` when
+``QUERY_BUDGET_RAISE`` is on as it is in the tests. Recording every query has a cost, so unless ``QUERY_BUDGET`` is
+set the middleware is only on with ``DEBUG`` on and in the tests.
+
+Tests can check a block of code with ``assert_query_budget``, also available as the ``query_budget`` fixture::
+
+    def test_list(client, query_budget):
+        with query_budget(3):
+            client.get('/users/')
+"""
+
+import re
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+from yads.core.instrumentation import execute_wrapper_all
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)+\s*\)')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+
+
+def sql_shape(sql: str) -> str:
+    """Normalizes ``sql`` so queries that only differ in their literals or ``IN`` list lengths compare equal."""
+    sql = _STRING.sub('%s', sql)
+    sql = _NUMBER.sub('%s', sql)
+    return _IN_LIST.sub('(%s, ...)', sql)
+
+
+class QueryBudgetExceeded(Exception):  # noqa: N818
+    pass
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    max_queries: int | None = None
+    max_repeats: int | None = None
+
+    @classmethod
+    def default(cls) -> 'QueryBudget':
+        return cls(settings.QUERY_BUDGET_MAX_QUERIES, settings.QUERY_BUDGET_MAX_REPEATS)
+
+
+@dataclass
+class QueryRecorder:
+    queries: list[tuple[str, float]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.queries)
+
+    @property
+    def shapes(self) -> Counter[str]:
+        return Counter(sql_shape(sql) for sql, _ in self.queries)
+
+    def repeated(self, max_repeats: int) -> list[tuple[str, int]]:
+        """Returns the shapes executed more than ``max_repeats`` times with their counts, most repeated first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > max_repeats]
+
+    def violations(self, budget: QueryBudget) -> list[str]:
+        problems = []
+        if budget.max_queries is not None and len(self) > budget.max_queries:
+            problems.append(f'{len(self)} queries, the budget is {budget.max_queries}')
+        if budget.max_repeats is not None:
+            problems.extend(
+                f'{count} identical queries (possible N+1): {shape}'
+                for shape, count in self.repeated(budget.max_repeats)
+            )
+        return problems
+
+    def wrapper(self, execute: Callable, sql: str, params: Any, many: bool, context: dict[str, Any]) -> Any:  # noqa: FBT001
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - start))
+
+
+@contextmanager
+def record_queries() -> Iterator[QueryRecorder]:
+    """Records the queries executed inside the block on any database connection."""
+    recorder = QueryRecorder()
+    with execute_wrapper_all(recorder.wrapper):
+        yield recorder
+
+
+@contextmanager
+def assert_query_budget(max_queries: int | None = None, *, max_repeats: int | None = None) -> Iterator[QueryRecorder]:
+    """Fails with ``QueryBudgetExceeded`` if the block goes over the given budget."""
+    with record_queries() as recorder:
+        yield recorder
+    if problems := recorder.violations(QueryBudget(max_queries, max_repeats)):
+        raise QueryBudgetExceeded('\n'.join(problems))
+
+
+def query_budget(max_queries: int | None = None, *, max_repeats: int | None = None) -> Callable[[Callable], Callable]:
+    """Declares the query budget of a view, checked by ``QueryBudgetMiddleware``.
+
+    ``None`` keeps the limit unchecked, it does not fall back to the default budget. Class-based views are decorated
+    in the URLconf, ``path('users/', query_budget(5)(UserListView.as_view()))``.
+    """
+    budget = QueryBudget(max_queries, max_repeats)
+
+    def decorator(view: Callable) -> Callable:
+        # wrap instead of setting the attribute on ``view`` so the same view can be routed with different budgets
+        if iscoroutinefunction(view):
+
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return await view(*args, **kwargs)
+
+            wrapper = async_wrapper
+        else:
+
+            def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+                return view(*args, **kwargs)
+
+            wrapper = sync_wrapper
+
+        wrapper = wraps(view)(wrapper)
+        wrapper.query_budget = budget  # pyright: ignore[reportAttributeAccessIssue]
+        return wrapper
+
+    return decorator
+
+
+def view_budget(view: Callable | None) -> QueryBudget:
+    return getattr(view, 'query_budget', None) or QueryBudget.default()
@@ -0,0 +1,217 @@
+"""HTMX aware response cache
+
+``cache_response`` caches the rendered response of a view for anonymous ``GET`` and ``HEAD`` requests. The cache key
+is built from the path and query string, the HTMX request headers (exposed by ``HtmxMiddleware`` as ``request.htmx``)
+and the template partial rendered for HTMX requests, so a full page and each of its fragments are cached separately.
+
+Cached responses carry ``ETag`` and ``Last-Modified`` headers and conditional requests are answered with
+``304 Not Modified`` straight from the cache. ``invalidate_path`` and ``invalidate_all`` drop cached responses by
+bumping a generation number that is part of every key. Other processes see an invalidation once their L1 entry for the
+generation expires (``CACHE_L1_TIMEOUT``).
+
+Usage::
+
+    path('', cache_response(60 * 5)(HomeView.as_view()), name='home')
+"""
+
+import hashlib
+from collections.abc import Callable
+from functools import wraps
+from typing import Any
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.http import HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, has_vary_header
+from django.utils.decorators import decorator_from_middleware_with_args
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+from yads.core.cache import aget_generations, bump_generation, get_generations
+
+KEY_PREFIX = 'response'
+
+# Headers that describe the response to a single client and must never be replayed from the cache
+EXCLUDED_HEADERS = frozenset({'set-cookie', 'date', 'age'})
+
+
+def _generation_keys(path: str) -> tuple[str, str]:
+    return f'{KEY_PREFIX}:gen', f'{KEY_PREFIX}:gen:{path}'
+
+
+def _generations(cache: BaseCache, path: str) -> str:
+    return get_generations(cache, _generation_keys(path))
+
+
+async def _agenerations(cache: BaseCache, path: str) -> str:
+    return await aget_generations(cache, _generation_keys(path))
+
+
+def invalidate_path(path: str, cache_alias: str = 'default') -> None:
+    """Drops the cached full page and fragment responses of ``path``, for every query string."""
+    bump_generation(caches[cache_alias], _generation_keys(path)[1])
+
+
+def invalidate_all(cache_alias: str = 'default') -> None:
+    """Drops every cached response."""
+    bump_generation(caches[cache_alias], _generation_keys('')[0])
+
+
+class ResponseCacheMiddleware(MiddlewareMixin):
+    """Serves anonymous ``GET``/``HEAD`` requests from the cache, see the module docstring.
+
+    Use it through ``cache_response``. A ``partial`` is read from the ``partial_name`` of a class-based view when it
+    is not given explicitly.
+    """
+
+    def __init__(
+        self,
+        get_response: Callable,
+        timeout: int | None = None,
+        partial: str | None = None,
+        cache_alias: str = 'default',
+    ) -> None:
+        super().__init__(get_response)
+        self.timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        self.partial = partial or getattr(getattr(get_response, 'view_class', None), 'partial_name', None)
+        self.cache_alias = cache_alias
+
+    @property
+    def cache(self) -> BaseCache:
+        return caches[self.cache_alias]
+
+    def get_cache_key(self, request: HttpRequest, generations: str | None = None) -> str:
+        htmx = getattr(request, 'htmx', None)
+        if htmx:
+            fragment = self.partial if not (htmx.boosted or htmx.history_restore_request) else None
+            variant = ['htmx', str(htmx.boosted), htmx.target or '', htmx.trigger or '', fragment or '']
+        else:
+            variant = ['page']
+        digest = hashlib.md5(
+            '|'.join([request.get_full_path(), *variant]).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        if generations is None:
+            generations = _generations(self.cache, request.path)
+        return f'{KEY_PREFIX}:{generations}:{digest}'
+
+    def is_cacheable_request(self, request: HttpRequest, user: Any = None) -> bool:
+        if not settings.RESPONSE_CACHE or request.method not in {'GET', 'HEAD'}:
+            return False
+        user = user or getattr(request, 'user', None)
+        return not (user and user.is_authenticated)
+
+    def is_cacheable_response(self, request: HttpRequest, response: HttpResponse) -> bool:
+        if response.status_code != 200 or response.cookies:  # noqa: PLR2004
+            return False
+        cache_control = response.get('Cache-Control', '')
+        if any(directive in cache_control for directive in ('private', 'no-store', 'no-cache')):
+            return False
+        if has_vary_header(response, 'Cookie'):
+            return False
+        # a CSRF token or flashed messages make the page specific to the visitor
+        if request.META.get('CSRF_COOKIE_NEEDS_UPDATE'):
+            return False
+        if getattr(getattr(request, '_messages', None), 'used', False):
+            return False
+        user = getattr(request, 'user', None)
+        return not (user and user.is_authenticated)
+
+    def process_request(self, request: HttpRequest) -> HttpResponseBase | None:
+        if not self.is_cacheable_request(request):
+            return None
+        cache_key = self.get_cache_key(request)
+        return self.cached_response(request, cache_key, self.cache.get(cache_key))
+
+    async def aprocess_request(self, request: HttpRequest) -> HttpResponseBase | None:
+        """Same as ``process_request`` without blocking the event loop, used for async views."""
+        auser = getattr(request, 'auser', None)
+        user = await auser() if auser else None
+        if not self.is_cacheable_request(request, user):
+            return None
+        cache_key = self.get_cache_key(request, await _agenerations(self.cache, request.path))
+        return self.cached_response(request, cache_key, await self.cache.aget(cache_key))
+
+    def cached_response(self, request: HttpRequest, cache_key: str, entry: dict | None) -> HttpResponseBase | None:
+        if entry is None:
+            request._response_cache_key = cache_key  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+            return None
+
+        response = HttpResponse(entry['content'], status=entry['status'], headers=entry['headers'])
+        return get_conditional_response(
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(response['Last-Modified']),
+            response=response,
+        )
+
+    def process_response(self, request: HttpRequest, response: HttpResponseBase) -> HttpResponseBase:
+        cache_key = getattr(request, '_response_cache_key', None)
+        if (
+            cache_key is None
+            or request.method != 'GET'
+            or not isinstance(response, HttpResponse)
+            or not self.is_cacheable_response(request, response)
+        ):
+            return response
+
+        if not response.has_header('ETag'):
+            response['ETag'] = quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest())
+        if not response.has_header('Last-Modified'):
+            response['Last-Modified'] = http_date()
+
+        entry: dict[str, Any] = {
+            'content': response.content,
+            'status': response.status_code,
+            'headers': {k: v for k, v in response.headers.items() if k.lower() not in EXCLUDED_HEADERS},
+        }
+        self.cache.set(cache_key, entry, timeout=self.timeout)
+
+        # only None without a response to fall back to, the stubs do not know that
+        return get_conditional_response(  # pyright: ignore[reportReturnType]
+            request,
+            etag=response['ETag'],
+            last_modified=parse_http_date_safe(response['Last-Modified']),
+            response=response,
+        )
+
+
+def cache_response(
+    timeout: int | None = None,
+    *,
+    partial: str | None = None,
+    cache_alias: str = 'default',
+) -> Callable[[Callable], Callable]:
+    """Caches the responses of the decorated view for ``timeout`` seconds, see ``ResponseCacheMiddleware``.
+
+    Async views look up the cache without leaving the event loop on an L1 hit, the response is stored after it has
+    been rendered, which Django does in a thread.
+    """
+    sync_decorator = decorator_from_middleware_with_args(ResponseCacheMiddleware)(
+        timeout=timeout,
+        partial=partial,
+        cache_alias=cache_alias,
+    )
+
+    def decorator(view: Callable) -> Callable:
+        if not iscoroutinefunction(view):
+            return sync_decorator(view)
+
+        middleware = ResponseCacheMiddleware(view, timeout=timeout, partial=partial, cache_alias=cache_alias)
+
+        @wraps(view)
+        async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+            if (cached := await middleware.aprocess_request(request)) is not None:
+                return cached
+            response = await view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response.add_post_render_callback(lambda rendered: middleware.process_response(request, rendered))
+                return response
+            return await sync_to_async(middleware.process_response)(request, response)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,50 @@
+"""Expired session sweeper
+
+Sessions stored in the database (the ``db`` and ``cached_db`` engines) stay in ``django_session`` after they expire.
+Django's ``clearsessions`` deletes them with a single ``DELETE``, which holds its locks until every expired row is
+gone. ``sweep_expired_sessions`` deletes them in batches of primary keys instead, each batch in its own short
+transaction, with an optional pause between batches so the sweep doesn't compete with requests. Run it periodically
+with ``manage.py sweep_sessions``.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from importlib import import_module
+
+from django.conf import settings
+from django.contrib.sessions.base_session import AbstractBaseSession
+from django.db import transaction
+from django.utils import timezone
+
+log = logging.getLogger(__name__)
+
+
+def session_model() -> type[AbstractBaseSession] | None:
+    """Returns the model of the database backed session engine, ``None`` if the sessions aren't stored in a table."""
+    store = import_module(settings.SESSION_ENGINE).SessionStore
+    return store.get_model_class() if hasattr(store, 'get_model_class') else None
+
+
+def sweep_batches(model: type[AbstractBaseSession], batch_size: int) -> Iterator[int]:
+    """Deletes the sessions that expired before the sweep started, yields the number of sessions of each batch."""
+    expired = model.objects.filter(expire_date__lt=timezone.now()).order_by('expire_date')
+    while keys := list(expired.values_list('pk', flat=True)[:batch_size]):
+        with transaction.atomic():
+            deleted, _ = model.objects.filter(pk__in=keys).delete()
+        yield deleted
+
+
+def sweep_expired_sessions(batch_size: int = 1000, pause: float = 0.0) -> int:
+    """Deletes all expired sessions in batches of ``batch_size``, sleeping ``pause`` seconds between them."""
+    model = session_model()
+    if model is None:
+        return 0
+
+    total = 0
+    for deleted in sweep_batches(model, batch_size):
+        total += deleted
+        log.debug('Deleted %d expired sessions', deleted)
+        if pause:
+            time.sleep(pause)
+    return total
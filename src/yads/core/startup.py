@@ -0,0 +1,119 @@
+"""Cold start profiling
+
+``profile_startup`` starts a new Python process that sets up Django the way ``manage.py`` and the web workers do,
+with ``-X importtime``, and returns where its startup time went:
+
+- the phases of ``django.setup()``: importing the settings (``EnvSettings``, Sentry), configuring the logging,
+  importing the apps and their models, and the ``AppConfig.ready()`` of each app
+- the tree of the imports made, with the time of each module and of the modules it imported
+
+``manage.py startup_profile`` prints both. Only the standard library is imported here, so that the imports of the
+profiled process show Django and the project as they are imported by ``manage.py``.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+IMPORTTIME_PREFIX = 'import time:'
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list['ImportNode'] = field(default_factory=list)
+
+
+@dataclass
+class StartupProfile:
+    phases: dict[str, float]  # seconds
+    ready: dict[str, float]  # seconds per app label
+    imports: list[ImportNode]
+
+    @property
+    def total(self) -> float:
+        return sum(self.phases.values())
+
+
+def parse_importtime(lines: Iterable[str]) -> list[ImportNode]:
+    """Builds the import tree out of the ``-X importtime`` report, in which a module follows the modules it imported
+    and is indented two spaces less."""
+    pending: defaultdict[int, list[ImportNode]] = defaultdict(list)
+    for line in lines:
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        self_us, cumulative_us, name = line.removeprefix(IMPORTTIME_PREFIX).split('|')
+        if not self_us.strip().isdigit():
+            continue  # the header
+        module = name.rstrip().removeprefix(' ')
+        level = (len(module) - len(module.lstrip(' '))) // 2
+        node = ImportNode(module.strip(), int(self_us), int(cumulative_us), pending.pop(level + 1, []))
+        pending[level].append(node)
+    return pending[0]
+
+
+def probe() -> None:
+    """Sets up Django and prints the phases as JSON, run in the profiled process."""
+    import django  # noqa: PLC0415
+    from django.apps.config import AppConfig  # noqa: PLC0415
+    from django.conf import settings  # noqa: PLC0415
+    from django.utils import log  # noqa: PLC0415
+
+    phases, ready = {}, {}
+    configure_logging = log.configure_logging
+
+    def timed_configure_logging(*args: Any) -> None:
+        start = time.perf_counter()
+        configure_logging(*args)
+        phases['logging'] = time.perf_counter() - start
+
+    log.configure_logging = timed_configure_logging
+    create = AppConfig.create.__func__
+
+    def timed_create(cls: type[AppConfig], entry: str) -> AppConfig:
+        config = create(cls, entry)
+        original = config.ready
+
+        def timed_ready() -> None:
+            start = time.perf_counter()
+            original()
+            ready[config.label] = time.perf_counter() - start
+
+        config.ready = timed_ready
+        return config
+
+    AppConfig.create = classmethod(timed_create)  # pyright: ignore[reportAttributeAccessIssue]
+
+    start = time.perf_counter()
+    settings.INSTALLED_APPS  # noqa: B018
+    phases['settings'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    django.setup()
+    # populating the apps imports them and their models and ends with the ready() calls
+    phases['apps'] = time.perf_counter() - start - phases.get('logging', 0) - sum(ready.values())
+    phases['ready'] = sum(ready.values())
+    print(json.dumps({'phases': phases, 'ready': ready}))
+
+
+def profile_startup(settings_module: str, cwd: Path) -> StartupProfile:
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    completed = subprocess.run(  # noqa: S603
+        [sys.executable, '-X', 'importtime', '-c', 'from yads.core.startup import probe; probe()'],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result: dict[str, Any] = json.loads(completed.stdout.splitlines()[-1])
+    return StartupProfile(result['phases'], result['ready'], parse_importtime(completed.stderr.splitlines()))
@@ -0,0 +1,132 @@
+"""Precompressed static files served by WhiteNoise
+
+``collectstatic`` runs once when the production image is built (see ``docker/Dockerfile``). With
+``CompressedManifestStaticFilesStorage`` it adds content hashes to the file names and writes Brotli (``.br``), gzip
+(``.gz``) and Zstandard (``.zst``) variants next to every compressible file, so nothing is hashed or compressed when
+a container starts.
+
+``WhiteNoiseMiddleware`` serves the smallest variant the client accepts and marks hashed files as immutable for a
+year. Under WSGI files are sent with the server's ``wsgi.file_wrapper`` (``sendfile``). Under ASGI Django reads a
+``FileResponse`` into a list in a worker thread before sending any of it, so files are streamed from an async iterator
+instead, reading ``CHUNK_SIZE`` bytes at a time in a thread. Memory use stays bounded by the chunk size and the event
+loop never waits on the disk. ASGI has no ``sendfile``, so every chunk is still copied through the worker process.
+"""
+
+import os
+from collections.abc import AsyncIterator, Awaitable, Callable
+from pathlib import Path
+from typing import IO, Any
+from wsgiref.headers import Headers
+
+import zstandard
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings as django_settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.http import HttpRequest, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from whitenoise import compress, middleware, storage
+from whitenoise.responders import MissingFileError, Redirect, StaticFile
+
+ZSTD_LEVEL = 19
+
+# bytes read from disk at a time for ASGI responses, most compressed assets fit in one chunk
+CHUNK_SIZE = 64 * 1024
+
+
+class Compressor(compress.Compressor):
+    """Adds a Zstandard variant to files that WhiteNoise compressed effectively with Brotli or gzip."""
+
+    def compress(self, path: str) -> list[str]:
+        filenames = super().compress(path)
+        if filenames:
+            with Path(path).open('rb') as f:
+                stat_result = os.fstat(f.fileno())
+                data = f.read()
+            compressed = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+            if self.is_compressed_effectively('Zstandard', path, len(data), compressed):
+                filenames.append(self.write_data(path, compressed, '.zst', stat_result))
+        return filenames
+
+
+async def read_chunks(file: IO[bytes]) -> AsyncIterator[bytes]:
+    """Reads ``file`` in ``CHUNK_SIZE`` blocks in a thread and closes it at the end."""
+    read = sync_to_async(file.read, thread_sensitive=False)
+    try:
+        while chunk := await read(CHUNK_SIZE):
+            yield chunk
+    finally:
+        file.close()
+
+
+class CompressedManifestStaticFilesStorage(storage.CompressedManifestStaticFilesStorage):
+    def create_compressor(self, **kwargs: Any) -> Compressor:
+        return Compressor(**kwargs)
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    """WhiteNoise with zstd variants, async streamed ASGI responses and native async support.
+
+    WhiteNoise's own middleware is sync only, which makes Django run it, and everything after it, through thread
+    adapters under ASGI. Here static files are served straight from the event loop and other requests are passed on
+    without a thread hop.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable | None = None, settings: Any = django_settings) -> None:
+        super().__init__(get_response, settings)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponseBase:
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)  # pyright: ignore[reportOptionalCall]
+
+    @staticmethod
+    def is_compressed_variant(path: str, stat_cache: dict | None = None) -> bool:
+        if path.endswith('.zst'):
+            uncompressed_path = path.removesuffix('.zst')
+            return uncompressed_path in stat_cache if stat_cache is not None else Path(uncompressed_path).is_file()
+        return middleware.WhiteNoiseMiddleware.is_compressed_variant(path, stat_cache)
+
+    def get_static_file(self, path: str, url: str, stat_cache: dict | None = None) -> StaticFile:
+        # same as WhiteNoise's, which only knows about the gzip and Brotli variants
+        if stat_cache is None and not Path(path).exists():
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers['Access-Control-Allow-Origin'] = '*'
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={'zstd': f'{path}.zst', 'br': f'{path}.br', 'gzip': f'{path}.gz'},
+        )
+
+    @staticmethod
+    def serve(static_file: StaticFile | Redirect, request: HttpRequest) -> HttpResponseBase:  # pyright: ignore[reportIncompatibleMethodOverride]
+        response = static_file.get_response(request.method, request.META)
+        if isinstance(request, WSGIRequest) or response.file is None:
+            http_response = middleware.WhiteNoiseFileResponse(response.file or (), status=response.status)
+        else:
+            http_response = StreamingHttpResponse(read_chunks(response.file), status=response.status)
+        del http_response['Content-Type']
+        for key, value in response.headers:
+            http_response[key] = value
+        return http_response
@@ -0,0 +1,532 @@
+"""Database task backend
+
+``DatabaseBackend`` is a backend of Django's task framework (``django.tasks``) that stores the enqueued tasks in the
+``TaskRecord`` table, so slow work such as sending emails, exports or rehashing passwords can leave the request
+without adding a broker::
+
+    from django.tasks import task
+
+
+    @task(priority=10)
+    def send_welcome_email(user_id: int) -> None: ...
+
+
+    send_welcome_email.enqueue(user.pk)
+
+``manage.py task_worker`` runs them. A ``Worker`` claims up to ``--batch-size`` ready tasks at a time, highest
+priority first, with one ``SELECT ... FOR UPDATE SKIP LOCKED``, so any number of workers share the table without
+waiting on each other's locks. It runs them on ``--concurrency`` threads, or with ``--asyncio`` as coroutines of one
+event loop (tasks that aren't coroutines still run on threads there). On PostgreSQL enqueueing a task sends a
+``NOTIFY`` that idle workers ``LISTEN`` for, so it starts as soon as its transaction commits. Otherwise idle workers
+poll every ``--poll-interval`` seconds. SQLite has no row locks, run a single worker there.
+
+A task that raises is retried until it has run ``MAX_ATTEMPTS`` times (an ``OPTIONS`` of the backend),
+``RETRY_DELAY`` seconds after its first failure and twice as long after each of the next ones. The errors and
+workers of all attempts are kept in its result. Workers log their throughput every ``--stats-interval`` seconds.
+
+Workers hold a lease on the tasks they run and renew it every third of ``LEASE`` seconds. A task whose lease expired,
+its worker having been killed or having lost the database, is reclaimed by the next worker as a failed attempt. When
+a worker can't record the outcome of a task it makes the task ready again, and logs why.
+"""
+
+import asyncio
+import dataclasses
+import logging
+import math
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from inspect import iscoroutinefunction
+from traceback import format_exception
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, close_old_connections, connections, router, transaction
+from django.tasks import (  # pyright: ignore[reportMissingImports]
+    Task,
+    TaskContext,
+    TaskResult,
+    TaskResultStatus,
+    task_backends,
+)
+from django.tasks.backends.base import BaseTaskBackend  # pyright: ignore[reportMissingImports]
+from django.tasks.base import TaskError  # pyright: ignore[reportMissingImports]
+from django.tasks.exceptions import TaskResultDoesNotExist  # pyright: ignore[reportMissingImports]
+from django.tasks.signals import task_enqueued, task_finished, task_started  # pyright: ignore[reportMissingImports]
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from django.utils.json import normalize_json  # pyright: ignore[reportMissingImports]
+from django.utils.module_loading import import_string
+
+from yads.core.models import TaskRecord
+
+log = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = 'yads_tasks'
+
+
+class DatabaseBackend(BaseTaskBackend):
+    supports_defer = True
+    supports_async_task = True
+    supports_get_result = True
+    supports_priority = True
+
+    def __init__(self, alias: str, params: dict[str, Any]) -> None:
+        super().__init__(alias, params)
+        self.max_attempts = int(self.options.get('MAX_ATTEMPTS', 1))
+        self.retry_delay = float(self.options.get('RETRY_DELAY', 10))
+        self.lease = float(self.options.get('LEASE', 300))
+
+    def enqueue(self, task: Task, args: Iterable[Any], kwargs: dict[str, Any]) -> TaskResult:
+        self.validate_task(task)
+        now = timezone.now()
+        using = router.db_for_write(TaskRecord)
+        with transaction.atomic(using=using):
+            record = TaskRecord.objects.using(using).create(
+                id=get_random_string(32),
+                task_path=task.module_path,
+                backend=self.alias,
+                queue_name=task.queue_name,
+                priority=task.priority,
+                takes_context=task.takes_context,
+                args=normalize_json(list(args)),
+                kwargs=normalize_json(kwargs),
+                run_after=task.run_after or now,
+                enqueued_at=now,
+            )
+            notify(using, task.queue_name)
+
+        result = self.to_result(record, task)
+        task_enqueued.send(type(self), task_result=result)
+        return result
+
+    def get_result(self, result_id: str) -> TaskResult:
+        try:
+            record = TaskRecord.objects.get(pk=result_id, backend=self.alias)
+        except TaskRecord.DoesNotExist:
+            raise TaskResultDoesNotExist(result_id) from None
+        return self.to_result(record)
+
+    def to_result(self, record: TaskRecord, task: Task | None = None) -> TaskResult:
+        """Returns the ``TaskResult`` of ``record``, raises ``ImportError`` when its task no longer exists."""
+        if task is None:
+            imported = import_string(record.task_path)
+            if not isinstance(imported, Task):
+                msg = f'{record.task_path} is not a task'
+                raise ImportError(msg)
+            task = dataclasses.replace(
+                imported,
+                priority=record.priority,
+                queue_name=record.queue_name,
+                run_after=record.run_after if record.run_after > record.enqueued_at else None,
+                backend=self.alias,
+            )
+        result = TaskResult(
+            task=task,
+            id=record.id,
+            status=TaskResultStatus(record.status),
+            enqueued_at=record.enqueued_at,
+            started_at=record.started_at,
+            last_attempted_at=record.last_attempted_at,
+            finished_at=record.finished_at,
+            args=record.args,
+            kwargs=record.kwargs,
+            backend=self.alias,
+            errors=[TaskError(**error) for error in record.errors],
+            worker_ids=record.worker_ids,
+        )
+        object.__setattr__(result, '_return_value', record.return_value)
+        return result
+
+
+def notify(using: str, queue_name: str) -> None:
+    """Wakes the workers listening on PostgreSQL, once the current transaction commits."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [NOTIFY_CHANNEL, queue_name])
+
+
+class LeaseExpiredError(Exception):
+    """The error of an attempt whose worker stopped renewing its lease."""
+
+
+@dataclasses.dataclass
+class WorkerStats:
+    started: float = dataclasses.field(default_factory=time.monotonic)
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    retried: int = 0
+    reclaimed: int = 0  # tasks of other workers whose lease expired
+    busy: float = 0.0  # seconds spent running tasks
+
+    @property
+    def finished(self) -> int:
+        return self.succeeded + self.failed + self.retried
+
+    def as_log_fields(self) -> dict[str, Any]:
+        elapsed = time.monotonic() - self.started
+        return {
+            'tasks_claimed': self.claimed,
+            'tasks_succeeded': self.succeeded,
+            'tasks_failed': self.failed,
+            'tasks_retried': self.retried,
+            'tasks_reclaimed': self.reclaimed,
+            'tasks_per_second': round(self.finished / elapsed, 2) if elapsed else 0.0,
+            'task_ms': round(self.busy / self.finished * 1000, 3) if self.finished else 0.0,
+        }
+
+
+class Worker:
+    """Claims and runs the tasks of a ``DatabaseBackend``, see the module docstring."""
+
+    def __init__(
+        self,
+        backend: str = 'default',
+        *,
+        queues: Iterable[str] = (),
+        concurrency: int = 4,
+        batch_size: int | None = None,
+        poll_interval: float = 1.0,
+        use_asyncio: bool = False,
+        stats_interval: float = 60.0,
+    ) -> None:
+        self.backend = task_backends[backend]
+        if not isinstance(self.backend, DatabaseBackend):
+            msg = f'The {backend!r} task backend is not a DatabaseBackend'
+            raise TypeError(msg)
+        self.queues = set(queues)
+        self.concurrency = concurrency
+        self.batch_size = batch_size or concurrency
+        self.poll_interval = poll_interval
+        self.use_asyncio = use_asyncio
+        self.stats_interval = stats_interval
+        self.id = get_random_string(32)
+        self.stats = WorkerStats()
+        self.wakeup = threading.Event()
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self._running: set[str] = set()  # ids of the claimed tasks
+
+    def stop(self) -> None:
+        """Stops claiming tasks, ``run`` returns once the running ones finish."""
+        self.stopping.set()
+        self.wakeup.set()
+
+    def claim(self, limit: int) -> list[TaskRecord]:
+        now = timezone.now()
+        using = router.db_for_write(TaskRecord)
+        with transaction.atomic(using=using):
+            ready = TaskRecord.objects.using(using).filter(
+                backend=self.backend.alias, status=TaskResultStatus.READY, run_after__lte=now
+            )
+            if self.queues:
+                ready = ready.filter(queue_name__in=self.queues)
+            records = list(ready.select_for_update(skip_locked=True).order_by('-priority', 'run_after')[:limit])
+            for record in records:
+                record.status = TaskResultStatus.RUNNING
+                record.started_at = record.started_at or now
+                record.last_attempted_at = now
+                record.heartbeat_at = now
+                record.worker_ids.append(self.id)
+            TaskRecord.objects.using(using).bulk_update(
+                records, ['status', 'started_at', 'last_attempted_at', 'heartbeat_at', 'worker_ids']
+            )
+        with self._lock:
+            self.stats.claimed += len(records)
+        return records
+
+    def start(self, record: TaskRecord) -> TaskResult | None:
+        """Returns the result of a claimed task, or fails the task when it can't be loaded."""
+        try:
+            result = self.backend.to_result(record)
+        except ImportError as e:
+            self.failed(record, e, retry=False)
+            return None
+        task_started.send(type(self.backend), task_result=result)
+        return result
+
+    def call_args(self, result: TaskResult) -> tuple[list[Any], dict[str, Any]]:
+        args = [TaskContext(task_result=result), *result.args] if result.task.takes_context else result.args
+        return args, result.kwargs
+
+    def succeeded(self, record: TaskRecord, value: Any, seconds: float) -> None:
+        record.status = TaskResultStatus.SUCCESSFUL
+        record.return_value = value
+        record.finished_at = timezone.now()
+        record.save(update_fields=['status', 'return_value', 'finished_at'])
+        with self._lock:
+            self.stats.succeeded += 1
+            self.stats.busy += seconds
+        self.finished(record)
+
+    def failed(self, record: TaskRecord, error: BaseException, seconds: float = 0.0, *, retry: bool = True) -> None:
+        retry = self.record_error(record, error, retry=retry)
+        with self._lock:
+            self.stats.busy += seconds
+            if retry:
+                self.stats.retried += 1
+            else:
+                self.stats.failed += 1
+
+    def record_error(self, record: TaskRecord, error: BaseException, *, retry: bool = True) -> bool:
+        """Makes the task ready for its next attempt or fails it after the last one, returns if it is retried."""
+        exception_type = type(error)
+        record.errors.append(
+            {
+                'exception_class_path': f'{exception_type.__module__}.{exception_type.__qualname__}',
+                'traceback': ''.join(format_exception(error)),
+            }
+        )
+        attempts = len(record.worker_ids)
+        retry = retry and attempts < self.backend.max_attempts
+        if retry:
+            record.status = TaskResultStatus.READY
+            record.run_after = timezone.now() + timedelta(seconds=self.backend.retry_delay * 2 ** (attempts - 1))
+            log.warning(
+                'Task %s %s failed, attempt %d runs at %s',
+                record.task_path,
+                record.id,
+                attempts + 1,
+                record.run_after,
+                exc_info=error,
+            )
+        else:
+            record.status = TaskResultStatus.FAILED
+            record.finished_at = timezone.now()
+            log.error('Task %s %s failed', record.task_path, record.id, exc_info=error)
+        record.save(update_fields=['status', 'errors', 'run_after', 'finished_at'])
+        if not retry:
+            self.finished(record)
+        return retry
+
+    def finished(self, record: TaskRecord) -> None:
+        try:
+            result = self.backend.to_result(record)
+        except ImportError:
+            return
+        task_finished.send(type(self.backend), task_result=result)
+
+    def hand_back(self, record: TaskRecord, error: BaseException) -> None:
+        """Makes a claimed task ready again after its outcome couldn't be recorded."""
+        log.error(
+            'Recording the outcome of task %s %s failed, handing it back', record.task_path, record.id, exc_info=error
+        )
+        # the connection may be broken by the error
+        close_old_connections()
+        using = router.db_for_write(TaskRecord)
+        run_after = timezone.now() + timedelta(seconds=self.backend.retry_delay)
+        try:
+            TaskRecord.objects.using(using).filter(pk=record.pk, status=TaskResultStatus.RUNNING).update(
+                status=TaskResultStatus.READY, run_after=run_after
+            )
+        except DatabaseError:
+            log.exception(
+                'Handing back task %s %s failed, it is reclaimed when its lease expires', record.task_path, record.id
+            )
+
+    def execute(self, record: TaskRecord) -> None:
+        """Runs a claimed task in the calling thread."""
+        try:
+            if (result := self.start(record)) is None:
+                return
+            args, kwargs = self.call_args(result)
+            start = time.perf_counter()
+            try:
+                value = normalize_json(result.task.call(*args, **kwargs))
+            except Exception as e:  # noqa: BLE001
+                self.failed(record, e, time.perf_counter() - start)
+            else:
+                self.succeeded(record, value, time.perf_counter() - start)
+        except Exception as e:  # noqa: BLE001
+            self.hand_back(record, e)
+        finally:
+            # like after a request: closes the connection of this thread when it's too old or broken
+            close_old_connections()
+
+    async def aexecute(self, record: TaskRecord) -> None:
+        """Runs a claimed task, coroutines in the event loop and the other ones on a thread."""
+        try:
+            is_coroutine = iscoroutinefunction(import_string(record.task_path).func)
+        except (ImportError, AttributeError):
+            is_coroutine = False  # failed by start() on the thread
+        if not is_coroutine:
+            await sync_to_async(self.execute, thread_sensitive=False)(record)
+            return
+
+        try:
+            if (result := await sync_to_async(self.start)(record)) is None:
+                return
+            args, kwargs = self.call_args(result)
+            start = time.perf_counter()
+            try:
+                value = normalize_json(await result.task.func(*args, **kwargs))
+            except Exception as e:  # noqa: BLE001
+                await sync_to_async(self.failed)(record, e, time.perf_counter() - start)
+            else:
+                await sync_to_async(self.succeeded)(record, value, time.perf_counter() - start)
+        except Exception as e:  # noqa: BLE001
+            await sync_to_async(self.hand_back)(record, e)
+
+    def next_batch(self, claimed: int, max_tasks: int | None) -> list[TaskRecord]:
+        with self._lock:
+            limit = min(self.concurrency - len(self._running), self.batch_size)
+        if max_tasks is not None:
+            limit = min(limit, max_tasks - claimed)
+        if limit <= 0 or self.stopping.is_set():
+            return []
+        try:
+            records = self.claim(limit)
+        except DatabaseError:
+            log.exception('Claiming tasks failed')
+            close_old_connections()
+            return []
+        with self._lock:
+            self._running.update(record.id for record in records)
+        return records
+
+    def done(self, record_id: str, *_: Any) -> None:
+        with self._lock:
+            self._running.discard(record_id)
+        self.wakeup.set()
+
+    def idle(self) -> bool:
+        with self._lock:
+            return not self._running
+
+    def heartbeat(self) -> None:
+        """Renews the lease of the running tasks and reclaims the tasks whose lease expired."""
+        now = timezone.now()
+        using = router.db_for_write(TaskRecord)
+        with self._lock:
+            running = list(self._running)
+        try:
+            if running:
+                TaskRecord.objects.using(using).filter(pk__in=running, status=TaskResultStatus.RUNNING).update(
+                    heartbeat_at=now
+                )
+            self.reclaim(now - timedelta(seconds=self.backend.lease))
+        except DatabaseError:
+            log.exception('Renewing the task leases failed')
+            close_old_connections()
+
+    def reclaim(self, expired: datetime) -> None:
+        """Records a failed attempt for the running tasks whose last heartbeat is older than ``expired``."""
+        using = router.db_for_write(TaskRecord)
+        with transaction.atomic(using=using):
+            records = list(
+                TaskRecord.objects.using(using)
+                .filter(backend=self.backend.alias, status=TaskResultStatus.RUNNING, heartbeat_at__lt=expired)
+                .select_for_update(skip_locked=True)
+            )
+            for record in records:
+                error = LeaseExpiredError(f'Worker {record.worker_ids[-1]} stopped renewing its lease on the task')
+                self.record_error(record, error)
+        with self._lock:
+            self.stats.reclaimed += len(records)
+
+    def run(self, *, burst: bool = False, max_tasks: int | None = None) -> WorkerStats:
+        """Runs tasks until ``stop()`` is called, ``max_tasks`` were claimed or, with ``burst``, none is ready."""
+        self.stopping.clear()
+        listener = self.listen()
+        try:
+            if self.use_asyncio:
+                asyncio.run(self._arun(burst=burst, max_tasks=max_tasks))
+            else:
+                self._run(burst=burst, max_tasks=max_tasks)
+        finally:
+            self.stopping.set()
+            if listener:
+                listener.join()
+        self.log_stats()
+        return self.stats
+
+    def _run(self, *, burst: bool, max_tasks: int | None) -> None:
+        claimed = 0
+        last_stats = time.monotonic()
+        last_heartbeat = -math.inf
+        with ThreadPoolExecutor(self.concurrency, thread_name_prefix='task-worker') as pool:
+            while not self.stopping.is_set():
+                self.wakeup.clear()
+                if time.monotonic() - last_heartbeat >= self.backend.lease / 3:
+                    self.heartbeat()
+                    last_heartbeat = time.monotonic()
+                records = self.next_batch(claimed, max_tasks)
+                claimed += len(records)
+                for record in records:
+                    future: Future = pool.submit(self.execute, record)
+                    future.add_done_callback(partial(self.done, record.id))
+                if self.idle() and not records and (burst or claimed == max_tasks):
+                    break
+                if time.monotonic() - last_stats >= self.stats_interval:
+                    self.log_stats()
+                    last_stats = time.monotonic()
+                if not records:
+                    self.wakeup.wait(self.poll_interval)
+
+    async def _arun(self, *, burst: bool, max_tasks: int | None) -> None:
+        claimed = 0
+        last_stats = time.monotonic()
+        last_heartbeat = -math.inf
+        running: set[asyncio.Task] = set()
+        while not self.stopping.is_set():
+            self.wakeup.clear()
+            if time.monotonic() - last_heartbeat >= self.backend.lease / 3:
+                await sync_to_async(self.heartbeat)()
+                last_heartbeat = time.monotonic()
+            records = await sync_to_async(self.next_batch)(claimed, max_tasks)
+            claimed += len(records)
+            for record in records:
+                running.add(task := asyncio.create_task(self.aexecute(record)))
+                task.add_done_callback(running.discard)
+                task.add_done_callback(partial(self.done, record.id))
+            if not running and not records and (burst or claimed == max_tasks):
+                break
+            if time.monotonic() - last_stats >= self.stats_interval:
+                self.log_stats()
+                last_stats = time.monotonic()
+            if not records:
+                await asyncio.to_thread(self.wakeup.wait, self.poll_interval)
+        await asyncio.gather(*running)
+
+    def listen(self) -> threading.Thread | None:
+        """Starts a thread waking the worker on the notifications of new tasks, on PostgreSQL."""
+        connection = connections[router.db_for_write(TaskRecord)]
+        if connection.vendor != 'postgresql':
+            return None
+        thread = threading.Thread(target=self._listen, args=[connection.get_connection_params()], name='task-listen')
+        thread.start()
+        return thread
+
+    def _listen(self, params: dict[str, Any]) -> None:
+        import psycopg  # noqa: PLC0415
+
+        while not self.stopping.is_set():
+            try:
+                # a connection of its own, outside of Django's and of the pool
+                with psycopg.connect(**params, autocommit=True) as connection:
+                    connection.execute(f'LISTEN {NOTIFY_CHANNEL}')
+                    while not self.stopping.is_set():
+                        for notification in connection.notifies(timeout=1.0):
+                            if not self.queues or notification.payload in self.queues:
+                                self.wakeup.set()
+            except psycopg.Error:
+                log.exception('Listening for new tasks failed, polling until it is back')
+                self.stopping.wait(self.poll_interval * 5)
+
+    def log_stats(self) -> None:
+        with self._lock:
+            fields = self.stats.as_log_fields()
+        log.info(
+            'Worker %s: %d tasks succeeded, %d failed, %d retried, %.1f tasks/s',
+            self.id[:8],
+            fields['tasks_succeeded'],
+            fields['tasks_failed'],
+            fields['tasks_retried'],
+            fields['tasks_per_second'],
+            extra=fields,
+        )
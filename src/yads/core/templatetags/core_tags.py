@@ -1,10 +1,9 @@
 import logging
 
 from django import template
-from django.conf import settings
-from django.templatetags.static import static as django_static
+from django.utils.safestring import SafeString
 
-from config.settings.env import pydenset
+from yads.core.assets import get_index
 
 log = logging.getLogger(__name__)
 
@@ -17,7 +16,8 @@ def static(filename: str) -> str:
 
     In development mode with Debug enabled and USE_VITE set to ``True``, returns the URL from the Vite dev server.
 
-    In production mode, simply delegates to Django's static file handling.
+    In production mode, returns the hashed URL from the static asset index built once from the staticfiles manifest
+    (see ``yads.core.assets``).
 
     Args:
         filename (str): The original filename of the static asset.
@@ -25,7 +25,20 @@ def static(filename: str) -> str:
     Returns:
         str: The URL to the static asset.
     """
-    if settings.DEBUG and pydenset.USE_VITE:
-        return f'{pydenset.VITE_URL}{django_static(filename.lstrip("/"))}'
+    return get_index().url(filename)
 
-    return django_static(filename)
+
+@register.simple_tag
+def vite_preload(entry: str) -> SafeString:
+    """Returns preload links for the chunks and stylesheets a Vite entry imports.
+
+    Lets the browser fetch the whole dependency chain of ``entry`` in parallel instead of discovering each import after
+    the previous one loaded. Renders nothing when the Vite dev server serves the assets.
+
+    Args:
+        entry (str): The source name of the entry as used in ``{% static %}``, e.g. ``js/project.js``.
+
+    Returns:
+        str: ``<link rel="modulepreload">`` and ``<link rel="preload" as="style">`` tags.
+    """
+    return get_index().preload(entry)
@@ -0,0 +1,205 @@
+"""Test databases cloned from snapshots
+
+Creating a test database runs every migration, once per run and once more per ``pytest-xdist`` worker.
+``setup_databases`` runs them once for a given set of migrations instead: the migrated database is kept as a snapshot
+and every test database is a copy of it.
+
+- SQLite: the snapshot is a database file, copied into the (in-memory) test database of each process with the SQLite
+  backup API
+- PostgreSQL: the snapshot is a database, each worker's test database is created with it as the ``TEMPLATE``
+
+Snapshots are named after a fingerprint of the migration files (and of the models of the apps without migrations), so
+they are reused across runs until a migration changes. Building a snapshot drops the older ones. Workers building
+and cloning a snapshot hold a lock file, the first one builds the snapshot and the others clone it.
+
+``src/conftest.py`` uses it for pytest-django's ``django_db_setup``, with the snapshots kept in pytest's cache
+directory. ``--create-db`` rebuilds them, ``--no-db-snapshot`` (or ``--reuse-db``/``--nomigrations``) migrates the
+test databases as usual.
+"""
+
+import fcntl
+import hashlib
+import logging
+import os
+import sqlite3
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Set
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+import django
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.migrations.loader import MigrationLoader
+
+log = logging.getLogger(__name__)
+
+
+def migrations_fingerprint(connection: BaseDatabaseWrapper) -> str:
+    """Hashes what the schema of a migrated database depends on: the migration files of the apps, the models of the
+    apps without migrations, the database engine and Django's version."""
+    loader = MigrationLoader(None, ignore_no_migrations=True)
+    digest = hashlib.sha256(f'{connection.vendor} {django.get_version()}'.encode())
+    modules = [type(loader.disk_migrations[key]).__module__ for key in sorted(loader.disk_migrations)]
+    unmigrated = [apps.get_app_config(label).models_module for label in sorted(loader.unmigrated_apps)]
+    # models_module is the module, typed as its name in the stubs
+    modules += [models.__name__ for models in unmigrated if models is not None]  # pyright: ignore[reportAttributeAccessIssue]
+    for module in modules:
+        digest.update(module.encode())
+        if path := sys.modules[module].__file__:
+            digest.update(Path(path).read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@contextmanager
+def file_lock(path: Path) -> Iterator[None]:
+    with path.open('w') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file, fcntl.LOCK_UN)
+
+
+@contextmanager
+def using_database(connection: BaseDatabaseWrapper, name: str) -> Iterator[None]:
+    original = connection.settings_dict['NAME']
+    connection.close()
+    connection.settings_dict['NAME'] = name
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.settings_dict['NAME'] = original
+
+
+class Snapshot(ABC):
+    def __init__(self, connection: BaseDatabaseWrapper, directory: Path) -> None:
+        self.connection = connection
+        self.directory = directory
+        self.fingerprint = migrations_fingerprint(connection)
+
+    @property
+    @abstractmethod
+    def name(self) -> str: ...
+
+    @abstractmethod
+    def exists(self) -> bool: ...
+
+    @abstractmethod
+    def create(self) -> None:
+        """Creates the empty database of the snapshot and drops the other snapshots of the connection."""
+
+    @abstractmethod
+    def clone(self, test_database_name: str) -> None:
+        """Copies the snapshot to the test database, the connection is set up to use it."""
+
+    def build(self, verbosity: int) -> None:
+        log.info('Building the test database snapshot %s', self.name)
+        self.create()
+        alias, verbosity = self.connection.alias, max(verbosity - 1, 0)
+        with using_database(self.connection, self.name):
+            call_command('migrate', database=alias, run_syncdb=True, interactive=False, verbosity=verbosity)
+            call_command('createcachetable', database=alias, verbosity=verbosity)
+
+
+class SQLiteSnapshot(Snapshot):
+    @property
+    def name(self) -> str:
+        return str(self.directory / f'{self.connection.alias}-{self.fingerprint}.sqlite3')
+
+    def exists(self) -> bool:
+        return Path(self.name).exists()
+
+    def create(self) -> None:
+        for path in self.directory.glob(f'{self.connection.alias}-*.sqlite3'):
+            path.unlink()
+
+    def clone(self, test_database_name: str) -> None:
+        self.connection.ensure_connection()
+        source = sqlite3.connect(f'file:{self.name}?mode=ro', uri=True)
+        try:
+            source.backup(self.connection.connection)
+        finally:
+            source.close()
+
+
+class PostgreSQLSnapshot(Snapshot):
+    @property
+    def name(self) -> str:
+        return f'{self.prefix}{self.fingerprint}'
+
+    @property
+    def prefix(self) -> str:
+        return f'test_{self.connection.settings_dict["NAME"]}_snapshot_'
+
+    def exists(self) -> bool:
+        with self.connection.creation._nodb_cursor() as cursor:  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+            cursor.execute('SELECT 1 FROM pg_database WHERE datname = %s', [self.name])
+            return cursor.fetchone() is not None
+
+    def create(self) -> None:
+        quote_name = self.connection.ops.quote_name
+        with self.connection.creation._nodb_cursor() as cursor:  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+            cursor.execute('SELECT datname FROM pg_database WHERE starts_with(datname, %s)', [self.prefix])
+            for (name,) in cursor.fetchall():
+                cursor.execute(f'DROP DATABASE {quote_name(name)}')
+            cursor.execute(f'CREATE DATABASE {quote_name(self.name)}')
+
+    def clone(self, test_database_name: str) -> None:
+        quote_name = self.connection.ops.quote_name
+        with self.connection.creation._nodb_cursor() as cursor:  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+            cursor.execute(f'DROP DATABASE IF EXISTS {quote_name(test_database_name)}')
+            cursor.execute(f'CREATE DATABASE {quote_name(test_database_name)} TEMPLATE {quote_name(self.name)}')
+
+
+SNAPSHOTS: dict[str, type[Snapshot]] = {
+    'sqlite': SQLiteSnapshot,
+    'postgresql': PostgreSQLSnapshot,
+}
+
+
+def clone_test_db(
+    connection: BaseDatabaseWrapper, directory: Path, *, rebuild: bool, serialize: bool, verbosity: int
+) -> str:
+    """``create_test_db`` copying a snapshot of the migrated database, returns the name of the test database."""
+    snapshot = SNAPSHOTS[connection.vendor](connection, directory)
+    test_database_name = connection.creation._get_test_db_name()  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+    # the workers of a pytest-xdist run share its id, the first one rebuilds the snapshot for the others
+    run_id = os.environ.get('PYTEST_XDIST_TESTRUNUID', '')
+    built_by = directory / f'{connection.alias}.run'
+    with file_lock(directory / f'{connection.alias}.lock'):
+        rebuild = rebuild and not (run_id and built_by.exists() and built_by.read_text() == run_id)
+        if rebuild or not snapshot.exists():
+            snapshot.build(verbosity)
+            built_by.write_text(run_id)
+        connection.close()
+        connection.settings_dict['NAME'] = test_database_name
+        snapshot.clone(test_database_name)
+
+    if serialize:
+        connection._test_serialized_contents = connection.creation.serialize_db_to_string()  # pyright: ignore[reportAttributeAccessIssue] # noqa: SLF001
+    connection.ensure_connection()
+    return test_database_name
+
+
+def setup_databases(
+    aliases: Set[str], serialized_aliases: Set[str], directory: Path, *, rebuild: bool, verbosity: int
+) -> list[tuple[Any, str, bool]]:
+    """``django.test.utils.setup_databases`` cloning the test databases from snapshots, the databases of other
+    engines are migrated. Returns the configuration expected by ``teardown_databases``."""
+    old_config = []
+    for alias in sorted(aliases):
+        connection = connections[alias]
+        old_name = connection.settings_dict['NAME']
+        serialize = alias in serialized_aliases
+        if connection.vendor in SNAPSHOTS:
+            clone_test_db(connection, directory, rebuild=rebuild, serialize=serialize, verbosity=verbosity)
+        else:
+            connection.creation.create_test_db(verbosity=verbosity, autoclobber=True, serialize=serialize)
+        old_config.append((connection, old_name, True))
+    return old_config
@@ -1,6 +1,9 @@
+import json
+
 import pytest
 from django.templatetags.static import static as django_static
 
+from yads.core import assets
 from yads.core.templatetags import core_tags
 
 
@@ -32,3 +35,72 @@ def test_production_mode_returns_hashed_filename(settings):
     result = core_tags.static(filename)
     expected = django_static('app.js')
     assert result == expected
+
+
+@pytest.fixture
+def manifest_storage(settings, tmp_path):
+    (tmp_path / 'staticfiles.json').write_text(
+        json.dumps(
+            {
+                'version': '1.1',
+                'paths': {
+                    'js/project.js': 'js/project.0123456789ab.js',
+                    'js/vendor.js': 'js/vendor.ba9876543210.js',
+                    'css/vendor.css': 'css/vendor.aaaaaaaaaaaa.css',
+                },
+            }
+        )
+    )
+    settings.STATIC_ROOT = tmp_path
+    settings.STORAGES = {
+        **settings.STORAGES,
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+    }
+
+
+@pytest.fixture
+def vite_manifest(settings, tmp_path):
+    manifest = {
+        'js/project.js': {'file': 'js/project.js', 'isEntry': True, 'imports': ['_vendor.js']},
+        '_vendor.js': {'file': 'js/vendor.js', 'imports': ['js/project.js'], 'css': ['css/vendor.css']},
+    }
+    settings.VITE_MANIFEST_PATH = tmp_path / 'manifest.json'
+    settings.VITE_MANIFEST_PATH.write_text(json.dumps(manifest))
+
+
+@pytest.mark.usefixtures('manifest_storage')
+def test_hashed_urls_come_from_the_manifest_index(settings, mocker):
+    settings.DEBUG = False
+    spy = mocker.spy(assets, 'django_static')
+
+    assert core_tags.static('/js/project.js') == '/static/js/project.0123456789ab.js'
+    assert core_tags.static('js/project.js') == '/static/js/project.0123456789ab.js'
+    assert not spy.called
+
+
+def test_names_outside_the_manifest_are_resolved_once(settings, mocker):
+    settings.DEBUG = False
+    spy = mocker.spy(assets, 'django_static')
+
+    urls = {core_tags.static('app.js') for _ in range(3)}
+
+    assert urls == {django_static('app.js')}
+    assert spy.call_count == 1
+
+
+@pytest.mark.usefixtures('manifest_storage', 'vite_manifest')
+def test_vite_preload_links_imported_chunks_and_styles(settings):
+    settings.DEBUG = False
+
+    assert core_tags.vite_preload('js/project.js') == (
+        '<link rel="modulepreload" href="/static/js/vendor.ba9876543210.js" />'
+        '<link rel="preload" href="/static/css/vendor.aaaaaaaaaaaa.css" as="style" />'
+    )
+    assert core_tags.vite_preload('js/unknown.js') == ''
+
+
+@pytest.mark.usefixtures('enable_vite', 'vite_manifest')
+def test_vite_preload_is_empty_with_the_dev_server(settings):
+    settings.DEBUG = True
+
+    assert core_tags.vite_preload('js/project.js') == ''
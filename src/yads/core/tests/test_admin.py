@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from yads.core.admin import CustomUserAdmin
+from yads.core.models import User
+from yads.core.pagination import EstimatedCountPaginator
+
+pytestmark = pytest.mark.django_db
+
+URL = '/admin/core/user/'
+
+
+@pytest.fixture
+def users(admin_user, django_user_model, monkeypatch):
+    monkeypatch.setattr(CustomUserAdmin, 'list_per_page', 2)
+    joined = timezone.now() - timedelta(days=1)
+    # two users joined at the same moment so the cursor has to fall back to the id
+    created = [django_user_model.objects.create_user(f'user{i}', date_joined=joined) for i in range(3)]
+    created[2].date_joined = created[1].date_joined = joined - timedelta(hours=1)
+    django_user_model.objects.bulk_update(created, ['date_joined'])
+    return [admin_user, created[0], created[2], created[1]]
+
+
+def listed(response):
+    return list(response.context['cl'].result_list)
+
+
+def test_changelist_pages_by_cursor(admin_client, users):
+    first = admin_client.get(URL)
+    cl = first.context['cl']
+
+    assert listed(first) == users[:2]
+    assert cl.next_url
+    assert 'Next page' in first.content.decode()
+
+    second = admin_client.get(URL + cl.next_url)
+
+    assert listed(second) == users[2:]
+    assert second.context['cl'].next_url is None
+    assert 'First page' in second.content.decode()
+
+
+def test_cursor_keeps_the_microseconds(admin_client, django_user_model, monkeypatch):
+    monkeypatch.setattr(CustomUserAdmin, 'list_per_page', 2)
+    joined = (timezone.now() - timedelta(days=1)).replace(microsecond=0)
+    for i in range(3):
+        # joined in the same millisecond, the newest first
+        django_user_model.objects.create_user(f'u{i}', date_joined=joined + timedelta(microseconds=300 - i * 100))
+
+    pages = [admin_client.get(URL)]
+    while next_url := pages[-1].context['cl'].next_url:
+        pages.append(admin_client.get(URL + next_url))
+
+    assert [user.username for page in pages for user in listed(page)] == ['admin', 'u0', 'u1', 'u2']
+
+
+def test_cursor_is_kept_out_of_filter_links(admin_client, users):
+    cl = admin_client.get(URL).context['cl']
+
+    cl = admin_client.get(URL + cl.next_url).context['cl']
+
+    assert 'after' not in cl.get_query_string({'q': 'user'})
+
+
+def test_sorting_by_a_column_uses_numbered_pages(admin_client, users):
+    response = admin_client.get(URL, {'o': '1'})
+
+    assert not response.context['cl'].keyset
+    assert [user.username for user in listed(response)] == ['admin', 'user0']
+
+
+def test_invalid_cursor_is_rejected(admin_client, users):
+    response = admin_client.get(URL, {'after': 'nonsense'})
+
+    assert response.status_code == 302
+    assert response['Location'].endswith('?e=1')
+
+
+def test_search(admin_client, users):
+    response = admin_client.get(URL, {'q': 'user1'})
+
+    assert listed(response) == [users[3]]
+
+
+def test_estimated_count_is_used_for_large_unfiltered_tables(mocker):
+    mocker.patch.object(EstimatedCountPaginator, 'estimated_count', return_value=2_000_000)
+
+    paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 100)
+
+    assert paginator.count == 2_000_000
+    assert paginator.estimated
+
+
+def test_small_tables_are_counted(users):
+    paginator = EstimatedCountPaginator(User.objects.order_by('pk'), 100)
+
+    assert paginator.estimated_count() is None
+    assert paginator.count == 4
+    assert not paginator.estimated
@@ -0,0 +1,60 @@
+import pytest
+from asgiref.sync import async_to_sync
+
+from yads.core.asgi import LifespanApplication
+
+
+async def http_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 204, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+def run_lifespan(*events):
+    incoming = [{'type': f'lifespan.{event}'} for event in events]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    async_to_sync(LifespanApplication(http_app))({'type': 'lifespan'}, receive, send)
+    return sent
+
+
+def test_lifespan_runs_startup_and_shutdown(mocker):
+    warm_up = mocker.patch('yads.core.asgi.warm_up')
+    close_all = mocker.patch('yads.core.asgi.connections.close_all')
+
+    assert run_lifespan('startup', 'shutdown') == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+    warm_up.assert_called_once()
+    close_all.assert_called_once()
+
+
+def test_failed_startup_is_reported(mocker):
+    mocker.patch('yads.core.asgi.warm_up', side_effect=RuntimeError('broken template'))
+    sent = []
+
+    async def receive():
+        return {'type': 'lifespan.startup'}
+
+    async def send(message):
+        sent.append(message)
+
+    with pytest.raises(RuntimeError):
+        async_to_sync(LifespanApplication(http_app))({'type': 'lifespan'}, receive, send)
+    assert sent == [{'type': 'lifespan.startup.failed', 'message': 'broken template'}]
+
+
+def test_http_requests_are_passed_on():
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request'}
+
+    async def send(message):
+        sent.append(message)
+
+    async_to_sync(LifespanApplication(http_app))({'type': 'http'}, receive, send)
+    assert sent[0]['status'] == 204
@@ -0,0 +1,106 @@
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+
+from yads.core.auth import CachedModelBackend, invalidate_all
+from yads.core.query_budget import record_queries
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings):
+    settings.RESPONSE_CACHE = False
+    cache.clear()
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create_user(username='editor')
+
+
+@pytest.fixture
+def editors():
+    group = Group.objects.create(name='editors')
+    group.permissions.add(Permission.objects.get(codename='change_user'))
+    return group
+
+
+def load(user_id) -> Any:
+    return CachedModelBackend().get_user(user_id)
+
+
+def test_authenticated_requests_do_not_query_the_database(client, user):
+    client.force_login(user)
+    client.get('/')
+
+    with record_queries() as recorder:
+        response = client.get('/')
+
+    assert response.wsgi_request.user == user
+    assert not recorder.queries
+
+
+def test_permissions_are_cached(user, editors):
+    user.groups.add(editors)
+    assert load(user.pk).has_perm('core.change_user')
+
+    with record_queries() as recorder:
+        cached = load(user.pk)
+        assert cached.has_perm('core.change_user')
+        assert not cached.has_perm('core.delete_user')
+
+    assert not recorder.queries
+
+
+def test_saving_the_user_invalidates_it(user):
+    load(user.pk)
+    user.is_active = False
+    user.save()
+
+    assert load(user.pk) is None
+
+
+def test_group_membership_changes_invalidate_the_permissions(user, editors):
+    assert not load(user.pk).has_perm('core.change_user')
+
+    user.groups.add(editors)
+    assert load(user.pk).has_perm('core.change_user')
+
+    editors.user_set.remove(user)
+    assert not load(user.pk).has_perm('core.change_user')
+
+
+def test_group_permission_changes_invalidate_all_users(user, editors):
+    user.groups.add(editors)
+    assert not load(user.pk).has_perm('core.delete_user')
+
+    editors.permissions.add(Permission.objects.get(codename='delete_user'))
+
+    assert load(user.pk).has_perm('core.delete_user')
+
+
+def test_invalidate_all_after_bulk_updates(user):
+    load(user.pk)
+    type(user).objects.filter(pk=user.pk).update(first_name='Ada')
+    assert load(user.pk).first_name == ''
+
+    invalidate_all()
+
+    assert load(user.pk).first_name == 'Ada'
+
+
+def test_async_lookups_share_the_cache(user, editors):
+    user.groups.add(editors)
+    backend = CachedModelBackend()
+    assert load(user.pk).has_perm('core.change_user')
+
+    with record_queries() as recorder:
+        cached: Any = async_to_sync(backend.aget_user)(user.pk)
+        assert async_to_sync(cached.ahas_perm)('core.change_user')
+
+    assert cached == user
+    assert not recorder.queries
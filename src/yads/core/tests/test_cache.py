@@ -0,0 +1,135 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+
+from yads.core.cache import LRUStore, TieredCache, cache_stats
+
+
+@pytest.fixture
+def tiered(settings):
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'yads.core.cache.TieredCache',
+            'LOCATION': 'test-shared',
+            'OPTIONS': {'MAX_ENTRIES': 3, 'L1_TIMEOUT': 60},
+        },
+        'test-shared': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'test-shared',
+        },
+    }
+    cache = caches['default']
+    assert isinstance(cache, TieredCache)
+    cache.clear()
+    cache.stats.reset()
+    yield cache
+    cache.clear()
+
+
+def test_lru_store_evicts_least_recently_used():
+    store = LRUStore(max_entries=2)
+    store.set('a', b'1', 60)
+    store.set('b', b'2', 60)
+    store.get('a')
+    assert store.set('c', b'3', 60) == 1
+    assert store.get('a') == b'1'
+    assert store.get('b') is None
+
+
+def test_lru_store_expires_entries():
+    store = LRUStore(max_entries=2)
+    store.set('a', b'1', 0.01)
+    time.sleep(0.02)
+    assert store.get('a') is None
+
+
+def test_get_is_served_from_l1(tiered):
+    tiered.set('key', 'value')
+    caches['test-shared'].set('key', 'changed')
+
+    assert tiered.get('key') == 'value'
+    assert tiered.stats.l1_hits == 1
+
+
+def test_get_falls_back_to_l2_and_fills_l1(tiered):
+    caches['test-shared'].set('key', 'value')
+
+    assert tiered.get('key') == 'value'
+    assert tiered.get('key') == 'value'
+    assert (tiered.stats.l2_hits, tiered.stats.l1_hits) == (1, 1)
+
+
+def test_l1_returns_copies(tiered):
+    tiered.set('key', ['value'])
+    tiered.get('key').append('mutated')
+
+    assert tiered.get('key') == ['value']
+
+
+def test_delete_and_incr_invalidate_l1(tiered):
+    tiered.set('key', 1)
+    tiered.incr('key')
+    assert tiered.get('key') == 2
+
+    tiered.delete('key')
+    assert tiered.get('key') is None
+
+
+def test_get_many_combines_both_levels(tiered):
+    tiered.set('a', 1)
+    caches['test-shared'].set('b', 2)
+
+    assert tiered.get_many(['a', 'b', 'c']) == {'a': 1, 'b': 2}
+
+
+def test_evictions_are_counted(tiered):
+    for i in range(5):
+        tiered.set(f'key-{i}', i)
+
+    assert tiered.stats.l1_evictions == 2
+    assert cache_stats()['test-shared']['l1_size'] == 3
+
+
+def test_get_or_set_computes_a_cold_key_once(tiered):
+    calls = []
+    start = threading.Barrier(8)
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'value'
+
+    def worker(_):
+        start.wait()
+        return caches['default'].get_or_set('cold', compute)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(worker, range(8)))
+
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_get_or_set_propagates_errors_and_releases_the_lock(tiered):
+    def fail():
+        raise ValueError
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        tiered.get_or_set('key', fail)
+
+    assert tiered.get_or_set('key', lambda: 'value') == 'value'
+
+
+def test_async_reads_answer_l1_hits_without_l2(tiered, mocker):
+    tiered.set_many({'a': 1, 'b': 2})
+    caches['test-shared'].set('c', 3)
+    l2_aget_many = mocker.spy(caches['test-shared'], 'aget_many')
+
+    assert async_to_sync(tiered.aget)('a') == 1
+    assert async_to_sync(tiered.aget_many)(['a', 'b', 'c']) == {'a': 1, 'b': 2, 'c': 3}
+    assert l2_aget_many.call_args.args[0] == {'c': tiered.make_key('c')}
+    assert async_to_sync(tiered.aget)('missing', 'default') == 'default'
@@ -0,0 +1,22 @@
+from django.test import RequestFactory
+
+from yads.core.context_processors import common
+
+
+def test_common_context_is_built_once(settings):
+    settings.DEBUG = False
+    request = RequestFactory().get('/')
+
+    assert common(request) == {'DEBUG': False}
+    assert common(request) is common(request)
+
+
+def test_common_context_follows_setting_changes(settings):
+    settings.DEBUG = False
+    request = RequestFactory().get('/')
+    common(request)
+
+    settings.DEBUG = True
+
+    assert common(request)['DEBUG'] is True
+    assert {'USE_VITE', 'VITE_URL'} <= set(common(request))
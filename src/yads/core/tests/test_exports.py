@@ -0,0 +1,114 @@
+import csv
+from typing import Any
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.exceptions import ImproperlyConfigured
+from django.test.client import AsyncClient
+from django.urls import path
+
+from config.urls import urlpatterns as project_urlpatterns
+from yads.core.exports import CSVExportView, acsv_chunks, csv_chunks
+from yads.core.models import User
+
+pytestmark = pytest.mark.django_db
+
+EXPORT_URL = '/admin/core/user/export/'
+
+urlpatterns = [
+    *project_urlpatterns,
+    path('users.csv', CSVExportView.as_view(queryset=User.objects.order_by('username'), fields=['username', 'email'])),
+]
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create_user(f'user{i}', f'user{i}@example.com', is_staff=i % 2 == 0)
+        for i in range(5)
+    ]
+
+
+def rows(response):
+    content = b''.join(response.streaming_content).decode()
+    return list(csv.reader(content.splitlines()))
+
+
+def test_rows_are_written_in_chunks(users):
+    chunks = list(csv_chunks(User.objects.order_by('pk'), ['username'], chunk_size=2))
+
+    assert chunks[0] == 'Username\r\n'
+    assert chunks[1:] == ['user0\r\nuser1\r\n', 'user2\r\nuser3\r\n', 'user4\r\n']
+
+
+def test_async_chunks_match_the_sync_ones(users):
+    async def collect():
+        return [chunk async for chunk in acsv_chunks(User.objects.order_by('pk'), ['username'], chunk_size=2)]
+
+    assert async_to_sync(collect)() == list(csv_chunks(User.objects.order_by('pk'), ['username'], chunk_size=2))
+
+
+def test_formulas_are_escaped(django_user_model):
+    django_user_model.objects.create_user('=HYPERLINK("http://example.com")', first_name='@SUM(A1)', last_name='-1')
+
+    chunks = list(csv_chunks(User.objects.all(), ['username', 'first_name', 'last_name', 'pk']))
+
+    [row] = csv.reader(chunks[1].splitlines())
+    assert row[:3] == ['\'=HYPERLINK("http://example.com")', "'@SUM(A1)", "'-1"]
+    assert not row[3].startswith("'")
+
+
+def test_export_view_without_a_queryset_is_improperly_configured(rf):
+    with pytest.raises(ImproperlyConfigured, match='CSVExportView is missing a QuerySet'):
+        CSVExportView.as_view(fields=['username'])(rf.get('/users.csv'))
+
+
+@pytest.mark.urls(__name__)
+def test_export_view(client, users):
+    response = client.get('/users.csv')
+
+    assert response.streaming
+    assert response['Content-Type'] == 'text/csv; charset=utf-8'
+    assert response['Content-Disposition'] == 'attachment; filename="users.csv"'
+    assert rows(response)[:2] == [['Username', 'Email address'], ['user0', 'user0@example.com']]
+
+
+def test_admin_export_applies_the_changelist_filters(admin_client, users):
+    response = admin_client.get(EXPORT_URL, {'is_staff__exact': '1', 'q': 'user'})
+
+    exported = rows(response)
+    assert exported[0][:3] == ['Username', 'Email address', 'First name']
+    assert [row[0] for row in exported[1:]] == ['user4', 'user2', 'user0']
+
+
+def test_changelist_links_to_the_export_with_its_filters(admin_client, users):
+    response = admin_client.get('/admin/core/user/', {'is_staff__exact': '1'})
+
+    assert f'href="{EXPORT_URL}?is_staff__exact=1"' in response.content.decode()
+
+
+def test_admin_action_exports_the_selection(admin_client, users):
+    response = admin_client.post(
+        '/admin/core/user/',
+        {'action': 'export_selected_csv', '_selected_action': [users[1].pk, users[3].pk]},
+    )
+
+    assert sorted(row[0] for row in rows(response)[1:]) == ['user1', 'user3']
+
+
+def test_export_requires_admin_login(client, users):
+    assert client.get(EXPORT_URL).status_code == 302
+
+
+def test_admin_export_streams_asynchronously_under_asgi(admin_user, users):
+    async def export():
+        # the stubs predate the async client methods and responses
+        client: Any = AsyncClient()
+        await client.aforce_login(admin_user)
+        response = await client.get(EXPORT_URL)
+        return response, b''.join([chunk async for chunk in response.streaming_content])
+
+    response, content = async_to_sync(export)()
+
+    assert response.is_async
+    assert content.decode().count('\n') == 7
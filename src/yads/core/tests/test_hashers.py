@@ -0,0 +1,78 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.hashers import check_password, get_hasher, identify_hasher, make_password
+from django.test import override_settings
+
+from yads.core import hashers
+from yads.core.hashers import Argon2PasswordHasher
+from yads.core.models import User
+
+PASSWORD = 'correct horse battery staple'
+
+# cheap parameters so the tests stay fast, they differ from the defaults to check the rehash on login
+FAST_ARGON2 = {'PASSWORD_ARGON2_TIME_COST': 1, 'PASSWORD_ARGON2_MEMORY_COST': 1024, 'PASSWORD_ARGON2_PARALLELISM': 1}
+
+
+@pytest.fixture
+def fast_argon2(settings):
+    for name, value in FAST_ARGON2.items():
+        setattr(settings, name, value)
+
+
+def test_default_hasher_uses_the_configured_parameters(fast_argon2):
+    encoded = make_password(PASSWORD)
+
+    assert isinstance(get_hasher(), Argon2PasswordHasher)
+    assert encoded.startswith('argon2$argon2id$v=19$m=1024,t=1,p=1$')
+    assert check_password(PASSWORD, encoded)
+    assert not check_password('wrong', encoded)
+
+
+@pytest.mark.django_db
+def test_hashes_of_djangos_hasher_are_verified_and_upgraded(fast_argon2):
+    with override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.Argon2PasswordHasher']):
+        user = User.objects.create_user(username='alice', password=PASSWORD)
+    encoded = user.password
+
+    assert identify_hasher(encoded).must_update(encoded)
+    assert user.check_password(PASSWORD)
+    user.refresh_from_db()
+    assert user.password != encoded
+    assert not get_hasher().must_update(user.password)
+
+
+def test_changing_the_parameters_upgrades_on_login(fast_argon2, settings):
+    encoded = make_password(PASSWORD)
+    settings.PASSWORD_ARGON2_TIME_COST = 2
+
+    assert get_hasher().must_update(encoded)
+
+
+@pytest.mark.django_db
+def test_async_login_rehashes(fast_argon2):
+    with override_settings(PASSWORD_ARGON2_TIME_COST=2):
+        user = User.objects.create_user(username='alice', password=PASSWORD)
+
+    assert async_to_sync(user.acheck_password)(PASSWORD)  # pyright: ignore[reportAttributeAccessIssue]
+    user.refresh_from_db()
+    assert user.password.startswith('argon2$argon2id$v=19$m=1024,t=1,p=1$')
+
+
+def test_hashing_runs_on_the_process_pool(fast_argon2, settings, mocker):
+    settings.PASSWORD_HASHER_WORKERS = 1
+    try:
+        encoded = make_password(PASSWORD)
+        pool = hashers.get_pool()
+        assert pool is not None
+        submit = mocker.spy(pool, 'submit')
+
+        assert check_password(PASSWORD, encoded)
+        assert submit.call_count == 1
+    finally:
+        hashers.shutdown_pool()
+
+
+def test_no_pool_without_workers(settings):
+    settings.PASSWORD_HASHER_WORKERS = 0
+
+    assert hashers.get_pool() is None
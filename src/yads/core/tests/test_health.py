@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from yads.core import health
+from yads.core.health import HealthCheckApplication
+
+pytestmark = pytest.mark.django_db
+
+
+async def django_app(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b'django'})
+
+
+def request(app, path, method='GET'):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    async_to_sync(app)({'type': 'http', 'path': path, 'method': method}, None, send)
+    return sent[0]['status'], sent[1]['body']
+
+
+@pytest.fixture
+def app():
+    return HealthCheckApplication(django_app)
+
+
+def test_liveness_is_answered_without_django(app):
+    assert request(app, '/api/healthz') == (200, b'ok')
+    assert request(app, '/api/healthz', 'HEAD') == (200, b'')
+    assert request(app, '/') == (404, b'django')
+
+
+def test_readiness_checks_the_database_and_cache(app):
+    status, body = request(app, '/api/readyz')
+
+    assert status == 200
+    assert json.loads(body) == {'database': 'ok', 'cache': 'ok'}
+
+
+def test_failed_checks_make_the_worker_unready(app, mocker):
+    mocker.patch.dict(health.CHECKS, {'database': mocker.Mock(side_effect=OSError), 'cache': mocker.Mock()})
+
+    status, body = request(app, '/api/readyz')
+
+    assert status == 503
+    assert json.loads(body) == {'database': 'error: OSError', 'cache': 'ok'}
+
+
+def test_slow_checks_time_out(app, mocker, settings):
+    settings.HEALTH_CHECK_TIMEOUT = 0.01
+    mocker.patch.dict(health.CHECKS, {'database': lambda: time.sleep(0.2), 'cache': mocker.Mock()})
+
+    status, body = request(app, '/api/readyz')
+
+    assert status == 503
+    assert json.loads(body)['database'] == 'timeout'
+
+
+def test_hung_checks_are_not_started_again(app, mocker, settings):
+    settings.HEALTH_CHECK_TIMEOUT = 0.2
+    settings.HEALTH_READY_TTL = 0
+    released = threading.Event()
+    database = mocker.Mock(side_effect=lambda: released.wait(5))
+    mocker.patch.dict(health.CHECKS, {'database': database, 'cache': mocker.Mock()})
+
+    for _ in range(2):
+        status, body = request(app, '/api/readyz')
+        assert status == 503
+        assert json.loads(body) == {'database': 'timeout', 'cache': 'ok'}
+    assert database.call_count == 1
+
+    released.set()
+    app.readiness._running['database'].result(timeout=5)
+    status, _ = request(app, '/api/readyz')
+    assert status == 200
+    assert database.call_count == 2
+
+
+def test_readiness_result_is_reused(app, mocker, settings):
+    check = mocker.Mock()
+    mocker.patch.dict(health.CHECKS, {'database': check, 'cache': check})
+
+    request(app, '/api/readyz')
+    request(app, '/api/readyz')
+    assert check.call_count == 2
+
+    settings.HEALTH_READY_TTL = 0
+    app.readiness.expires = 0
+    request(app, '/api/readyz')
+    assert check.call_count == 4
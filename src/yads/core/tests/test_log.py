@@ -0,0 +1,90 @@
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from yads.core.log import JSONFormatter, QueueHandler, QueueListener, RequestContextFilter
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def stream():
+    return io.StringIO()
+
+
+@pytest.fixture
+def json_log(stream):
+    """Logs the records of the `yads.core.middleware` logger as JSON through a queue."""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    records = queue.Queue(100)
+    queue_handler = QueueHandler(records)
+    queue_handler.addFilter(RequestContextFilter())
+    listener = QueueListener(records, handler)
+    logger = logging.getLogger('yads.core.middleware')
+    logger.addHandler(queue_handler)
+    yield listener
+    logger.removeHandler(queue_handler)
+    listener.stop()
+
+
+def lines(stream):
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_request_lines_are_logged_as_json(admin_client, settings, stream, json_log, admin_user):
+    settings.INSTRUMENTATION_SAMPLE_RATE = 1.0
+    settings.RESPONSE_CACHE = False
+
+    response = admin_client.get('/', headers={'X-Request-ID': 'lb-1234'})
+    json_log.stop()
+
+    [line] = lines(stream)
+    assert response['X-Request-ID'] == 'lb-1234'
+    assert line['request_id'] == 'lb-1234'
+    assert line['user_id'] == admin_user.pk
+    assert line['logger'] == 'yads.core.middleware'
+    assert (line['method'], line['path'], line['status']) == ('GET', '/', 200)
+    assert line['duration_ms'] > 0
+
+
+def test_invalid_request_ids_are_replaced(client):
+    response = client.get('/', headers={'X-Request-ID': 'no spaces\nor newlines'})
+
+    assert len(response['X-Request-ID']) == 32
+
+
+def test_records_outside_requests_have_no_request(stream, json_log):
+    try:
+        _ = 1 / 0
+    except ZeroDivisionError:
+        logging.getLogger('yads.core.middleware').exception('failed with %s', 'arguments')
+    json_log.stop()
+
+    [line] = lines(stream)
+    assert line['message'] == 'failed with arguments'
+    assert (line['request_id'], line['user_id']) == (None, None)
+    assert 'ZeroDivisionError' in line['exc_info']
+
+
+def test_full_queue_drops_and_counts_records():
+    records = queue.Queue(2)
+    handler = QueueHandler(records)
+    logger = logging.getLogger('yads.tests.log')
+    logger.addHandler(handler)
+    try:
+        for i in range(5):
+            logger.warning('record %d', i)
+        assert handler.dropped == 3
+
+        records.get_nowait()
+        records.get_nowait()
+        logger.warning('record 5')
+    finally:
+        logger.removeHandler(handler)
+
+    messages = [records.get_nowait().getMessage() for _ in range(2)]
+    assert messages == ['record 5', 'Dropped 3 log records, the log queue was full']
@@ -0,0 +1,111 @@
+import logging
+
+import pytest
+from django.core.cache import cache
+
+from yads.core.instrumentation import RequestMetrics, current_metrics, record_cache_access, time_queries
+from yads.core.middleware import InstrumentationMiddleware
+
+
+@pytest.fixture(autouse=True)
+def instrumentation(settings):
+    settings.INSTRUMENTATION_SAMPLE_RATE = 1.0
+    settings.INSTRUMENTATION_SERVER_TIMING = True
+    settings.INSTRUMENTATION_CONTEXT_PROCESSORS = False
+    settings.INTERNAL_IPS = ['127.0.0.1']
+    settings.RESPONSE_CACHE = False
+
+
+@pytest.fixture
+def middleware_log(caplog):
+    # the `yads` logger does not propagate to the root logger caplog listens on
+    logger = logging.getLogger('yads.core.middleware')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def test_server_timing_header_is_added(client):
+    response = client.get('/')
+
+    metrics = dict(part.strip().split(';', 1) for part in response['Server-Timing'].split(','))
+    assert set(metrics) == {'total', 'db', 'tpl', 'cache'}
+    assert float(metrics['tpl'].removeprefix('dur=')) > 0
+
+
+def test_metrics_are_logged_as_fields(client, middleware_log):
+    client.get('/')
+
+    record = middleware_log.records[-1]
+    assert (record.method, record.path, record.status) == ('GET', '/', 200)
+    assert record.duration_ms >= record.template_ms > 0
+
+
+def test_unsampled_requests_are_not_measured(client, settings, middleware_log):
+    settings.INSTRUMENTATION_SAMPLE_RATE = 0
+
+    response = client.get('/')
+
+    assert 'Server-Timing' not in response
+    assert not middleware_log.records
+
+
+def test_context_processors_can_be_profiled(client, settings, middleware_log):
+    settings.INSTRUMENTATION_CONTEXT_PROCESSORS = True
+
+    response = client.get('/')
+
+    assert 'ctx.common;dur=' in response['Server-Timing']
+    timings = middleware_log.records[-1].context_processors_ms
+    assert set(timings) >= {
+        'django.template.context_processors.csrf',
+        'django.contrib.auth.context_processors.auth',
+        'yads.core.context_processors.common',
+    }
+
+
+def test_server_timing_header_can_be_disabled(client, settings):
+    settings.INSTRUMENTATION_SERVER_TIMING = False
+
+    assert 'Server-Timing' not in client.get('/')
+
+
+def test_server_timing_header_is_not_sent_to_external_clients(client, settings):
+    settings.INTERNAL_IPS = []
+
+    assert 'Server-Timing' not in client.get('/', REMOTE_ADDR='203.0.113.7')
+
+
+@pytest.mark.parametrize(('is_staff', 'shown'), [(True, True), (False, False)])
+def test_server_timing_header_is_sent_to_loaded_staff_users(rf, settings, django_user_model, is_staff, shown):
+    settings.INTERNAL_IPS = []
+    request = rf.get('/', REMOTE_ADDR='203.0.113.7')
+    request._cached_user = django_user_model(username='staff', is_staff=is_staff)
+
+    assert InstrumentationMiddleware.shows_server_timing(request) is shown
+
+
+@pytest.mark.django_db
+def test_queries_are_counted_and_timed(django_user_model):
+    metrics = RequestMetrics()
+
+    with time_queries(metrics):
+        django_user_model.objects.count()
+        django_user_model.objects.exists()
+
+    assert metrics.db_queries == 2
+    assert metrics.db_time > 0
+
+
+def test_cache_lookups_are_recorded():
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+    try:
+        cache.set('instrumented', 1)
+        cache.get('instrumented')
+        cache.get('not-there')
+        record_cache_access(hit=False)
+    finally:
+        current_metrics.reset(token)
+
+    assert (metrics.cache_hits, metrics.cache_misses) == (1, 2)
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.urls import path
+
+from config.urls import urlpatterns as project_urlpatterns
+from yads.core.query_budget import QueryBudgetExceeded, query_budget, record_queries, sql_shape
+
+pytestmark = pytest.mark.django_db
+
+
+def n_plus_one(_):
+    users = get_user_model().objects.all()
+    return HttpResponse(', '.join(str(user.groups.count()) for user in users))
+
+
+urlpatterns = [
+    *project_urlpatterns,
+    path('n-plus-one/', n_plus_one),
+    path('budgeted/', query_budget(1)(n_plus_one)),
+    path('unlimited/', query_budget(None)(n_plus_one)),
+]
+
+
+@pytest.fixture
+def users(django_user_model):
+    return django_user_model.objects.bulk_create(django_user_model(username=f'user{i}') for i in range(10))
+
+
+def test_literals_and_in_lists_share_a_shape():
+    first = sql_shape("SELECT * FROM user WHERE id IN (%s, %s) AND name = 'a' LIMIT 21")
+    second = sql_shape("SELECT * FROM user WHERE id IN (%s, %s, %s) AND name = 'it''s' LIMIT 1")
+
+    assert first == second
+
+
+def test_repeated_queries_are_grouped(django_user_model, users):
+    with record_queries() as recorder:
+        for user in users:
+            user.groups.count()
+        django_user_model.objects.count()
+
+    assert len(recorder) == 11
+    assert [count for _, count in recorder.repeated(5)] == [10]
+
+
+def test_fixture_fails_over_budget(django_user_model, users, query_budget):
+    def n_plus_one():
+        for user in django_user_model.objects.all():
+            user.groups.count()
+
+    with pytest.raises(QueryBudgetExceeded, match='possible N\\+1'), query_budget(max_repeats=2):
+        n_plus_one()
+
+    with query_budget(2):
+        list(django_user_model.objects.prefetch_related('groups'))
+
+
+@pytest.mark.urls(__name__)
+def test_middleware_detects_n_plus_one(client, settings, users):
+    with pytest.raises(QueryBudgetExceeded, match='10 identical queries'):
+        client.get('/n-plus-one/')
+
+    settings.QUERY_BUDGET_RAISE = False
+    assert client.get('/n-plus-one/').status_code == 200
+
+
+@pytest.mark.urls(__name__)
+def test_views_declare_their_own_budget(client, users):
+    with pytest.raises(QueryBudgetExceeded, match='11 queries, the budget is 1'):
+        client.get('/budgeted/')
+
+    assert client.get('/unlimited/').status_code == 200
+
+
+def test_admin_changelist_stays_within_budget(admin_client, users, query_budget):
+    with query_budget(10, max_repeats=2):
+        response = admin_client.get('/admin/core/user/')
+
+    assert response.status_code == 200
@@ -0,0 +1,73 @@
+import pytest
+from django.core.cache import cache
+
+from yads.core.response_cache import invalidate_all, invalidate_path
+
+
+@pytest.fixture(autouse=True)
+def response_cache(settings):
+    settings.RESPONSE_CACHE = True
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_second_request_is_served_from_cache(client):
+    first = client.get('/')
+    second = client.get('/')
+
+    assert [t.name for t in first.templates] == ['base.html']
+    assert second.templates == []
+    assert second.content == first.content
+    assert second['ETag'] == first['ETag']
+
+
+def test_htmx_requests_get_the_partial_cached_separately(client):
+    page = client.get('/')
+    fragment = client.get('/', headers={'HX-Request': 'true', 'HX-Target': 'main'})
+    cached_fragment = client.get('/', headers={'HX-Request': 'true', 'HX-Target': 'main'})
+
+    assert fragment.templates
+    assert b'<html' not in fragment.content
+    assert b'Django + Tailwind + HTMX' in fragment.content
+    assert cached_fragment.content == fragment.content
+    assert cached_fragment.templates == []
+    assert fragment.content != page.content
+
+
+def test_boosted_requests_get_the_full_page(client):
+    response = client.get('/', headers={'HX-Request': 'true', 'HX-Boosted': 'true'})
+
+    assert b'<html' in response.content
+
+
+def test_conditional_requests_are_answered_with_not_modified(client):
+    etag = client.get('/')['ETag']
+
+    response = client.get('/', headers={'If-None-Match': etag})
+
+    assert response.status_code == 304
+    assert response.templates == []
+
+
+@pytest.mark.parametrize('invalidate', [lambda: invalidate_path('/'), invalidate_all])
+def test_invalidation_renders_again(client, invalidate):
+    client.get('/')
+    invalidate()
+
+    assert [t.name for t in client.get('/').templates] == ['base.html']
+
+
+def test_disabled_cache_always_renders(client, settings):
+    settings.RESPONSE_CACHE = False
+    client.get('/')
+
+    assert [t.name for t in client.get('/').templates] == ['base.html']
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_are_not_cached(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user(username='user'))
+    client.get('/')
+
+    assert [t.name for t in client.get('/').templates] == ['base.html']
@@ -0,0 +1,50 @@
+import pytest
+
+from config.sentry import RateLimiter, TracesSampler
+
+
+def asgi(path):
+    return {'asgi_scope': {'type': 'http', 'path': path}, 'transaction_context': {'name': 'generic ASGI request'}}
+
+
+@pytest.mark.parametrize('path', ['/', '/api/healthz', '/api/readyz', '/favicon.ico', '/static/main.css', '/media/a'])
+def test_probes_and_assets_are_never_traced(path):
+    assert TracesSampler(1.0)(asgi(path)) == 0.0
+
+
+def test_routes_have_their_own_rate(mocker):
+    sampler = TracesSampler(1.0, {'/admin/': 0.5, '/admin/core/user/': 0.0})
+    mocker.patch('config.sentry.random.random', return_value=0.4)
+
+    assert sampler(asgi('/admin/')) == 1.0
+    assert sampler(asgi('/admin/core/user/')) == 0.0
+    assert sampler({'wsgi_environ': {'PATH_INFO': '/accounts/'}}) == 1.0
+
+    mocker.patch('config.sentry.random.random', return_value=0.6)
+    assert sampler(asgi('/admin/')) == 0.0
+
+
+def test_upstream_decision_is_kept():
+    sampler = TracesSampler(0.0)
+
+    assert sampler({**asgi('/accounts/'), 'parent_sampled': True}) == 1.0
+    assert TracesSampler(1.0)({**asgi('/accounts/'), 'parent_sampled': False}) == 0.0
+
+
+def test_sampled_transactions_are_rate_limited(mocker):
+    clock = mocker.patch('config.sentry.time.monotonic', return_value=100.0)
+    sampler = TracesSampler(1.0, max_per_second=2)
+
+    assert [sampler(asgi('/accounts/')) for _ in range(3)] == [1.0, 1.0, 0.0]
+
+    clock.return_value = 100.5
+    assert [sampler(asgi('/accounts/')) for _ in range(2)] == [1.0, 0.0]
+
+
+def test_rate_limits_below_one_per_second(mocker):
+    clock = mocker.patch('config.sentry.time.monotonic', return_value=100.0)
+    limiter = RateLimiter(0.5)
+
+    assert [limiter.acquire(), limiter.acquire()] == [True, False]
+    clock.return_value = 102.0
+    assert limiter.acquire()
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.sessions.models import Session
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.utils import timezone
+
+from yads.core.cache import TieredCache
+from yads.core.query_budget import record_queries
+from yads.core.sessions import session_model, sweep_batches, sweep_expired_sessions
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+def create_sessions(count, *, expired):
+    prefix, offset = ('expired', timedelta(days=-1)) if expired else ('active', timedelta(days=1))
+    Session.objects.bulk_create(
+        Session(session_key=f'{prefix}{i:033}', session_data='', expire_date=timezone.now() + offset)
+        for i in range(count)
+    )
+
+
+@pytest.fixture
+def database_l2(settings):
+    """The default cache settings: the tiered cache in front of the database cache."""
+    settings.CACHES = {
+        'default': {
+            'BACKEND': 'yads.core.cache.TieredCache',
+            'LOCATION': 'test-sessions-shared',
+            'OPTIONS': {'L1_TIMEOUT': 60},
+        },
+        'test-sessions-shared': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        },
+    }
+    call_command('createcachetable')
+    tiered = caches['default']
+    assert isinstance(tiered, TieredCache)
+    tiered.clear()
+    return tiered
+
+
+def logged_in_request(client):
+    """Requests the home page and loads the user, and with it the session, before the queries are checked."""
+    with record_queries() as recorder:
+        assert client.get('/').wsgi_request.user.is_authenticated
+    return [sql for sql, _ in recorder.queries]
+
+
+def test_sessions_are_read_from_the_cache(client, settings, django_user_model):
+    settings.RESPONSE_CACHE = False
+    client.force_login(django_user_model.objects.create_user(username='user'))
+    client.get('/')
+
+    queries = logged_in_request(client)
+
+    assert not [sql for sql in queries if 'django_session' in sql]
+
+
+def test_sessions_in_l1_cost_no_query_with_the_database_l2(client, settings, django_user_model, database_l2):
+    settings.RESPONSE_CACHE = False
+    client.force_login(django_user_model.objects.create_user(username='user'))
+    client.get('/')
+
+    assert not [sql for sql in logged_in_request(client) if 'django_session' in sql or 'django_cache' in sql]
+
+
+def test_sessions_missing_l1_cost_a_cache_query_with_the_database_l2(client, settings, django_user_model, database_l2):
+    settings.RESPONSE_CACHE = False
+    client.force_login(django_user_model.objects.create_user(username='user'))
+    client.get('/')
+    database_l2._l1.clear()
+
+    queries = logged_in_request(client)
+
+    assert not [sql for sql in queries if 'django_session' in sql]
+    assert [sql for sql in queries if 'django_cache' in sql]
+
+
+def test_sweep_deletes_expired_sessions_in_batches():
+    create_sessions(5, expired=True)
+    create_sessions(2, expired=False)
+
+    assert list(sweep_batches(Session, batch_size=2)) == [2, 2, 1]
+    assert Session.objects.count() == 2
+    assert not Session.objects.filter(expire_date__lt=timezone.now()).exists()
+
+
+def test_sweep_expired_sessions_returns_the_total():
+    create_sessions(3, expired=True)
+
+    assert sweep_expired_sessions(batch_size=2) == 3
+
+
+def test_signed_cookie_sessions_have_nothing_to_sweep(settings):
+    settings.SESSION_ENGINE = 'django.contrib.sessions.backends.signed_cookies'
+    create_sessions(1, expired=True)
+    out = StringIO()
+
+    call_command('sweep_sessions', stdout=out)
+
+    assert session_model() is None
+    assert 'nothing to sweep' in out.getvalue()
+    assert Session.objects.count() == 1
+
+
+def test_sweep_sessions_command():
+    create_sessions(3, expired=True)
+    out = StringIO()
+
+    call_command('sweep_sessions', '--batch-size', '2', '--pause', '0', stdout=out)
+
+    assert 'Deleted 3 expired sessions' in out.getvalue()
+    assert not Session.objects.exists()
@@ -0,0 +1,37 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from yads.core.startup import parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:        10 |         10 |     pydantic.version
+import time:       200 |        210 |   pydantic
+import time:        30 |         30 |   dotenv
+import time:         5 |        245 | config.settings.env
+some warning written to stderr
+import time:         7 |          7 | django
+"""
+
+
+def test_import_tree_is_built_from_the_importtime_report():
+    env, django = parse_importtime(IMPORTTIME.splitlines())
+
+    assert (env.name, env.self_us, env.cumulative_us) == ('config.settings.env', 5, 245)
+    assert [child.name for child in env.children] == ['pydantic', 'dotenv']
+    assert [child.name for child in env.children[0].children] == ['pydantic.version']
+    assert (django.name, django.children) == ('django', [])
+
+
+def test_command_reports_the_phases_and_imports():
+    out = StringIO()
+
+    call_command('startup_profile', '--min-ms', '0', '--depth', '1', stdout=out)
+
+    report = out.getvalue()
+    for phase in ('settings', 'logging', 'apps', 'ready'):
+        assert f'ms  {phase}\n' in report
+    assert 'ms    core\n' in report
+    assert 'ms  config.settings.base\n' in report
+    assert 'Set up Django in' in report
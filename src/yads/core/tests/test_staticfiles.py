@@ -0,0 +1,94 @@
+import pytest
+import zstandard
+from asgiref.sync import async_to_sync
+from django.http import HttpResponse
+from django.test.client import AsyncRequestFactory, RequestFactory
+
+from yads.core.staticfiles import Compressor, WhiteNoiseMiddleware
+
+CSS = b'body { color: red; margin: 0 auto; }\n' * 200
+
+
+@pytest.fixture
+def static_root(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path
+    (tmp_path / 'project.css').write_bytes(CSS)
+    Compressor(quiet=True).compress(str(tmp_path / 'project.css'))
+    return tmp_path
+
+
+async def achunks(response):
+    return [chunk async for chunk in response]
+
+
+def read(response):
+    return b''.join(async_to_sync(achunks)(response))
+
+
+@pytest.fixture
+def whitenoise(static_root):
+    return WhiteNoiseMiddleware(lambda _: HttpResponse('not a static file'))
+
+
+def test_compressor_writes_zstd_brotli_and_gzip_variants(static_root):
+    assert sorted(path.name for path in static_root.iterdir()) == [
+        'project.css',
+        'project.css.br',
+        'project.css.gz',
+        'project.css.zst',
+    ]
+
+
+def test_incompressible_files_get_no_variants(tmp_path):
+    path = tmp_path / 'logo.png'
+    path.write_bytes(b'\x89PNG')
+
+    assert Compressor(quiet=True).compress(str(path)) == []
+
+
+def test_zstd_is_served_to_clients_that_accept_it(whitenoise):
+    response = whitenoise(AsyncRequestFactory().get('/static/project.css', headers={'Accept-Encoding': 'zstd'}))
+
+    assert response['Content-Encoding'] == 'zstd'
+    assert 'Accept-Encoding' in response['Vary']
+    assert zstandard.ZstdDecompressor().decompress(read(response)) == CSS
+
+
+def test_asgi_responses_are_streamed_in_chunks(whitenoise, monkeypatch):
+    monkeypatch.setattr('yads.core.staticfiles.CHUNK_SIZE', 1024)
+    response = whitenoise(AsyncRequestFactory().get('/static/project.css'))
+
+    assert response.is_async
+    chunks = async_to_sync(achunks)(response)
+    assert b''.join(chunks) == CSS
+    assert max(map(len, chunks)) == 1024
+    assert int(response['Content-Length']) == len(CSS)
+
+
+def test_asgi_range_requests_are_streamed(whitenoise):
+    response = whitenoise(AsyncRequestFactory().get('/static/project.css', headers={'Range': 'bytes=5-9'}))
+
+    assert response.status_code == 206
+    assert read(response) == CSS[5:10]
+
+
+def test_wsgi_responses_use_the_file_wrapper(whitenoise):
+    response = whitenoise(RequestFactory().get('/static/project.css', headers={'Accept-Encoding': 'gzip, br'}))
+
+    assert response.streaming
+    assert response['Content-Encoding'] == 'br'
+    response.file_to_stream.close()
+
+
+def test_compressed_variants_are_not_served_directly(whitenoise):
+    assert whitenoise(RequestFactory().get('/static/project.css.zst')).content == b'not a static file'
+
+
+def test_async_mode_serves_static_files_on_the_event_loop(static_root):
+    async def get_response(_):
+        return HttpResponse('not a static file')
+
+    whitenoise = async_to_sync(WhiteNoiseMiddleware(get_response))  # pyright: ignore[reportArgumentType]
+
+    assert read(whitenoise(AsyncRequestFactory().get('/static/project.css'))) == CSS
+    assert whitenoise(AsyncRequestFactory().get('/')).content == b'not a static file'
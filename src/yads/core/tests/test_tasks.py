@@ -0,0 +1,186 @@
+# the stubs lack django.tasks, the @task functions below are seen as plain functions
+# pyright: reportFunctionMemberAccess=false
+
+import logging
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.tasks import TaskResultStatus, task  # pyright: ignore[reportMissingImports]
+from django.utils import timezone
+
+from yads.core.models import TaskRecord
+from yads.core.tasks import LeaseExpiredError, Worker
+
+# the workers run the tasks on their own threads and database connections. SQLite locks the whole table while one
+# of them writes, so the tests run one task at a time (``concurrency=1``), the worker not claiming while it runs.
+pytestmark = pytest.mark.django_db(transaction=True)
+
+ran = []
+
+
+@task
+def add(a, b):
+    ran.append((a, b))
+    return a + b
+
+
+@task(priority=10)
+def urgent():
+    ran.append('urgent')
+
+
+@task(takes_context=True)
+def flaky(context):
+    if context.attempt < 3:
+        msg = f'attempt {context.attempt}'
+        raise RuntimeError(msg)
+    return context.attempt
+
+
+@task
+async def fetch(value):
+    return {'value': value}
+
+
+@pytest.fixture(autouse=True)
+def clean():
+    ran.clear()
+
+
+@pytest.fixture
+def tasks_log(caplog):
+    # the `yads` logger does not propagate to the root logger caplog listens on
+    logger = logging.getLogger('yads.core.tasks')
+    logger.addHandler(caplog.handler)
+    yield caplog
+    logger.removeHandler(caplog.handler)
+
+
+def test_enqueued_tasks_are_stored():
+    result = add.enqueue(1, b=2)
+
+    record = TaskRecord.objects.get()
+    assert (record.task_path, record.args, record.kwargs) == ('yads.core.tests.test_tasks.add', [1], {'b': 2})
+    assert add.get_result(result.id).status == TaskResultStatus.READY
+
+
+def test_worker_runs_the_most_important_tasks_first():
+    result = add.enqueue(1, 2)
+    urgent.enqueue()
+
+    stats = Worker(concurrency=1).run(burst=True)
+
+    assert ran == ['urgent', (1, 2)]
+    assert stats.succeeded == 2
+    result.refresh()
+    assert result.status == TaskResultStatus.SUCCESSFUL
+    assert result.return_value == 3
+    assert len(result.worker_ids) == 1
+
+
+def test_failed_tasks_are_retried_with_backoff(settings):
+    settings.TASKS = {'default': {**settings.TASKS['default'], 'OPTIONS': {'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 60}}}
+    result = flaky.using(backend='default').enqueue()
+    worker = Worker(concurrency=1)
+
+    worker.run(burst=True)
+
+    record = TaskRecord.objects.get()
+    assert record.status == TaskResultStatus.READY
+    assert record.run_after > timezone.now() + timedelta(seconds=50)
+
+    for _ in range(2):
+        TaskRecord.objects.update(run_after=timezone.now())
+        worker.run(burst=True)
+
+    result.refresh()
+    assert result.status == TaskResultStatus.SUCCESSFUL
+    assert result.return_value == 3
+    assert [error.exception_class for error in result.errors] == [RuntimeError, RuntimeError]
+    assert (worker.stats.retried, worker.stats.succeeded) == (2, 1)
+
+
+def test_tasks_fail_after_the_last_attempt(settings):
+    settings.TASKS = {'default': {**settings.TASKS['default'], 'OPTIONS': {'MAX_ATTEMPTS': 1}}}
+    result = flaky.using(backend='default').enqueue()
+
+    Worker(concurrency=1).run(burst=True)
+
+    result.refresh()
+    assert result.status == TaskResultStatus.FAILED
+    assert 'RuntimeError: attempt 1' in result.errors[0].traceback
+
+
+def test_deferred_tasks_wait():
+    add.using(run_after=timezone.now() + timedelta(hours=1)).enqueue(1, 2)
+
+    assert Worker(concurrency=1).run(burst=True).claimed == 0
+
+
+def test_asyncio_worker_runs_coroutines_and_functions():
+    coroutine = fetch.enqueue('x')
+    add.enqueue(2, 2)
+
+    stats = Worker(concurrency=1, use_asyncio=True).run(burst=True)
+
+    assert stats.succeeded == 2
+    assert fetch.get_result(coroutine.id).return_value == {'value': 'x'}
+
+
+def test_tasks_are_handed_back_when_their_outcome_cannot_be_recorded(monkeypatch, tasks_log):
+    def locked(*_):
+        msg = 'database table is locked: core_taskrecord'
+        raise DatabaseError(msg)
+
+    monkeypatch.setattr(Worker, 'succeeded', locked)
+    add.enqueue(1, 2)
+
+    Worker(concurrency=1).run(burst=True)
+
+    record = TaskRecord.objects.get()
+    assert record.status == TaskResultStatus.READY
+    assert record.run_after > timezone.now()
+    assert 'handing it back' in tasks_log.text
+
+
+def test_workers_renew_the_lease_of_their_tasks():
+    add.enqueue(1, 2)
+    worker = Worker()
+    worker.next_batch(0, None)
+    TaskRecord.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+    worker.heartbeat()
+
+    record = TaskRecord.objects.get()
+    assert record.status == TaskResultStatus.RUNNING
+    assert record.heartbeat_at
+    assert record.heartbeat_at > timezone.now() - timedelta(minutes=1)
+
+
+def test_tasks_of_lost_workers_are_reclaimed(settings):
+    settings.TASKS = {'default': {**settings.TASKS['default'], 'OPTIONS': {'MAX_ATTEMPTS': 3, 'RETRY_DELAY': 0}}}
+    result = add.enqueue(1, 2)
+    Worker().claim(1)
+    TaskRecord.objects.update(heartbeat_at=timezone.now() - timedelta(hours=1))
+
+    stats = Worker(concurrency=1).run(burst=True)
+
+    assert (stats.reclaimed, stats.succeeded) == (1, 1)
+    result.refresh()
+    assert result.status == TaskResultStatus.SUCCESSFUL
+    assert [error.exception_class for error in result.errors] == [LeaseExpiredError]
+    assert len(result.worker_ids) == 2
+
+
+def test_command_stops_after_max_tasks():
+    for i in range(3):
+        add.enqueue(i, i)
+    out = StringIO()
+
+    call_command('task_worker', '--max-tasks', '2', '--concurrency', '1', stdout=out)
+
+    assert 'Ran 2 tasks: 2 succeeded' in out.getvalue()
+    assert TaskRecord.objects.filter(status=TaskResultStatus.READY).count() == 1
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import pytest
+from django.db import connections
+
+from yads.core.testing import migrations_fingerprint
+
+
+@pytest.mark.django_db
+def test_the_test_database_is_a_copy_of_the_snapshot(request):
+    connection = connections['default']
+    # the snapshots are kept in pytest's cache, which `-p no:cacheprovider` turns off
+    cache = getattr(request.config, 'cache', None)
+    if cache is None or request.config.option.no_db_snapshot or connection.vendor != 'sqlite':
+        pytest.skip('no SQLite snapshot')
+    snapshot = cache.mkdir('db-snapshots') / f'default-{migrations_fingerprint(connection)}.sqlite3'
+
+    assert snapshot.exists()
+    assert 'core_user' in connection.introspection.table_names()
+
+
+def test_changed_migrations_change_the_fingerprint(mocker):
+    connection = connections['default']
+    fingerprint = migrations_fingerprint(connection)
+    read_bytes = Path.read_bytes
+
+    def edited(path):
+        return read_bytes(path) + (b'\n# edited' if path.name == '0001_initial.py' else b'')
+
+    mocker.patch.object(Path, 'read_bytes', edited)
+
+    assert migrations_fingerprint(connection) != fingerprint
@@ -0,0 +1,85 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from yads.core.models import User
+from yads.core.user_io import export_users, import_users
+
+pytestmark = pytest.mark.django_db
+
+PASSWORD = 'correct horse battery staple'
+
+
+@pytest.fixture(autouse=True)
+def fast_argon2(settings):
+    settings.PASSWORD_ARGON2_TIME_COST = 1
+    settings.PASSWORD_ARGON2_MEMORY_COST = 1024
+
+
+def test_import_csv_hashes_the_passwords_on_a_pool(tmp_path):
+    path = tmp_path / 'users.csv'
+    path.write_text(
+        'username,email,password,is_staff,date_joined\n'
+        f'ada,Ada@EXAMPLE.com,{PASSWORD},true,2024-01-02T03:04:05+00:00\n'
+        'grace,grace@example.com,,0,\n'
+    )
+    out, err = StringIO(), StringIO()
+
+    call_command('import_users', str(path), '--batch-size', '1', '--hash-workers', '1', stdout=out, stderr=err)
+
+    ada, grace = User.objects.order_by('username')
+    assert ada.check_password(PASSWORD)
+    assert ada.is_staff
+    assert ada.email == 'Ada@example.com'
+    assert ada.date_joined.year == 2024
+    assert not grace.has_usable_password()
+    assert '2 users imported' in err.getvalue()
+    assert 'Imported 2 users' in out.getvalue()
+
+
+def test_export_and_import_round_trip_as_json_lines(django_user_model):
+    django_user_model.objects.create_user('ada', 'ada@example.com', PASSWORD, first_name='Ada')
+    out = StringIO()
+
+    assert list(export_users(out, 'jsonl', passwords=True)) == [1]
+    [record] = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert record['username'] == 'ada'
+    assert record['password_hash'].startswith('argon2$')
+
+    User.objects.all().delete()
+    assert list(import_users([record])) == [1]
+
+    imported = User.objects.get()
+    assert imported.first_name == 'Ada'
+    assert imported.check_password(PASSWORD)
+
+
+def test_export_command_writes_csv_without_passwords(django_user_model):
+    django_user_model.objects.create_user('ada', 'ada@example.com', PASSWORD)
+    out, err = StringIO(), StringIO()
+
+    call_command('export_users', stdout=out, stderr=err)
+
+    header, row = out.getvalue().splitlines()
+    assert header == 'username,email,first_name,last_name,is_active,is_staff,is_superuser,date_joined,last_login'
+    assert row.startswith('ada,ada@example.com,,,True,False,False,')
+    assert 'Exported 1 users' in err.getvalue()
+
+
+def test_existing_users_can_be_skipped(django_user_model):
+    django_user_model.objects.create_user('ada', first_name='Original')
+
+    list(import_users([{'username': 'ada', 'first_name': 'Copy'}, {'username': 'grace'}], skip_existing=True))
+
+    assert User.objects.get(username='ada').first_name == 'Original'
+    assert User.objects.filter(username='grace').exists()
+
+
+def test_invalid_records_are_reported(tmp_path):
+    path = tmp_path / 'users.jsonl'
+    path.write_text('{"username": "ada"}\n{"email": "nobody@example.com"}\n')
+
+    with pytest.raises(CommandError, match='record 2: username is missing, 1 users were imported before it'):
+        call_command('import_users', str(path), '--batch-size', '1', stderr=StringIO())
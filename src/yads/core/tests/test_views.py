@@ -0,0 +1,52 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test.client import AsyncClient
+from django.urls import path
+
+from config.urls import urlpatterns as project_urlpatterns
+from yads.core.views import HomeView
+
+
+async def user_count(_):
+    return HttpResponse(str(await get_user_model().objects.acount()))
+
+
+urlpatterns = [*project_urlpatterns, path('users/count/', user_count)]
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(settings):
+    settings.RESPONSE_CACHE = False
+
+
+def test_home_view_is_async():
+    assert HomeView.view_is_async  # pyright: ignore[reportAttributeAccessIssue]
+
+
+def test_home_view_renders_under_the_async_handler():
+    response = async_to_sync(AsyncClient().get)('/')
+
+    assert response.status_code == 200
+    assert b'<html' in response.content
+
+
+def test_home_view_renders_the_partial_for_htmx():
+    response = async_to_sync(AsyncClient().get)('/', headers={'HX-Request': 'true'})
+
+    assert b'<html' not in response.content
+    assert b'Django + Tailwind + HTMX' in response.content
+
+
+@pytest.mark.django_db
+@pytest.mark.urls(__name__)
+def test_async_orm_queries_are_instrumented(settings, django_user_model):
+    settings.INSTRUMENTATION_SAMPLE_RATE = 1.0
+    settings.INTERNAL_IPS = ['127.0.0.1']
+    django_user_model.objects.create_user(username='user')
+
+    response = async_to_sync(AsyncClient().get)('/users/count/')
+
+    assert response.content == b'1'
+    assert 'desc="1 queries"' in response['Server-Timing']
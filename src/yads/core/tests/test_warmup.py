@@ -0,0 +1,48 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.template import Engine
+
+from yads.core import warmup
+
+
+@pytest.fixture
+def cached_loader():
+    [loader] = warmup.cached_loaders(Engine.get_default())
+    loader.reset()
+    yield loader
+    loader.reset()
+
+
+def test_templates_of_all_template_dirs_are_compiled():
+    compiled = {template.name: template for template in warmup.compile_templates()}
+
+    assert compiled['base.html'].partials == 1
+    assert 'admin/change_list.html' in compiled
+
+
+def test_warm_up_fills_the_cached_loader(settings, cached_loader):
+    settings.TEMPLATE_WARMUP = True
+
+    warmup.warm_up()
+
+    assert 'base.html' in cached_loader.get_template_cache
+
+
+def test_warm_up_can_be_turned_off(settings, cached_loader):
+    settings.TEMPLATE_WARMUP = False
+
+    warmup.warm_up()
+
+    assert not cached_loader.get_template_cache
+
+
+def test_command_reports_compile_times():
+    stdout = StringIO()
+
+    call_command('warm_templates', limit=3, stdout=stdout)
+
+    lines = stdout.getvalue().splitlines()
+    assert len(lines) == 4
+    assert lines[-1].startswith('Compiled ')
@@ -0,0 +1,187 @@
+"""Bulk user import and export
+
+Streams user records between the database and CSV or JSON lines files in batches, so memory use doesn't grow with
+the number of users. ``manage.py import_users`` and ``manage.py export_users`` are the command line front ends.
+
+Records have the fields of ``FIELDS``. On import ``password`` is a raw password, hashed on a process pool with the
+default hasher (see ``yads.core.hashers.make_passwords``), and ``password_hash`` an already hashed one, as written by
+the export with ``passwords=True``. Users without either get an unusable password. Each batch is written in one
+transaction, with ``COPY`` on PostgreSQL or ``bulk_create`` elsewhere (and when existing usernames are skipped).
+The export reads the table with a server-side cursor on PostgreSQL.
+"""
+
+import csv
+import json
+import secrets
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from io import TextIOBase
+from itertools import batched
+from typing import Any, Literal, TextIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, router, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from yads.core.hashers import make_passwords
+
+User = get_user_model()
+
+Format = Literal['csv', 'jsonl']
+
+FIELDS = (
+    'username',
+    'email',
+    'first_name',
+    'last_name',
+    'is_active',
+    'is_staff',
+    'is_superuser',
+    'date_joined',
+    'last_login',
+)
+BOOLEAN_FIELDS = {'is_active', 'is_staff', 'is_superuser'}
+DATETIME_FIELDS = {'date_joined', 'last_login'}
+
+
+def format_for(path: str, default: Format = 'csv') -> Format:
+    """Returns the format matching the extension of ``path``."""
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def read_records(stream: TextIO, fmt: Format) -> Iterator[dict[str, Any]]:
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _boolean(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in {'1', 'true', 'yes', 't', 'y'}
+    return bool(value)
+
+
+def _datetime(value: Any) -> datetime | None:
+    if not value:
+        return None
+    parsed = value if isinstance(value, datetime) else parse_datetime(value)
+    if parsed is None:
+        msg = f'invalid date and time {value!r}'
+        raise ValueError(msg)
+    return parsed if timezone.is_aware(parsed) else timezone.make_aware(parsed)
+
+
+def build_user(record: dict[str, Any]) -> tuple[Any, str | None]:
+    """Returns an unsaved user for ``record`` and the raw password still to be hashed into it."""
+    if not record.get('username'):
+        msg = 'username is missing'
+        raise ValueError(msg)
+
+    values: dict[str, Any] = {}
+    for name in FIELDS:
+        value = record.get(name)
+        if value in {None, ''}:
+            continue
+        if name in BOOLEAN_FIELDS:
+            value = _boolean(value)
+        elif name in DATETIME_FIELDS:
+            value = _datetime(value)
+        values[name] = value
+    values['username'] = User.normalize_username(values['username'])
+    values['email'] = User.objects.normalize_email(values.get('email', ''))
+    user = User(**values)
+
+    password = record.get('password') or None
+    # same as make_password(None), whose get_random_string() takes most of the time of a password-less import
+    user.password = record.get('password_hash') or UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(30)
+    return user, password
+
+
+def copy_users(users: list[Any], using: str) -> None:
+    """Inserts ``users`` with PostgreSQL's ``COPY``."""
+    connection = connections[using]
+    fields = [field for field in User._meta.concrete_fields if not field.primary_key]  # noqa: SLF001
+    table = connection.ops.quote_name(User._meta.db_table)  # noqa: SLF001
+    columns = ', '.join(connection.ops.quote_name(field.column) for field in fields)
+    # the stubs type the wrapped cursor as psycopg2's, which has no copy()
+    with (
+        connection.cursor() as cursor,
+        cursor.cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy,  # pyright: ignore[reportAttributeAccessIssue]
+    ):
+        for user in users:
+            copy.write_row([field.get_db_prep_save(getattr(user, field.attname), connection) for field in fields])
+
+
+def import_users(
+    records: Iterable[dict[str, Any]],
+    *,
+    batch_size: int = 1000,
+    skip_existing: bool = False,
+    use_copy: bool = True,
+    pool: ProcessPoolExecutor | None = None,
+) -> Iterator[int]:
+    """Saves the users of ``records`` batch by batch, yielding the number of records of each batch.
+
+    Raises ``ValueError`` naming the number of the first invalid record, the batches before it are saved.
+    """
+    using = router.db_for_write(User)
+    use_copy = use_copy and not skip_existing and connections[using].vendor == 'postgresql'
+    numbered = enumerate(records, start=1)
+    for batch in batched(numbered, batch_size, strict=False):
+        users, passwords = [], []
+        for number, record in batch:
+            try:
+                user, password = build_user(record)
+            except (ValueError, TypeError) as e:
+                msg = f'record {number}: {e}'
+                raise ValueError(msg) from e
+            users.append(user)
+            passwords.append(password)
+
+        to_hash = [(user, password) for user, password in zip(users, passwords, strict=True) if password]
+        for (user, _), encoded in zip(to_hash, make_passwords([p for _, p in to_hash], pool), strict=True):
+            user.password = encoded
+
+        with transaction.atomic(using=using):
+            if use_copy:
+                copy_users(users, using)
+            else:
+                User.objects.using(using).bulk_create(users, ignore_conflicts=skip_existing)
+        yield len(users)
+
+
+def export_users(
+    stream: TextIO | TextIOBase, fmt: Format, *, passwords: bool = False, batch_size: int = 2000
+) -> Iterator[int]:
+    """Writes every user to ``stream``, yielding the number of users written after each ``batch_size`` users."""
+    columns = [*FIELDS, 'password'] if passwords else list(FIELDS)
+    names = [*FIELDS, 'password_hash'] if passwords else list(FIELDS)
+    rows = User.objects.order_by('pk').values_list(*columns).iterator(chunk_size=batch_size)
+
+    if fmt == 'csv':
+        writer = csv.writer(stream)
+        writer.writerow(names)
+
+        def write(row: tuple) -> None:
+            writer.writerow(value.isoformat() if isinstance(value, datetime) else value for value in row)
+    else:
+        encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+        def write(row: tuple) -> None:
+            stream.write(encoder.encode(dict(zip(names, row, strict=True))) + '\n')
+
+    for batch in batched(rows, batch_size, strict=False):
+        for row in batch:
+            write(row)
+        yield len(batch)
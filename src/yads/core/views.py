@@ -1 +1,39 @@
-# Create your views here.
+from typing import Any
+
+from django.http import HttpRequest, HttpResponse
+from django.views.generic import TemplateView
+
+
+class HtmxTemplateView(TemplateView):
+    """Renders the ``partial_name`` partial of the template for HTMX requests and the whole template otherwise.
+
+    Boosted requests and history restores replace the whole page so they get the full template too.
+    """
+
+    partial_name: str | None = None
+
+    def get_template_names(self) -> list[str]:
+        template_names = super().get_template_names()
+        htmx = getattr(self.request, 'htmx', None)
+        if self.partial_name and htmx and not (htmx.boosted or htmx.history_restore_request):
+            return [f'{name}#{self.partial_name}' for name in template_names]
+        return template_names
+
+
+class AsyncHtmxTemplateView(HtmxTemplateView):
+    """``HtmxTemplateView`` with an async ``get`` so requests don't need a worker thread until the template renders.
+
+    Subclasses doing database work in ``get_context_data`` must use the async ORM (``aget()``, ``acount()``, ``async
+    for``) from an async ``aget_context_data`` instead, the synchronous ORM raises on the event loop.
+    """
+
+    async def aget_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        return self.get_context_data(**kwargs)
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:  # pyright: ignore[reportIncompatibleMethodOverride]
+        return self.render_to_response(await self.aget_context_data(**kwargs))
+
+
+class HomeView(AsyncHtmxTemplateView):
+    template_name = 'base.html'
+    partial_name = 'content'
@@ -0,0 +1,86 @@
+"""Template warm-up at worker boot
+
+With the cached template loader every worker compiles a template, and the partials defined in it, on the first
+request that renders it. ``warm_up`` compiles every template found in the directories of the template loaders ahead
+of time, so the first request served by a fresh worker doesn't pay for it. It runs on the ASGI lifespan startup event
+(see ``yads.core.asgi``) or once ``config/wsgi.py`` is loaded, ``manage.py warm_templates`` reports the compile time
+of each template.
+"""
+
+import logging
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.conf import settings
+from django.template import Engine, TemplateSyntaxError, engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.base import Loader
+from django.template.loaders.cached import Loader as CachedLoader
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    engine: str
+    name: str
+    seconds: float
+    partials: int
+
+
+def _loaders(loaders: list[Loader]) -> Iterator[Loader]:
+    for loader in loaders:
+        yield loader
+        yield from _loaders(getattr(loader, 'loaders', []))
+
+
+def cached_loaders(engine: Engine) -> list[CachedLoader]:
+    return [loader for loader in _loaders(engine.template_loaders) if isinstance(loader, CachedLoader)]
+
+
+def template_names(engine: Engine) -> Iterator[str]:
+    """Yields the name of every file in the template directories, in the order the loaders search them."""
+    dirs = dict.fromkeys(
+        Path(directory) for loader in engine.template_loaders for directory in getattr(loader, 'get_dirs', list)()
+    )
+    seen = set()
+    for directory in dirs:
+        for path in sorted(directory.rglob('*')):
+            relative = path.relative_to(directory)
+            name = relative.as_posix()
+            if path.is_file() and not any(part.startswith('.') for part in relative.parts) and name not in seen:
+                seen.add(name)
+                yield name
+
+
+def compile_templates() -> list[CompiledTemplate]:
+    """Compiles every template of every Django template engine, which fills the cached loaders."""
+    compiled = []
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for name in template_names(backend.engine):
+            start = time.perf_counter()
+            try:
+                template = backend.engine.get_template(name)
+            except (TemplateSyntaxError, UnicodeDecodeError) as e:
+                log.warning('Could not compile template %s: %s', name, e)
+                continue
+            partials = getattr(template, 'extra_data', {}).get('partials', {})
+            compiled.append(CompiledTemplate(backend.name, name, time.perf_counter() - start, len(partials)))
+    return compiled
+
+
+def warm_up() -> None:
+    """Compiles all templates if ``TEMPLATE_WARMUP`` is on and the engines cache their compiled templates."""
+    if not settings.TEMPLATE_WARMUP:
+        return
+    if not all(cached_loaders(b.engine) for b in engines.all() if isinstance(b, DjangoTemplates)):
+        log.debug('Skipping the template warm-up, the template loaders are not cached')
+        return
+
+    start = time.perf_counter()
+    compiled = compile_templates()
+    log.info('Compiled %d templates in %.0fms', len(compiled), (time.perf_counter() - start) * 1000)
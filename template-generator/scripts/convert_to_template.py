@@ -1,10 +1,26 @@
 #!/usr/bin/env python3
 """
 Convert the Django project to a template that can be used with django-admin startproject --template
+
+The conversion is incremental: ``template-output.manifest.json`` records the source of every generated file with its
+size, modification time and content hash, and files whose source did not change are left alone. Generated files whose
+source is gone are removed. Changing this script (its patterns, renames or replacements) or passing ``--full``
+regenerates everything. Files are converted on a thread pool.
+
+``--watch`` keeps converting the files changed since the previous pass, every ``--interval`` seconds.
 """
 
+import argparse
+import hashlib
+import io
+import json
 import os
+import re
 import shutil
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 # Files and directories to exclude from the template
@@ -25,7 +41,7 @@ EXCLUDE_PATTERNS = [
     '.env.local',
     '.ruff_cache',
     'template-generator',  # Don't include the template generator itself
-    'template-output',  # Don't include the output directory
+    'template-output',  # Don't include the output directory and its manifest
     'README.md',  # Root README.md is for this repo, not the template
 ]
 
@@ -34,130 +50,173 @@ RENAMES = {
     'src/yads': 'src/project_name',
 }
 
+# Content replacements
+REPLACEMENTS = {
+    'yads': '{{ project_name }}',
+}
+
+TEXT_SUFFIXES = frozenset({'.py', '.toml', '.json', '.js', '.md', '.yml', '.yaml', '.html', '.css'})
+TEXT_NAMES = frozenset({'justfile', 'Dockerfile', 'entrypoint', 'start'})
+
+OUTPUT_DIR = Path('template-output')
+MANIFEST_PATH = Path('template-output.manifest.json')
+TEMPLATE_FILES_DIR = Path('template-generator/template-files')
+
 
-def should_exclude(path: Path, exclude_patterns: list) -> bool:
+def compile_exclude_patterns(exclude_patterns: list[str]) -> re.Pattern:
+    """Compile the patterns into one regex: ``*.ext`` matches the end of a path, others match anywhere in it."""
+    alternatives = [
+        re.escape(pattern[1:]) + '$' if pattern.startswith('*.') else re.escape(pattern)
+        for pattern in exclude_patterns
+    ]
+    return re.compile('|'.join(alternatives))
+
+
+EXCLUDE = compile_exclude_patterns(EXCLUDE_PATTERNS)
+
+
+def should_exclude(path: Path, exclude: re.Pattern = EXCLUDE) -> bool:
     """Check if a path should be excluded based on patterns. Explicit allows .gitkeep files."""
-    path_str = str(path)
     if path.name in {'.gitkeep', '.gitignore'}:
         return False
-    for pattern in exclude_patterns:
-        if pattern in path_str or path.name == pattern:
-            return True
-        if pattern.startswith('*.') and path.name.endswith(pattern[1:]):
-            return True
-    return False
-
+    return exclude.search(str(path)) is not None
 
-def replace_content(content: str, replacements: dict) -> str:
-    """Replace content with template variables."""
-    for old, new in replacements.items():
-        content = content.replace(old, new)
-    return content
 
+def compile_replacements(replacements: dict[str, str]) -> Callable[[str], str]:
+    """Build a function applying all replacements in a single pass, the longest match wins."""
+    pattern = re.compile('|'.join(re.escape(old) for old in sorted(replacements, key=len, reverse=True)))
+    return lambda content: pattern.sub(lambda match: replacements[match.group()], content)
 
-def copy_and_convert_file(src: Path, dest: Path, replacements: dict) -> None:
-    """Copy a file and apply template conversions."""
-    dest.parent.mkdir(parents=True, exist_ok=True)
 
-    if src.suffix in ['.py', '.toml', '.json', '.js', '.md', '.yml', '.yaml', '.html', '.css'] or src.name in [
-        'justfile',
-        'Dockerfile',
-        'entrypoint',
-        'start',
-    ]:
-        # Text files - apply replacements
-        try:
-            with src.open(encoding='utf-8') as f:
-                content = f.read()
+replace_content = compile_replacements(REPLACEMENTS)
+rename_path = compile_replacements(RENAMES)
 
-            content = replace_content(content, replacements)
 
-            with dest.open('w', encoding='utf-8') as f:
-                f.write(content)
-        except UnicodeDecodeError:
-            # If file can't be decoded as text, copy as binary
-            shutil.copy2(src, dest)
-    else:
-        # Binary files - copy as-is
-        shutil.copy2(src, dest)
+@dataclass(frozen=True)
+class Job:
+    src: Path
+    dest: str  # relative to the output directory
+    mode: str  # 'auto' converts text files, 'text' always converts, 'copy' never does
 
 
-def main() -> None:
-    """Main conversion function."""
-    source_dir = Path()
-    output_dir = Path('template-output')
+@dataclass
+class Result:
+    written: list[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: list[str] = field(default_factory=list)
 
-    # Clean output directory
-    if output_dir.exists():
-        shutil.rmtree(output_dir)
-    output_dir.mkdir()
+    @property
+    def changed(self) -> bool:
+        return bool(self.written or self.removed)
 
-    # Content replacements
-    replacements = {
-        'yads': '{{ project_name }}',
-    }
 
-    # Walk through source directory
+def list_jobs(source_dir: Path) -> list[Job]:
+    """List the files of the template with their destination."""
+    jobs = []
     for root, dirs, files in os.walk(source_dir):
         root_path = Path(root)
 
         # Skip excluded directories
-        dirs[:] = [d for d in dirs if not should_exclude(root_path / d, EXCLUDE_PATTERNS)]
+        dirs[:] = [d for d in dirs if not should_exclude(root_path / d)]
 
         for file in files:
             src_file = root_path / file
+            if not should_exclude(src_file):
+                jobs.append(Job(src_file, rename_path(str(src_file.relative_to(source_dir))), 'auto'))
+
+    # Template files from template-generator/template-files/: the README is copied as is (DO NOT replace content),
+    # .env.example and the .github directory get the replacements
+    jobs.append(Job(TEMPLATE_FILES_DIR / 'README.md', 'README.md', 'copy'))
+    jobs.append(Job(TEMPLATE_FILES_DIR / '.env.example', '.env.example', 'text'))
+    src_github = TEMPLATE_FILES_DIR / '.github'
+    for root, _dirs, files in os.walk(src_github):
+        for file in files:
+            src_file = Path(root) / file
+            jobs.append(Job(src_file, str(Path('.github') / src_file.relative_to(src_github)), 'auto'))
+    return [job for job in jobs if job.src.exists()]
+
 
-            # Skip excluded files
-            if should_exclude(src_file, EXCLUDE_PATTERNS):
-                continue
-
-            # Calculate relative path
-            rel_path = src_file.relative_to(source_dir)
-
-            # Apply renames to path
-            dest_path_str = str(rel_path)
-            for old_path, new_path in RENAMES.items():
-                dest_path_str = dest_path_str.replace(old_path, new_path)
-
-            dest_file = output_dir / dest_path_str
-
-            # Copy and convert file
-            copy_and_convert_file(src_file, dest_file, replacements)
-
-    # Copy template files from template-generator/template-files/
-    template_files_dir = Path('template-generator/template-files')
-
-    # Copy README.md (DO NOT replace content)
-    src_readme = template_files_dir / 'README.md'
-    if src_readme.exists():
-        shutil.copy2(src_readme, output_dir / 'README.md')
-
-    # Copy .env.example with replacements
-    src_env = template_files_dir / '.env.example'
-    if src_env.exists():
-        with src_env.open(encoding='utf-8') as f:
-            env_content = f.read()
-        env_content = replace_content(env_content, replacements)
-        with (output_dir / '.env.example').open('w', encoding='utf-8') as f:
-            f.write(env_content)
-
-    # Copy the .github directory with replacements
-    src_github = template_files_dir / '.github'
-    if src_github.exists():
-        dest_github = output_dir / '.github'
-        for root, _dirs, files in os.walk(src_github):
-            root_path = Path(root)
-
-            for file in files:
-                src_file = root_path / file
-                # Calculate relative path from .github directory
-                rel_path = src_file.relative_to(src_github)
-                dest_file = dest_github / rel_path
-
-                # Copy and convert file with replacements
-                copy_and_convert_file(src_file, dest_file, replacements)
-
-    print(f'✅ Django template created in {output_dir}')
+def is_text(job: Job) -> bool:
+    return job.mode == 'text' or (
+        job.mode == 'auto' and (job.src.suffix in TEXT_SUFFIXES or job.src.name in TEXT_NAMES)
+    )
+
+
+def convert(job: Job, output_dir: Path, entry: dict | None) -> tuple[dict, bool]:
+    """Convert one file unless its source is unchanged since ``entry``, returns its manifest entry and whether the
+    file was written."""
+    dest = output_dir / job.dest
+    stat = job.src.stat()
+    signature = {'src': str(job.src), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if entry and dest.exists() and {key: entry[key] for key in signature} == signature:
+        return entry, False
+
+    data = job.src.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry and dest.exists() and entry['src'] == signature['src'] and entry['sha256'] == digest:
+        return {**signature, 'sha256': digest}, False
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if is_text(job):
+        try:
+            # Decoded with universal newlines, like reading the file in text mode
+            content = io.TextIOWrapper(io.BytesIO(data), encoding='utf-8').read()
+            dest.write_text(replace_content(content), encoding='utf-8')
+        except UnicodeDecodeError:
+            # If file can't be decoded as text, copy as binary
+            shutil.copy2(job.src, dest)
+    else:
+        # Binary files - copy as-is
+        shutil.copy2(job.src, dest)
+    return {**signature, 'sha256': digest}, True
+
+
+def fingerprint() -> str:
+    """Hash this script, a change to its patterns, renames or replacements regenerates the whole template."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()
+
+
+def generate(
+    source_dir: Path, output_dir: Path, manifest_path: Path, *, full: bool, pool: ThreadPoolExecutor
+) -> Result:
+    """Bring the output directory up to date with the source directory."""
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() and not full else {}
+    if manifest.get('fingerprint') != fingerprint() or not output_dir.exists():
+        # Clean output directory
+        if output_dir.exists():
+            shutil.rmtree(output_dir)
+        output_dir.mkdir()
+        manifest = {}
+    files = manifest.get('files', {})
+
+    jobs = list_jobs(source_dir)
+    result = Result()
+    entries = {}
+    for job, (entry, written) in zip(
+        jobs, pool.map(lambda job: convert(job, output_dir, files.get(job.dest)), jobs), strict=True
+    ):
+        entries[job.dest] = entry
+        if written:
+            result.written.append(job.dest)
+        else:
+            result.unchanged += 1
+
+    # Remove the generated files whose source is gone and anything else left in the output directory
+    for root, _dirs, names in os.walk(output_dir, topdown=False):
+        root_path = Path(root)
+        for name in names:
+            rel_path = str((root_path / name).relative_to(output_dir))
+            if rel_path not in entries:
+                (root_path / name).unlink()
+                result.removed.append(rel_path)
+        if root_path != output_dir and not any(root_path.iterdir()):
+            root_path.rmdir()
+
+    manifest_path.write_text(json.dumps({'fingerprint': fingerprint(), 'files': entries}, indent=1, sort_keys=True))
+    return result
+
+
+def print_tree(output_dir: Path) -> None:
     print('\nTemplate structure:')
     for root, _dirs, files in os.walk(output_dir):
         level = root.replace(str(output_dir), '').count(os.sep)
@@ -168,5 +227,43 @@ def main() -> None:
             print(f'{subindent}{file}')
 
 
+def main() -> None:
+    """Main conversion function."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--full', action='store_true', help='regenerate every file')
+    parser.add_argument('--watch', action='store_true', help='keep regenerating the changed files')
+    parser.add_argument('--interval', type=float, default=1.0, help='seconds between two passes of --watch')
+    parser.add_argument('--workers', type=int, default=None, help='size of the thread pool')
+    args = parser.parse_args()
+
+    source_dir = Path()
+    with ThreadPoolExecutor(args.workers) as pool:
+        start = time.perf_counter()
+        result = generate(source_dir, OUTPUT_DIR, MANIFEST_PATH, full=args.full, pool=pool)
+        print(
+            f'✅ Django template created in {OUTPUT_DIR} in {time.perf_counter() - start:.2f}s: '
+            f'{len(result.written)} written, {result.unchanged} unchanged, {len(result.removed)} removed'
+        )
+        if not args.watch:
+            print_tree(OUTPUT_DIR)
+            return
+
+        print(f'Watching for changes every {args.interval}s, press Ctrl+C to stop')
+        try:
+            while True:
+                time.sleep(args.interval)
+                start = time.perf_counter()
+                result = generate(source_dir, OUTPUT_DIR, MANIFEST_PATH, full=False, pool=pool)
+                if result.changed:
+                    elapsed = time.perf_counter() - start
+                    for path in result.written:
+                        print(f'  written {path}')
+                    for path in result.removed:
+                        print(f'  removed {path}')
+                    print(f'Updated {OUTPUT_DIR} in {elapsed:.3f}s')
+        except KeyboardInterrupt:
+            pass
+
+
 if __name__ == '__main__':
     main()